@@ -0,0 +1,138 @@
+"""Offline load test for ``POST /agent/chat``.
+
+Runs the real app under uvicorn with a scripted chat model and a local EVM node,
+then reports latency percentiles, throughput and resident memory per worker::
+
+    PYTHONPATH=. python -m benchmarks.agent_chat --requests 200 --concurrency 8 --workers 2
+
+Exits with status 1 when a ``--max-*``/``--min-*`` threshold or the ``--baseline``
+comparison fails, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import psutil
+import requests
+
+from benchmarks.agent_chat.load import run_load
+from benchmarks.agent_chat.local_chain import CHAIN_BACKEND_KEY, WALLET_ADDRESS_KEY, LocalChain
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark /agent/chat offline")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rpc-url", default=os.getenv("EVM_RPC_URL"), help="Use an already running node")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression vs the baseline")
+    parser.add_argument("--max-p95-ms", type=float)
+    parser.add_argument("--min-rps", type=float)
+    return parser.parse_args()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int, chain: LocalChain) -> subprocess.Popen:
+    env = dict(os.environ)
+    if chain.rpc_url:
+        env["EVM_RPC_URL"] = chain.rpc_url
+    env.update({
+        CHAIN_BACKEND_KEY: chain.backend,
+        WALLET_ADDRESS_KEY: chain.address,
+        "OPENAI_API_KEY": env.get("OPENAI_API_KEY", "offline-benchmark"),
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")])),
+        # Only /agent/chat is measured: no TTS workers loading the model at startup, and no
+        # job runner polling a database
+        "TTS_PRELOAD": "0",
+        "JOBS_RUN_IN_APP": "0",
+    })
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.agent_chat.server:app",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Benchmark server exited during startup")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return process
+        except requests.exceptions.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Benchmark server did not start")
+
+
+def worker_memory_mb(process: subprocess.Popen, workers: int) -> list:
+    parent = psutil.Process(process.pid)
+    # With --workers > 1 uvicorn spawns the app into children; otherwise it runs in the parent.
+    # Processes the app starts itself (TTS workers, encryption pool) are not API workers
+    api_workers = [parent]
+    if workers > 1:
+        api_workers = [child for child in parent.children() if "resource_tracker" not in " ".join(child.cmdline())]
+    return [round(p.memory_info().rss / 1024 / 1024, 1) for p in api_workers]
+
+
+def check(report: dict, args) -> list:
+    failures = []
+    if report["errors"]:
+        failures.append(f"{report['errors']} requests failed: {report['error_samples']}")
+    if args.max_p95_ms is not None and report["p95_ms"] > args.max_p95_ms:
+        failures.append(f"p95 {report['p95_ms']}ms exceeds {args.max_p95_ms}ms")
+    if args.min_rps is not None and report["requests_per_s"] < args.min_rps:
+        failures.append(f"throughput {report['requests_per_s']} req/s below {args.min_rps}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if report[key] > baseline[key] * (1 + args.tolerance):
+                failures.append(f"{key} regressed: {report[key]} vs baseline {baseline[key]}")
+        if report["requests_per_s"] < baseline["requests_per_s"] * (1 - args.tolerance):
+            failures.append(f"requests_per_s regressed: {report['requests_per_s']} vs baseline {baseline['requests_per_s']}")
+    return failures
+
+
+def main():
+    args = parse_args()
+    with LocalChain(args.rpc_url) as chain:
+        port = _free_port()
+        server = start_server(port, args.workers, chain)
+        try:
+            url = f"http://127.0.0.1:{port}/agent/chat"
+            payload = {"message": f"Send 0.0001 ETH to {chain.address} on Base", "wallet_address": chain.address}
+            if args.warmup:
+                run_load(url, payload, args.warmup, 1)
+            report = run_load(url, payload, args.requests, args.concurrency)
+            report["workers"] = args.workers
+            report["chain_backend"] = chain.backend
+            report["worker_rss_mb"] = worker_memory_mb(server, args.workers)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = check(report, args)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
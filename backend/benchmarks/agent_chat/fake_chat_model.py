@@ -0,0 +1,61 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+# The decision maker routes to the Base tool, the nested CDP agent then reads the
+# wallet and prepares a transfer so every chat exercises balance, nonce, fee and gas RPCs.
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {"tool": "CDP_Base_Agent_Tool", "args": {"user_input": "Send 0.0001 ETH to {wallet}", "user_wallet": "{wallet}"}},
+    {"tool": "WalletActionProvider_get_wallet_details", "args": {}},
+    {"tool": "WalletActionProvider_native_transfer", "args": {"to": "{wallet}", "value": "0.0001"}},
+]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic chat model that walks a fixed tool-calling script.
+
+    Each graph binds its own tools, so the model only plays the script steps whose
+    tool is bound to it and answers with a plain message once those are done.
+    """
+
+    script: List[Dict[str, Any]] = Field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    tool_names: List[str] = Field(default_factory=list)
+    wallet: str = ""
+    usage: Dict[str, int] = Field(default_factory=lambda: {"input_tokens": 100, "output_tokens": 20, "total_tokens": 120})
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        names = [convert_to_openai_tool(tool)["function"]["name"] for tool in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _steps(self) -> List[Dict[str, Any]]:
+        return [step for step in self.script if step["tool"] in self.tool_names]
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        last_human = max(i for i, message in enumerate(messages) if isinstance(message, HumanMessage))
+        done = sum(isinstance(message, ToolMessage) for message in messages[last_human:])
+        steps = self._steps()
+        if done < len(steps):
+            step = steps[done]
+            message = AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": step["tool"],
+                    "args": {key: self._fill(value) for key, value in step["args"].items()},
+                    "id": f"call_{len(messages)}_{done}",
+                }],
+                usage_metadata=self.usage,
+            )
+        else:
+            message = AIMessage(content=f"Done after {done} tool calls.", usage_metadata=self.usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _fill(self, value: Any) -> Any:
+        return value.format(wallet=self.wallet) if isinstance(value, str) else value
@@ -0,0 +1,76 @@
+import shutil
+import socket
+import subprocess
+import time
+from typing import Optional
+
+import requests
+
+# anvil's first default dev account, funded on every fresh anvil node
+ANVIL_ACCOUNT = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+# eth-tester's first default account (private key 0x...01)
+ETH_TESTER_ACCOUNT = "0x7E5F4552091A69125d5DfCb7b8C2659029395Bdf"
+# The scripted chat routes to the Base tool, so the local node pretends to be Base
+CHAIN_ID = 8453
+
+ETH_TESTER_BACKEND = "eth-tester"
+
+# Passed to the benchmark server process
+WALLET_ADDRESS_KEY = "BENCH_WALLET_ADDRESS"
+CHAIN_BACKEND_KEY = "BENCH_CHAIN_BACKEND"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalChain:
+    """A throwaway EVM node for benchmarks.
+
+    Uses the given RPC URL when there is one, otherwise starts ``anvil`` if it is on
+    the PATH. Without anvil the ``eth-tester`` backend is selected, which the
+    benchmark server runs in-process inside every worker instead of over HTTP.
+    """
+
+    def __init__(self, rpc_url: Optional[str] = None):
+        self.rpc_url = rpc_url
+        self.address = ANVIL_ACCOUNT
+        self.backend = "external" if rpc_url else None
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self):
+        if self.rpc_url is None:
+            if shutil.which("anvil"):
+                self._start_anvil()
+            else:
+                self.backend = ETH_TESTER_BACKEND
+                self.address = ETH_TESTER_ACCOUNT
+        return self
+
+    def __exit__(self, *exc):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+
+    def _start_anvil(self):
+        port = _free_port()
+        self._process = subprocess.Popen(
+            ["anvil", "--port", str(port), "--chain-id", str(CHAIN_ID), "--silent"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.rpc_url = f"http://127.0.0.1:{port}"
+        self.backend = "anvil"
+        self._wait_until_ready()
+
+    def _wait_until_ready(self, timeout: float = 30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                requests.post(self.rpc_url, json={"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}, timeout=1)
+                return
+            except requests.exceptions.RequestException:
+                time.sleep(0.1)
+        raise RuntimeError(f"Local EVM node at {self.rpc_url} did not start")
@@ -0,0 +1,58 @@
+"""The real FastAPI app with every paid or remote dependency swapped for a local stand-in.
+
+Patches are applied at import time so that each uvicorn worker started from
+``benchmarks.agent_chat.server:app`` gets them.
+"""
+import os
+import threading
+
+from cdp import Cdp
+from web3 import EthereumTesterProvider, Web3
+
+import llm.cdp.agent_factory as agent_factory
+import llm.cdp.coinbase_agentkit.action_providers.action_decorator as action_decorator
+import llm.decision_maker.langchain_agent as langchain_agent
+from benchmarks.agent_chat.fake_chat_model import ScriptedChatModel
+from benchmarks.agent_chat.local_chain import CHAIN_BACKEND_KEY, ETH_TESTER_BACKEND, WALLET_ADDRESS_KEY
+from llm.cdp.coinbase_agentkit import EthAccountWalletProvider
+
+
+def _scripted_chat_model(*args, **kwargs):
+    return ScriptedChatModel(wallet=os.getenv(WALLET_ADDRESS_KEY, ""))
+
+
+class _LockedEthereumTesterProvider(EthereumTesterProvider):
+    """eth-tester is not thread safe and tool calls may run on executor threads."""
+
+    _lock = threading.Lock()
+
+    def make_request(self, method, params):
+        with self._lock:
+            return super().make_request(method, params)
+
+
+def _use_eth_tester():
+    provider = _LockedEthereumTesterProvider()
+    original_init = EthAccountWalletProvider.__init__
+
+    def __init__(self, config):
+        original_init(self, config)
+        self.web3 = Web3(provider)
+        # Transactions carry the Base chain id, which the tester chain does not use
+        self.web3.middleware_onion.remove("validation")
+
+    EthAccountWalletProvider.__init__ = __init__
+
+
+langchain_agent.ChatOpenAI = _scripted_chat_model
+agent_factory.ChatOpenAI = _scripted_chat_model
+# No analytics uploads or CDP credentials during benchmarks
+action_decorator.send_analytics_event = lambda event: None
+Cdp.configure = classmethod(lambda cls, *args, **kwargs: None)
+Cdp.configure_from_json = classmethod(lambda cls, *args, **kwargs: None)
+if os.getenv(CHAIN_BACKEND_KEY) == ETH_TESTER_BACKEND:
+    _use_eth_tester()
+
+from main import app  # noqa: E402
+
+__all__ = ["app"]
@@ -0,0 +1,129 @@
+"""Fixtures for the agentkit micro-benchmarks.
+
+Run with::
+
+    PYTHONPATH=. pytest benchmarks/agentkit --benchmark-storage=benchmarks/agentkit/.baselines \
+        --benchmark-autosave --benchmark-compare --benchmark-compare-fail=mean:25%
+
+Transactions go to an in-process eth-tester chain. Contract reads are answered by
+``CannedCallProvider`` with ABI-encoded fixed values, so read-heavy helpers such as
+``get_health_ratio`` pay the full web3 encode/decode cost without deployed contracts.
+"""
+import pytest
+from eth_abi import encode
+from eth_account import Account
+from eth_utils import collapse_if_tuple, function_abi_to_4byte_selector
+from web3 import EthereumTesterProvider, Web3
+from web3.providers import BaseProvider
+
+import llm.cdp.coinbase_agentkit.action_providers.action_decorator as action_decorator
+from llm.cdp.coinbase_agentkit import EthAccountWalletProvider, EthAccountWalletProviderConfig
+from llm.cdp.coinbase_agentkit.action_providers.compound.constants import COMET_ABI, PRICE_FEED_ABI
+from llm.cdp.coinbase_agentkit.action_providers.erc20.constants import ERC20_ABI
+from llm.cdp.coinbase_agentkit.action_providers.wow.constants import WOW_ABI
+from llm.cdp.coinbase_agentkit.action_providers.wow.uniswap.constants import (
+    UNISWAP_QUOTER_ABI,
+    UNISWAP_V3_ABI,
+)
+
+# eth-tester's first funded, unlocked account
+TESTER_PRIVATE_KEY = "0x" + "00" * 31 + "01"
+TOKEN_ADDRESS = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+WETH = "0x4200000000000000000000000000000000000006"
+PRICE_FEED = "0x" + "11" * 20
+POOL = "0x" + "22" * 20
+
+CANNED_RESULTS = {
+    # Compound comet with one supplied collateral asset and an open borrow
+    "borrowBalanceOf": 250 * 10**6,
+    "baseToken": TOKEN_ADDRESS,
+    "baseTokenPriceFeed": PRICE_FEED,
+    "numAssets": 1,
+    "getAssetInfo": (0, WETH, PRICE_FEED, 10**18, 8 * 10**17, 9 * 10**17, 95 * 10**16, 10**24),
+    "collateralBalanceOf": 10**18,
+    "decimals": 6,
+    "symbol": "USDC",
+    "latestRoundData": (1, 3000 * 10**8, 0, 1_700_000_000, 1),
+    "balanceOf": 5 * 10**18,
+    # Uniswap v3 pool behind a WOW token
+    "poolAddress": POOL,
+    "token0": WETH,
+    "token1": TOKEN_ADDRESS,
+    "fee": 3000,
+    "liquidity": 10**20,
+    "slot0": (2**96, 0, 0, 1, 1, 0, True),
+    "quoteExactInputSingle": (10**18, 2**96, 1, 100_000),
+}
+
+
+class CannedCallProvider(BaseProvider):
+    """Answers ``eth_call`` with ``CANNED_RESULTS`` encoded per the function's ABI outputs."""
+
+    def __init__(self, chain_id: int, *abis):
+        super().__init__()
+        self.chain_id = chain_id
+        self.outputs = {}
+        for abi in abis:
+            for item in abi:
+                if item.get("type") == "function" and item["name"] in CANNED_RESULTS:
+                    selector = "0x" + function_abi_to_4byte_selector(item).hex()
+                    self.outputs[selector] = (
+                        [collapse_if_tuple(output) for output in item["outputs"]],
+                        CANNED_RESULTS[item["name"]],
+                    )
+
+    def make_request(self, method, params):
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.chain_id)}
+        if method == "eth_call":
+            types, value = self.outputs[params[0]["data"][:10]]
+            values = value if len(types) > 1 else (value,)
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x" + encode(types, values).hex()}
+        raise NotImplementedError(method)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+
+@pytest.fixture(autouse=True)
+def no_analytics(monkeypatch):
+    monkeypatch.setattr(action_decorator, "send_analytics_event", lambda event: None)
+
+
+def _wallet_provider(web3: Web3, on_transaction_sign=None) -> EthAccountWalletProvider:
+    provider = EthAccountWalletProvider(EthAccountWalletProviderConfig(
+        account=Account.from_key(TESTER_PRIVATE_KEY),
+        chain_id="8453",
+        rpc_url="http://127.0.0.1:0",
+        on_transaction_sign=on_transaction_sign,
+    ))
+    provider.web3 = web3
+    return provider
+
+
+@pytest.fixture(scope="session")
+def tester_web3() -> Web3:
+    pytest.importorskip("eth_tester")
+    web3 = Web3(EthereumTesterProvider())
+    # Transactions carry the Base chain id, which the tester chain does not use
+    web3.middleware_onion.remove("validation")
+    return web3
+
+
+@pytest.fixture
+def wallet_provider(tester_web3) -> EthAccountWalletProvider:
+    return _wallet_provider(tester_web3)
+
+
+@pytest.fixture
+def signing_wallet_provider(tester_web3) -> EthAccountWalletProvider:
+    """Prepares transactions for the user to sign instead of sending them, as the chat path does."""
+    return _wallet_provider(tester_web3, on_transaction_sign=lambda signature: None)
+
+
+@pytest.fixture
+def canned_wallet_provider() -> EthAccountWalletProvider:
+    web3 = Web3(CannedCallProvider(
+        8453, COMET_ABI, PRICE_FEED_ABI, ERC20_ABI, WOW_ABI, UNISWAP_V3_ABI, UNISWAP_QUOTER_ABI
+    ))
+    return _wallet_provider(web3)
@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from llm.cdp.coinbase_agentkit import (  # noqa: E402
+    AgentKit,
+    AgentKitConfig,
+    compound_action_provider,
+    create_action,
+    erc20_action_provider,
+    pyth_action_provider,
+    wallet_action_provider,
+    weth_action_provider,
+    wow_action_provider,
+)
+from llm.cdp.coinbase_agentkit.action_providers.action_provider import ActionProvider  # noqa: E402
+from llm.cdp.coinbase_agentkit.action_providers.compound.utils import get_health_ratio  # noqa: E402
+from llm.cdp.coinbase_agentkit.action_providers.wow.uniswap.utils import get_uniswap_quote  # noqa: E402
+
+COMET_ADDRESS = "0xb125E6687d4313864e53df431d5425969c15Eb2F"
+DESTINATION = "0x5154eAE861cAc3aA757d6016babAF972341354cf"
+TOKEN_ADDRESS = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+
+
+class NoopActionProvider(ActionProvider):
+    def __init__(self):
+        super().__init__("noop", [])
+
+    @create_action(name="noop", description="Does nothing")
+    def noop(self, args):
+        return "ok"
+
+    def supports_network(self, network):
+        return True
+
+
+def _action(agentkit: AgentKit, name: str):
+    return next(action for action in agentkit.get_actions() if action.name == name)
+
+
+def test_create_action_wrapper_overhead(benchmark):
+    provider = NoopActionProvider()
+    result = benchmark(provider.noop, {})
+    assert result == "ok"
+
+
+def test_agentkit_get_actions(benchmark, wallet_provider):
+    agentkit = AgentKit(AgentKitConfig(
+        wallet_provider=wallet_provider,
+        action_providers=[
+            erc20_action_provider(),
+            pyth_action_provider(),
+            wallet_action_provider(),
+            weth_action_provider(),
+            compound_action_provider(),
+            wow_action_provider(),
+        ],
+    ))
+    actions = benchmark(agentkit.get_actions)
+    assert actions
+
+
+def test_erc20_transfer(benchmark, wallet_provider):
+    transfer = _action(AgentKit(AgentKitConfig(
+        wallet_provider=wallet_provider, action_providers=[erc20_action_provider()]
+    )), "ERC20ActionProvider_transfer")
+    result = benchmark(transfer.invoke, {"amount": "1000", "contract_address": TOKEN_ADDRESS, "destination": DESTINATION})
+    assert result.startswith("Transferred"), result
+
+
+def test_weth_wrap_eth(benchmark, wallet_provider):
+    wrap_eth = _action(AgentKit(AgentKitConfig(
+        wallet_provider=wallet_provider, action_providers=[weth_action_provider()]
+    )), "WethActionProvider_wrap_eth")
+    result = benchmark(wrap_eth.invoke, {"amount_to_wrap": "100000000000000"})
+    assert result.startswith("Wrapped"), result
+
+
+def test_compound_get_health_ratio(benchmark, canned_wallet_provider):
+    ratio = benchmark(get_health_ratio, canned_wallet_provider, COMET_ADDRESS)
+    assert ratio > 0
+
+
+def test_wow_get_uniswap_quote(benchmark, canned_wallet_provider):
+    quote = benchmark(get_uniswap_quote, canned_wallet_provider, TOKEN_ADDRESS, 10**16, "buy")
+    assert quote.amount_out
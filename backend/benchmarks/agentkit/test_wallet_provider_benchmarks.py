@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+DESTINATION = "0x5154eAE861cAc3aA757d6016babAF972341354cf"
+
+
+def test_send_transaction(benchmark, wallet_provider):
+    tx_hash = benchmark(lambda: wallet_provider.send_transaction({"to": DESTINATION, "value": 1}))
+    assert tx_hash.startswith("0x")
+
+
+def test_prepare_transaction_for_user_signature(benchmark, signing_wallet_provider):
+    transaction = benchmark(lambda: signing_wallet_provider.send_transaction({"to": DESTINATION, "value": 1}))
+    assert transaction["gas"] > 0
+
+
+def test_read_contract(benchmark, canned_wallet_provider):
+    from llm.cdp.coinbase_agentkit.action_providers.erc20.constants import ERC20_ABI
+
+    balance = benchmark(canned_wallet_provider.read_contract, DESTINATION, ERC20_ABI, "balanceOf", [DESTINATION])
+    assert balance > 0
@@ -0,0 +1,165 @@
+"""Concurrent throughput of sync ``Session`` vs ``AsyncSession`` request handlers.
+
+Serves the same read (``SELECT`` of the chain catalog) from two ``async def`` routes:
+one on the blocking ``get_db`` session, the way the controllers used to query, and one
+on ``get_async_db``. Requests go through the ASGI app in-process::
+
+    PYTHONPATH=. python -m benchmarks.db_sessions --requests 500 --concurrency 32
+
+Without ``--connection-string`` (or ``CONNECTION_STRING``) a temporary SQLite file is
+used and ``--query-delay-ms`` emulates the network round trip to Postgres, since a
+local SQLite read is too fast for event-loop blocking to show.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.agent_chat.load import percentile
+from models.chain import Base, Chain
+from utils import database
+from utils.database import _create_async_engine, _create_engine, get_async_db, get_db, to_async_url
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async DB sessions")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--chains", type=int, default=20, help="Rows seeded into the chain catalog")
+    parser.add_argument("--query-delay-ms", type=float, default=2.0, help="Per-query delay added on the database side")
+    parser.add_argument("--connection-string", default=os.getenv("CONNECTION_STRING"))
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args()
+
+
+def _delay_clause(connection_string: str, delay_ms: float):
+    if not delay_ms:
+        return None
+    if connection_string.startswith("sqlite"):
+        return text("SELECT sleep_ms(:ms)").bindparams(ms=delay_ms)
+    return text("SELECT pg_sleep(:s)").bindparams(s=delay_ms / 1000)
+
+
+def _register_sqlite_sleep(engine):
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, _):
+        dbapi_connection.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000))
+
+
+def build_app(delay) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_chains(db: Session = Depends(get_db)):
+        if delay is not None:
+            db.execute(delay)
+        return len(db.execute(select(Chain)).scalars().all())
+
+    @app.get("/async")
+    async def async_chains(db: AsyncSession = Depends(get_async_db)):
+        if delay is not None:
+            await db.execute(delay)
+        return len((await db.execute(select(Chain))).scalars().all())
+
+    return app
+
+
+async def run_load(app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = []
+    remaining = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors.append(f"{response.status_code}: {response.text[:200]}")
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def seed(engine, chains: int):
+    Base.metadata.create_all(engine, tables=[Chain.__table__])
+    with sessionmaker(bind=engine)() as db:
+        if db.execute(select(Chain).limit(1)).first() is None:
+            db.add_all(Chain(id=str(uuid.uuid4()), name=f"chain-{i}", icon="", disabled=False) for i in range(chains))
+            db.commit()
+
+
+async def main_async(args, connection_string: str) -> dict:
+    delay = _delay_clause(connection_string, args.query_delay_ms)
+    if connection_string.startswith("sqlite"):
+        # One connection per concurrent request, so neither side waits on checkout
+        pool = {"pool_size": args.concurrency, "max_overflow": 0}
+        database._engine = create_engine(connection_string, **pool)
+        database._async_engine = create_async_engine(to_async_url(connection_string), **pool)
+    else:
+        database._engine = _create_engine(connection_string)
+        database._async_engine = _create_async_engine(connection_string)
+    database._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=database._engine)
+    database._async_session_factory = async_sessionmaker(
+        bind=database._async_engine, autoflush=False, expire_on_commit=False
+    )
+    if connection_string.startswith("sqlite"):
+        _register_sqlite_sleep(database._engine)
+        _register_sqlite_sleep(database._async_engine.sync_engine)
+    seed(database._engine, args.chains)
+
+    app = build_app(delay)
+    report = {"query_delay_ms": args.query_delay_ms}
+    try:
+        for mode in ("sync", "async"):
+            await run_load(app, f"/{mode}", min(args.requests, args.concurrency), args.concurrency)  # warm-up
+            report[mode] = await run_load(app, f"/{mode}", args.requests, args.concurrency)
+    finally:
+        database._engine.dispose()
+        await database._async_engine.dispose()
+
+    if report["sync"]["requests_per_s"]:
+        report["async_speedup"] = round(report["async"]["requests_per_s"] / report["sync"]["requests_per_s"], 2)
+    return report
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        connection_string = args.connection_string or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        report = asyncio.run(main_async(args, connection_string))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Speed, memory and quality of the XTTS inference backends on CPU.
+
+Runs the corpus in ``benchmarks/tts_batching/corpus.txt`` through one synthesis worker
+per ``TTS_QUANTIZATION`` mode, one request at a time::
+
+    PYTHONPATH=. python -m benchmarks.tts_backends --speaker-wav voice.wav --modes none,int8
+
+For each mode it reports the real-time factor (seconds of compute per second of audio),
+the worker's resident memory after loading and after the run, and how close the
+produced speaker is to the reference (cosine similarity of speaker embeddings, where
+1.0 is identical), so a faster backend can be checked for lost voice quality.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+
+import psutil
+
+from benchmarks.agent_chat.load import percentile
+from benchmarks.tts_batching.corpus import audio_seconds, load_corpus
+from synthesis.config import SynthesisConfig
+from synthesis.server import SynthesisServer
+from utils.blob_store import get_blob_store
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark XTTS inference backends")
+    parser.add_argument("--speaker-wav", required=True, help="Reference recording of the voice to synthesize with")
+    parser.add_argument("--modes", default="none,int8", help="Comma-separated TTS_QUANTIZATION values to compare")
+    parser.add_argument("--rounds", type=int, default=1, help="Times the corpus is synthesized per mode")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--engine", default=SynthesisConfig.engine)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args()
+
+
+def worker_rss_mb(server: SynthesisServer) -> float:
+    pid = server.metrics()["workers"][0]["pid"]
+    return round(psutil.Process(pid).memory_info().rss / 1024 / 1024, 1)
+
+
+async def run_mode(server: SynthesisServer, texts, args) -> dict:
+    await server.wait_ready()
+    report = {"load_s": server.metrics()["workers"][0]["model_load_s"], "rss_loaded_mb": worker_rss_mb(server)}
+    latents_hash = await get_blob_store().put(await server.compute_latents(audio=args.reference))
+
+    rtfs, similarities, errors = [], [], []
+    await server.synthesize(text=texts[0], latents_hash=latents_hash, language=args.language)  # warm-up
+    for text in texts:
+        started = time.perf_counter()
+        try:
+            audio = await server.synthesize(text=text, latents_hash=latents_hash, language=args.language)
+        except Exception as e:
+            errors.append(repr(e))
+            continue
+        elapsed = time.perf_counter() - started
+        seconds = audio_seconds(audio)
+        if seconds:
+            rtfs.append(elapsed / seconds)
+        try:
+            similarities.append(await server.run("speaker_similarity", audio=audio, latents_hash=latents_hash))
+        except Exception:
+            pass  # engines without a speaker encoder
+
+    report.update({
+        "requests": len(texts),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "rtf_mean": round(statistics.mean(rtfs), 3) if rtfs else None,
+        "rtf_p50": round(percentile(rtfs, 50), 3),
+        "rtf_p95": round(percentile(rtfs, 95), 3),
+        "rss_after_mb": worker_rss_mb(server),
+        "speaker_similarity": round(statistics.mean(similarities), 4) if similarities else None,
+    })
+    return report
+
+
+async def benchmark(args, config: SynthesisConfig) -> dict:
+    texts = load_corpus(args.rounds)
+    report = {"engine": config.engine, "threads": config.threads_per_worker, "modes": {}}
+    for mode in args.modes.split(","):
+        server = SynthesisServer(replace(config, quantization=mode))
+        server.start()
+        try:
+            report["modes"][mode] = await run_mode(server, texts, args)
+        finally:
+            await asyncio.to_thread(server.stop)
+
+    baseline = report["modes"].get("none", {}).get("rtf_mean")
+    if baseline:
+        report["speedup"] = {mode: round(baseline / run["rtf_mean"], 2)
+                             for mode, run in report["modes"].items() if run.get("rtf_mean")}
+    return report
+
+
+def main():
+    args = parse_args()
+    with open(args.speaker_wav, "rb") as f:
+        args.reference = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Workers read the latents from the blob store, and inherit this from the environment
+        os.environ["BLOB_STORE_BACKEND"] = "filesystem"
+        os.environ["BLOB_STORE_PATH"] = tmp
+        config = replace(SynthesisConfig.from_env(), engine=args.engine, device="cpu", workers=1, batch_size=1)
+        report = asyncio.run(benchmark(args, config))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Throughput and latency of TTS micro-batching on a fixed text corpus.
+
+Starts a ``SynthesisServer`` for each batch size, computes the speaker latents of
+``--speaker-wav`` once, then synthesizes every line of ``corpus.txt`` ``--rounds`` times
+with ``--concurrency`` requests in flight::
+
+    PYTHONPATH=. python -m benchmarks.tts_batching --speaker-wav voice.wav --batch-sizes 1,4,8 --concurrency 8
+
+Each batch size reports jobs/s, seconds of audio produced per wall-clock second and
+latency percentiles, so the gain in throughput can be weighed against the added wait.
+``--engine tests.synthesis.fake_engine:FakeEngine`` exercises the scheduler without a model.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from dataclasses import replace
+
+from benchmarks.agent_chat.load import percentile
+from benchmarks.tts_batching.corpus import audio_seconds, load_corpus
+from synthesis.config import SynthesisConfig
+from synthesis.server import SynthesisServer
+from utils.blob_store import get_blob_store
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark TTS micro-batching")
+    parser.add_argument("--speaker-wav", required=True, help="Reference recording of the voice to synthesize with")
+    parser.add_argument("--batch-sizes", default="1,4,8", help="Comma-separated TTS_BATCH_SIZE values to compare")
+    parser.add_argument("--batch-wait-ms", type=float, default=SynthesisConfig.batch_wait_ms)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=1, help="Times the corpus is synthesized per batch size")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--engine", default=SynthesisConfig.engine)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args()
+
+
+async def run_load(server: SynthesisServer, texts, latents_hash: str, language: str, concurrency: int) -> dict:
+    latencies = []
+    errors = []
+    produced = 0.0
+    remaining = iter(texts)
+
+    async def worker():
+        nonlocal produced
+        for text in remaining:
+            start = time.perf_counter()
+            try:
+                audio = await server.synthesize(text=text, latents_hash=latents_hash, language=language)
+            except Exception as e:
+                errors.append(repr(e))
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            produced += audio_seconds(audio)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "jobs": len(texts),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_s": round(elapsed, 3),
+        "jobs_per_s": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "audio_s_per_s": round(produced / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_batch_size": server.metrics()["batching"]["mean_size"],
+    }
+
+
+async def benchmark(args, config: SynthesisConfig) -> dict:
+    texts = load_corpus(args.rounds)
+    report = {"engine": config.engine, "threads_per_worker": config.threads_per_worker,
+              "batch_wait_ms": config.batch_wait_ms, "concurrency": args.concurrency, "runs": {}}
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        server = SynthesisServer(replace(config, batch_size=batch_size))
+        server.start()
+        try:
+            await server.wait_ready()
+            latents_hash = await get_blob_store().put(await server.compute_latents(audio=args.reference))
+            await run_load(server, texts[:args.concurrency], latents_hash, args.language, args.concurrency)  # warm-up
+            server.stats.batch_sizes.clear()
+            report["runs"][str(batch_size)] = await run_load(server, texts, latents_hash, args.language, args.concurrency)
+        finally:
+            await asyncio.to_thread(server.stop)
+
+    runs = report["runs"]
+    baseline = runs.get("1", {}).get("jobs_per_s")
+    if baseline:
+        report["speedup"] = {size: round(run["jobs_per_s"] / baseline, 2) for size, run in runs.items()}
+    return report
+
+
+def main():
+    args = parse_args()
+    with open(args.speaker_wav, "rb") as f:
+        args.reference = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Workers read the latents from the blob store, and inherit this from the environment
+        os.environ["BLOB_STORE_BACKEND"] = "filesystem"
+        os.environ["BLOB_STORE_PATH"] = tmp
+        config = replace(SynthesisConfig.from_env(), engine=args.engine, workers=args.workers,
+                         batch_wait_ms=args.batch_wait_ms, queue_size=max(32, args.concurrency))
+        report = asyncio.run(benchmark(args, config))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import io
+import os
+import wave
+from typing import List
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus.txt")
+
+
+def load_corpus(rounds: int = 1) -> List[str]:
+    with open(CORPUS) as f:
+        return [line.strip() for line in f if line.strip()] * rounds
+
+
+def audio_seconds(audio: bytes) -> float:
+    try:
+        with wave.open(io.BytesIO(audio)) as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0
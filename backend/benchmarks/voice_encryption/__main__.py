@@ -0,0 +1,141 @@
+"""Uploads/sec of share-for-training encryption: inline PBKDF2 + Fernet vs the process pool.
+
+Serves two ``async def`` upload routes: one deriving a PBKDF2 key and Fernet-encrypting
+the whole file inside the handler, the way ``/voice/share-for-training`` used to, and
+one returning ``encrypt_stream`` output the way it does now. Uploads go through the
+ASGI app in-process::
+
+    PYTHONPATH=. python -m benchmarks.voice_encryption --uploads 200 --concurrency 16 --size-kb 1024
+
+Besides uploads/s and latency percentiles, each mode reports the longest the event loop
+went without running a 1 ms ticker, which is how long other requests would have stalled.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+
+import httpx
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from fastapi import FastAPI, File, UploadFile
+from starlette.responses import StreamingResponse
+
+from benchmarks.agent_chat.load import percentile
+from controllers.clone_voice_controller import encrypted_voice_json
+from utils.audio_upload import read_audio_upload
+from utils.voice_encryption import encrypt_stream, shutdown_encryption_pool
+
+PRIVATE_KEY = "benchmark-private-key"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark share-for-training encryption")
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--size-kb", type=int, default=1024, help="Size of each uploaded file")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args()
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/inline")
+    async def inline(audio_file: UploadFile = File(...)):
+        content = await audio_file.read()
+        salt = os.urandom(16)
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
+        key = base64.urlsafe_b64encode(kdf.derive(PRIVATE_KEY.encode()))
+        encrypted = Fernet(key).encrypt(content)
+        return {"id": "bench", "encrypted_voice": base64.b64encode(encrypted).decode(), "original_filename": audio_file.filename}
+
+    @app.post("/pool")
+    async def pool(audio_file: UploadFile = File(...)):
+        ciphertext = encrypt_stream(PRIVATE_KEY, os.urandom(16), await read_audio_upload(audio_file))
+        return StreamingResponse(encrypted_voice_json("bench", audio_file.filename, ciphertext), media_type="application/json")
+
+    return app
+
+
+async def loop_stall_ms(stop: asyncio.Event) -> float:
+    """Longest gap between ticks of a 1 ms timer until ``stop`` is set."""
+    longest = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        last = now
+    return longest * 1000
+
+
+async def run_load(app: FastAPI, path: str, total: int, concurrency: int, data: bytes) -> dict:
+    latencies = []
+    errors = []
+    remaining = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.post(path, files={"audio_file": ("voice.wav", data, "audio/wav")})
+            if response.status_code != 200 or "encrypted_voice" not in response.json():
+                errors.append(f"{response.status_code}: {response.text[:200]}")
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    stop = asyncio.Event()
+    stall = asyncio.create_task(loop_stall_ms(stop))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    stop.set()
+
+    return {
+        "uploads": total,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_s": round(elapsed, 3),
+        "uploads_per_s": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_loop_stall_ms": round(await stall, 2),
+    }
+
+
+async def main_async(args) -> dict:
+    app = build_app()
+    data = b"RIFF\x00\x00\x00\x00WAVE" + os.urandom(args.size_kb * 1024 - 12)
+    report = {"size_kb": args.size_kb, "concurrency": args.concurrency, "cpus": os.cpu_count()}
+    try:
+        for mode in ("inline", "pool"):
+            # Warm-up also starts the pool's processes and derives their master keys
+            await run_load(app, f"/{mode}", args.concurrency * 2, args.concurrency, data)
+            report[mode] = await run_load(app, f"/{mode}", args.uploads, args.concurrency, data)
+    finally:
+        shutdown_encryption_pool()
+
+    if report["inline"]["uploads_per_s"]:
+        report["pool_speedup"] = round(report["pool"]["uploads_per_s"] / report["inline"]["uploads_per_s"], 2)
+    return report
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(main_async(args))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
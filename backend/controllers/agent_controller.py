@@ -1,50 +1,99 @@
+import asyncio
 import uuid
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from controllers.request_models.agent_models import AgentRequest, AgentResponse, SaveAgentRequest
+from controllers.request_models.agent_models import AgentJobRequest, AgentRequest, AgentResponse, SaveAgentRequest, \
+    AgentPageResponse, AgentSummaryResponse
 from llm.decision_maker import LangChainAgent
 from llm.decision_maker.tools.utils import process_agent_stream
+from jobs.queue import QueueFull, describe
+from jobs.runner import job_handler, submit_job
 from middleware.with_admin import verify_admin
 from models import TwitterUsers,KnowledgeBase, LlmProvider, Chain, Agents, AuthPayload
-from utils.database import get_db
+from models.chain import agent_chain, agent_knowledge_base, agent_llm_provider
+from utils.catalog_cache import catalog_cache
+from utils.database import get_async_db
+from utils.tracing import trace_span
 
 router = APIRouter(tags=["Agent"], prefix="/agent")
 
+def run_agent_chat(message: str, wallet_address: str) -> str:
+    with trace_span("agent.chat", wallet_address=wallet_address):
+        with trace_span("agent.build_graph"):
+            bot = LangChainAgent()
+        return process_agent_stream(bot.agent, bot.config, message + f"\nUser wallet address:{wallet_address}")
+
+
 #TODO if the user doesn't pay or authenticate endpoint must return error
 @router.post("/chat",response_model=AgentResponse)
 async def ask_agent(agent_request: AgentRequest):
     try:
-        bot = LangChainAgent()
-        response = process_agent_stream(bot.agent, bot.config, agent_request.message
-                                        + f"\nUser wallet address:{agent_request.wallet_address}")
-        return AgentResponse(response=response)
+        return AgentResponse(response=run_agent_chat(agent_request.message, agent_request.wallet_address))
     except Exception as e:
         print(f"Error occurred: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/jobs", status_code=202)
+async def submit_agent_chat(
+        agent_request: AgentJobRequest,
+        admin_payload: dict = Depends(verify_admin)
+):
+    """Run a chat as a background job, for conversations that outlast the connection; see /jobs."""
+    try:
+        job = await submit_job(
+            "agent.chat",
+            str(admin_payload['user_id']),
+            {"message": agent_request.message, "wallet_address": agent_request.wallet_address},
+            str(agent_request.webhook_url) if agent_request.webhook_url else None,
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return describe(job)
+
+
+@job_handler("agent.chat")
+async def agent_chat_job(user_id: str, payload: dict) -> dict:
+    # The agent's tools make blocking calls, so it runs on a thread of its own
+    response = await asyncio.to_thread(run_agent_chat, payload["message"], payload["wallet_address"])
+    return AgentResponse(response=response).model_dump()
+
+
+async def _resolve_ids(db: AsyncSession, model, names: List[str]):
+    """Catalog ids for ``names`` in request order, or None if any name is unknown."""
+    unique_names = list(dict.fromkeys(names))
+    ids_by_name = (await catalog_cache.get(db, model)).ids_by_name
+    if any(name not in ids_by_name for name in unique_names):
+        # It may have been created on another worker since we cached the catalog
+        catalog_cache.invalidate(model.__tablename__)
+        ids_by_name = (await catalog_cache.get(db, model)).ids_by_name
+        if any(name not in ids_by_name for name in unique_names):
+            return None
+    return [ids_by_name[name] for name in unique_names]
+
+
 @router.post("/save")
 async def save_agent(
         save_agent_request: SaveAgentRequest,
         admin_payload: dict = Depends(verify_admin),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    # Fetch knowledge bases
-    knowledge_bases = [db.query(KnowledgeBase).filter(KnowledgeBase.name == knowledge_base).first() for knowledge_base in save_agent_request.knowledge_bases]
-    # Fetch LLM provider
-    llm_provider = db.query(LlmProvider).filter(LlmProvider.name == save_agent_request.llm_provider).first()
-    # Fetch chains
-    chains = [db.query(Chain).filter(Chain.name == chain).first() for chain in save_agent_request.chains]
+    # Resolve every referenced name from the cached catalog
+    knowledge_bases = await _resolve_ids(db, KnowledgeBase, save_agent_request.knowledge_bases)
+    llm_providers = await _resolve_ids(db, LlmProvider, [save_agent_request.llm_provider])
+    chains = await _resolve_ids(db, Chain, save_agent_request.chains)
     # Fetch user
     payload = AuthPayload(**admin_payload)
-    user = db.query(TwitterUsers).filter(TwitterUsers.user_id == payload.user_id).first()
-    if any(kb is None for kb in knowledge_bases) and len(save_agent_request.knowledge_bases) > 0:
+    user = (await db.execute(select(TwitterUsers).where(TwitterUsers.user_id == payload.user_id))).scalars().first()
+    if knowledge_bases is None:
         raise HTTPException(status_code=400, detail="Invalid knowledge base ID")
-    if llm_provider is None:
+    if llm_providers is None:
         raise HTTPException(status_code=400, detail="Invalid LLM provider ID")
-    if any(ch is None for ch in chains):
+    if chains is None:
         raise HTTPException(status_code=400, detail="Invalid chain ID")
     if user is None:
         raise HTTPException(status_code=400, detail="Invalid user ID")
@@ -55,48 +104,82 @@ async def save_agent(
         name=save_agent_request.name,
         description=save_agent_request.description,
         is_on_point_system=False,
+        user_id=user.id,
     )
 
-    agent.knowledge_bases = knowledge_bases
-    agent.llm_providers = [llm_provider]
-    agent.chains = chains
-    agent.user = user
-
+    # The agent row and its association rows are written in one transaction
     db.add(agent)
-    db.commit()
-    db.refresh(agent)  # Refresh to get the updated instance with ID
+    await db.flush()
+    for table, column, ids in (
+            (agent_knowledge_base, "knowledge_base_id", knowledge_bases),
+            (agent_llm_provider, "llm_provider_id", llm_providers),
+            (agent_chain, "chain_id", chains),
+    ):
+        if ids:
+            await db.execute(insert(table), [{"agent_id": agent.id, column: row_id} for row_id in ids])
+    await db.commit()
 
     return AgentResponse(response=f"Agent {agent.name} saved successfully.")
 
-@router.get("/my")
+async def _with_links(db: AsyncSession, rows) -> List[AgentSummaryResponse]:
+    """Attach chains and LLM providers to projected agent rows from the association tables and the catalog cache."""
+    agents = {row.id: {**row._mapping, "chains": [], "llm_providers": []} for row in rows}
+    if not agents:
+        return []
+    for link, column, model, field in (
+            (agent_chain, agent_chain.c.chain_id, Chain, "chains"),
+            (agent_llm_provider, agent_llm_provider.c.llm_provider_id, LlmProvider, "llm_providers"),
+    ):
+        catalog = (await catalog_cache.get(db, model)).rows_by_id
+        links = await db.execute(select(link.c.agent_id, column).where(link.c.agent_id.in_(agents)))
+        for agent_id, row_id in links:
+            if row_id in catalog:
+                agents[agent_id][field].append(catalog[row_id])
+    return [AgentSummaryResponse(**agent) for agent in agents.values()]
+
+
+AGENT_COLUMNS = (Agents.id, Agents.name, Agents.description, Agents.is_on_point_system)
+
+
+@router.get("/my", response_model=AgentPageResponse)
 async def get_my_agents(
-        db: Session = Depends(get_db),
+        limit: int = Query(50, ge=1, le=200),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        db: AsyncSession = Depends(get_async_db),
         admin_payload: dict = Depends(verify_admin)
 ):
     payload = AuthPayload(**admin_payload)
-    user = db.query(TwitterUsers).filter(TwitterUsers.user_id == str(payload.user_id)).first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="Users not found")
-    
-    # Update the query to include related llm_providers and chains
-    agents = db.query(Agents).options(joinedload(Agents.llm_providers), joinedload(Agents.chains)).filter(Agents.user_id == user.id).all()
-    return agents
+    # Keyset pagination on (user_id, id); one extra row tells whether another page exists
+    query = (
+        select(*AGENT_COLUMNS)
+        .join(TwitterUsers, Agents.user_id == TwitterUsers.id)
+        .where(TwitterUsers.user_id == str(payload.user_id))
+        .order_by(Agents.id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(Agents.id > cursor)
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return AgentPageResponse(
+        agents=await _with_links(db, rows),
+        has_more=has_more,
+        next_cursor=rows[-1].id if has_more else None,
+    )
 
-@router.get("/my/{agent_id}")
+@router.get("/my/{agent_id}", response_model=AgentSummaryResponse)
 async def get_my_agent(
         agent_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         admin_payload: dict = Depends(verify_admin)
 ):
     payload = AuthPayload(**admin_payload)
-    users = db.query(Agents).filter(Agents.user_id == payload.user_id).all()
-    if len(users) == 0:
-        raise HTTPException(status_code=404, detail="Users not found")
-    if len(users) > 1:
-        raise HTTPException(status_code=500, detail="More than 1 user found")
-    agents = db.query(Agents).filter(Agents.user_id == payload.user_id and Agents.id == agent_id).all()
-    if len(agents) == 0:
+    row = (await db.execute(
+        select(*AGENT_COLUMNS)
+        .join(TwitterUsers, Agents.user_id == TwitterUsers.id)
+        .where(TwitterUsers.user_id == str(payload.user_id), Agents.id == agent_id)
+    )).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Agent not found")
-    if len(agents) > 1:
-        raise HTTPException(status_code=500, detail="More than 1 agent found")
-    return agents[0]
+    return (await _with_links(db, [row]))[0]
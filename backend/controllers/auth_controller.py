@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 import os
 from datetime import datetime
@@ -12,7 +13,7 @@ from models.auth import AuthPayload
 from models import RegisteredUser, SpecialUserCode, Admin, UserWallet, TwitterUsers
 from models.chain import Transaction
 from pydantic import BaseModel
-from utils.database import get_db
+from utils.database import get_async_db
 from middleware.with_admin import verify_admin
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -21,10 +22,10 @@ class UserIdRequest(BaseModel):
     user_id: str
 
 @router.post("/admin")
-async def admin_login(admin_request: AdminRequest, db: Session = Depends(get_db)):
+async def admin_login(admin_request: AdminRequest, db: AsyncSession = Depends(get_async_db)):
     try:
         # Verify admin exists in database using user_id
-        admin = db.query(Admin).filter(Admin.user_id == admin_request.wallet_address).first()
+        admin = (await db.execute(select(Admin).where(Admin.user_id == admin_request.wallet_address))).scalars().first()
         if not admin:
             raise HTTPException(status_code=403, detail="Unauthorized")
 
@@ -39,22 +40,22 @@ async def admin_login(admin_request: AdminRequest, db: Session = Depends(get_db)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/admin")
-async def admin_check(admin_payload: dict = Depends(verify_admin), db: Session = Depends(get_db)):
-    admin = db.query(Admin).filter(Admin.user_id == admin_payload["user_id"]).first()
+async def admin_check(admin_payload: dict = Depends(verify_admin), db: AsyncSession = Depends(get_async_db)):
+    admin = (await db.execute(select(Admin).where(Admin.user_id == admin_payload["user_id"]))).scalars().first()
     if not admin:
         raise HTTPException(status_code=403, detail="Unauthorized")
     return {"message": "Authorized", "isAdmin": True}
 
 @router.get("/codes")
-async def get_codes(db: Session = Depends(get_db), admin_payload: dict = Depends(verify_admin)):
+async def get_codes(db: AsyncSession = Depends(get_async_db), admin_payload: dict = Depends(verify_admin)):
     try:
-        codes = db.query(SpecialUserCode).all()
+        codes = (await db.execute(select(SpecialUserCode))).scalars().all()
         return {"codes": codes, "timestamp": datetime.utcnow().isoformat()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/register")
-async def register_user(request: RegisterUserRequest, db: Session = Depends(get_db)):
+async def register_user(request: RegisterUserRequest, db: AsyncSession = Depends(get_async_db)):
     if not request.tx_hash or not request.user_id:
         raise HTTPException(status_code=400, detail="Missing parameters")
 
@@ -65,7 +66,7 @@ async def register_user(request: RegisterUserRequest, db: Session = Depends(get_
     # Create and save registered user
     registered_user = RegisteredUser(user_id=request.user_id)  # Adjusted
     db.add(registered_user)
-    db.commit()
+    await db.commit()
 
     return {"message": "Subscription registered successfully", "user": {"user_id": registered_user.user_id}}  # Adjusted
 
@@ -78,18 +79,18 @@ async def generate_token(request: GenerateTokenRequest):
     return {"token": token}
 
 @router.post("/check")
-async def check_user(request: CheckTokenRequest, db: Session = Depends(get_db)):
+async def check_user(request: CheckTokenRequest, db: AsyncSession = Depends(get_async_db)):
     if not request.user_id:
         raise HTTPException(status_code=400, detail="user_id cannot be null")
 
-    user = db.query(RegisteredUser).filter(RegisteredUser.user_id == request.user_id).first()
+    user = (await db.execute(select(RegisteredUser).where(RegisteredUser.user_id == request.user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     return {"message": "User check successful", "isAllowed": True}
 
 @router.post("/wallet")
-async def create_wallet(request: CreateWalletRequest, db: Session = Depends(get_db)):
+async def create_wallet(request: CreateWalletRequest, db: AsyncSession = Depends(get_async_db)):
     auth_header = request.headers.get("Authorization")
     
     if not auth_header or not auth_header.startswith("Bearer "):
@@ -106,7 +107,7 @@ async def create_wallet(request: CreateWalletRequest, db: Session = Depends(get_
         user_id = payload.get("user_id")
         
         # Check if user exists
-        user = db.query(RegisteredUser).filter(RegisteredUser.user_id == user_id).first()  # Adjusted
+        user = (await db.execute(select(RegisteredUser).where(RegisteredUser.user_id == user_id))).scalars().first()  # Adjusted
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
             
@@ -117,7 +118,7 @@ async def create_wallet(request: CreateWalletRequest, db: Session = Depends(get_
             user_id=user_id
         )
         db.add(wallet)
-        db.commit()
+        await db.commit()
 
         return {"message": "Wallet created successfully", "walletAddress": wallet.wallet_address}
     
@@ -125,16 +126,16 @@ async def create_wallet(request: CreateWalletRequest, db: Session = Depends(get_
         raise HTTPException(status_code=401, detail="Invalid token")
 
 @router.post("/code/check")
-async def check_code(request: CheckSpecialCodeRequest, db: Session = Depends(get_db)):
+async def check_code(request: CheckSpecialCodeRequest, db: AsyncSession = Depends(get_async_db)):
     if not request.code:
         raise HTTPException(status_code=400, detail="Code is required")
     
     try:
         # Find the code
-        user_code = db.query(SpecialUserCode).filter(
+        user_code = (await db.execute(select(SpecialUserCode).where(
             SpecialUserCode.code == request.code,
             SpecialUserCode.is_used == False
-        ).first()
+        ))).scalars().first()
         
         if not user_code:
             return {"exists": False}
@@ -146,69 +147,69 @@ async def check_code(request: CheckSpecialCodeRequest, db: Session = Depends(get
         # Register the user
         registered_user = RegisteredUser(user_id=request.user_id)  # Adjusted
         db.add(registered_user)
-        db.commit()
+        await db.commit()
         
         return {"exists": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/code/generate")
-async def generate_code(db: Session = Depends(get_db), admin_payload: dict = Depends(verify_admin)):
+async def generate_code(db: AsyncSession = Depends(get_async_db), admin_payload: dict = Depends(verify_admin)):
     # Generate a random code
     random_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
     
     # Create the code in the database
     code = SpecialUserCode(code=random_code, used_by="")
     db.add(code)
-    db.commit()
+    await db.commit()
     
     return {"code": code.code}
 
 @router.delete("/code")
-async def delete_code(request: DeleteSpecialCodeByAdminRequest, db: Session = Depends(get_db), admin_payload: dict = Depends(verify_admin)):
+async def delete_code(request: DeleteSpecialCodeByAdminRequest, db: AsyncSession = Depends(get_async_db), admin_payload: dict = Depends(verify_admin)):
 
     if not request.code_id:
         raise HTTPException(status_code=400, detail="ID is required")
     
     try:
-        code = db.query(SpecialUserCode).filter(SpecialUserCode.id == request.code_id).first()
+        code = (await db.execute(select(SpecialUserCode).where(SpecialUserCode.id == request.code_id))).scalars().first()
         if not code:
             raise HTTPException(status_code=404, detail="Code not found")
         
-        db.delete(code)
-        db.commit()
+        await db.delete(code)
+        await db.commit()
         
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/code/use")
-async def use_code(request: UseSpecialCodeByAdminRequest, db: Session = Depends(get_db)):
+async def use_code(request: UseSpecialCodeByAdminRequest, db: AsyncSession = Depends(get_async_db)):
     if not request.code_id:
         raise HTTPException(status_code=400, detail="ID is required")
     
     try:
-        code = db.query(SpecialUserCode).filter(SpecialUserCode.id == request.code_id).first()
+        code = (await db.execute(select(SpecialUserCode).where(SpecialUserCode.id == request.code_id))).scalars().first()
         if not code:
             raise HTTPException(status_code=404, detail="Code not found")
         
         code.is_used = True
-        db.commit()
+        await db.commit()
         
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/code/verify")
-async def verify_code(request: VerifySpecialCodeByAdminRequest, db: Session = Depends(get_db), admin_payload: dict = Depends(verify_admin)):
+async def verify_code(request: VerifySpecialCodeByAdminRequest, db: AsyncSession = Depends(get_async_db), admin_payload: dict = Depends(verify_admin)):
     if not request.code:
         raise HTTPException(status_code=400, detail="Code is required")
     
     try:
-        code = db.query(SpecialUserCode).filter(
+        code = (await db.execute(select(SpecialUserCode).where(
             SpecialUserCode.code == request.code,
             SpecialUserCode.is_used == False
-        ).first()
+        ))).scalars().first()
         
         if code:
             return {"exists": True}
@@ -219,13 +220,13 @@ async def verify_code(request: VerifySpecialCodeByAdminRequest, db: Session = De
 
 
 @router.post("/save/lazor")
-async def save_lazor(request:LazorRequest, db: Session = Depends(get_db)):
+async def save_lazor(request:LazorRequest, db: AsyncSession = Depends(get_async_db)):
     user_id = random.Random().randint(100,100000)
-    user= db.query(TwitterUsers).filter(TwitterUsers.user_id == request.user_id).first()
+    user= (await db.execute(select(TwitterUsers).where(TwitterUsers.user_id == request.user_id))).scalars().first()
     if not user:
         twitter_user = TwitterUsers(id=user_id,user_id=request.user_id,username=request.username)
         db.add(twitter_user)
-        db.commit()
+        await db.commit()
         return {"success": True, "user":{
             "id": twitter_user.id,
             "username": twitter_user.username,
@@ -1,40 +1,110 @@
+import asyncio
 import uuid
 from base64 import b64encode
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import base64
+import json
 import os
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, File, Depends, HTTPException, UploadFile, Form
-import torch
-from TTS.api import TTS
-from TTS.tts.configs.xtts_config import XttsArgs,XttsConfig,XttsAudioConfig
-from TTS.config.shared_configs import BaseDatasetConfig
-from sqlalchemy.orm import Session
-from starlette.responses import StreamingResponse
+from fastapi import APIRouter, File, Depends, HTTPException, UploadFile, Form, Request
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
 
 from controllers.request_models.voice_models import VoiceRequest, VoiceGenerateRequest
 import os
+from jobs.queue import QueueFull, describe
+from jobs.runner import PermanentJobError, job_handler, submit_job
 from middleware.with_admin import verify_admin
-from models.user import Voices
+from models.user import UserVoice, Voices
+from synthesis.server import SynthesisBusy, get_synthesis_server
+from utils.audio_cache import cache_key, get_audio_cache
+from utils.audio_upload import UnsupportedAudio, UploadTooLarge, read_audio_upload
 from utils.constants.environment_keys import EnvironmentKeys
-from utils.database import get_db
+from utils.blob_store import CHUNK_SIZE, BlobNotFound, get_blob_store
+from utils.database import get_async_db, get_async_session_factory
 from utils.environment_manager import EnvironmentManager, get_environment_manager
+from utils.logger import logger
+from utils.responses import blob_response, etag_matches
 from utils.voice import get_dummy_voice_bytes
-
-torch.serialization.add_safe_globals([XttsConfig])
-torch.serialization.add_safe_globals([XttsAudioConfig])
-torch.serialization.add_safe_globals([XttsArgs])
-torch.serialization.add_safe_globals([BaseDatasetConfig])
+from utils.voice_encryption import encrypt_stream
 
 router = APIRouter(prefix="/voice", tags=["Clone Voice"])
 
+# Encrypted voices larger than this wait on disk until they are sent
+ENCRYPTED_SPOOL_SIZE = 4 * 1024 * 1024
+
+
+async def normalize_speaker_reference(audio_hash: Optional[str], voice_bytes: Optional[bytes] = None) -> str:
+    """Decode, downmix, resample and trim a voice's recording on a worker and store the
+    result; returns its digest. Inline (legacy) audio is sent along, otherwise the worker
+    reads the blob itself.
+    """
+    if voice_bytes is not None:
+        reference = await get_synthesis_server().normalize_reference(audio=voice_bytes)
+    else:
+        reference = await get_synthesis_server().normalize_reference(audio_hash=audio_hash)
+    return await get_blob_store().put(reference)
+
+
+async def compute_speaker_latents(reference_hash: str) -> str:
+    """Compute a voice's TTS conditioning latents on a worker and store them; returns their digest."""
+    latents = await get_synthesis_server().compute_latents(audio_hash=reference_hash)
+    return await get_blob_store().put(latents)
+
+
+async def ensure_speaker_latents(db: AsyncSession, voice: Voices):
+    """Voices cloned before references and latents were stored get them on first use."""
+    if not voice.latents_hash:
+        if not voice.reference_hash:
+            voice.reference_hash = await normalize_speaker_reference(voice.audio_hash, voice.voice_bytes)
+        voice.latents_hash = await compute_speaker_latents(voice.reference_hash)
+        await db.commit()
+
+
+def synthesis_cache_key(text: str, latents_hash: str) -> str:
+    """Audio cache key of a phrase in a voice. The latents stand in for the voice, so a
+    voice whose audio is replaced gets fresh entries."""
+    return cache_key(
+        text,
+        latents=latents_hash,
+        language="en",
+        model=get_synthesis_server().config.model_name,
+        quantization=get_synthesis_server().config.quantization,
+    )
+
+
+async def read_spooled(file) -> AsyncIterator[bytes]:
+    """A temporary file's contents from the start, closing it once read."""
+    try:
+        file.seek(0)
+        while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+async def encrypted_voice_json(voice_id: str, filename: Optional[str], ciphertext: AsyncIterator[bytes]):
+    """The share-for-training response body, base64-encoding the encrypted voice a chunk at a time."""
+    yield b'{"id": ' + json.dumps(voice_id).encode() + b', "original_filename": ' + json.dumps(filename).encode()
+    yield b', "encrypted_voice": "'
+    carry = b""
+    async for chunk in ciphertext:
+        # Whole 3-byte groups only, so the pieces concatenate to one valid base64 string
+        chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % 3
+        carry = chunk[cut:]
+        yield b64encode(chunk[:cut])
+    yield b64encode(carry) + b'"}'
+
+
 @router.post("/clone")
 async def clone_voice(
     audio_file: UploadFile = File(...),
     admin_payload: dict = Depends(verify_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
         if not audio_file.content_type.startswith('audio/'):
@@ -43,124 +113,246 @@ async def clone_voice(
                 detail="Invalid file type. Please upload an audio file."
             )
             
-        content = await audio_file.read()
+        # Streamed into the blob store, hashed on the way, a chunk at a time
+        audio_hash = await get_blob_store().put_stream(await read_audio_upload(audio_file))
+
+        # Done once here so synthesis never has to preprocess the reference audio;
+        # if it fails, the first synthesis with this voice does it instead
+        reference_hash = latents_hash = None
+        try:
+            reference_hash = await normalize_speaker_reference(audio_hash)
+            latents_hash = await compute_speaker_latents(reference_hash)
+        except Exception as e:
+            logger.error(f"Preparing the voice for synthesis failed: {e}")
+
         user_voice_data = Voices(
             voice_id=str(uuid.uuid4()),
-            voice_bytes=content,
+            audio_hash=audio_hash,
+            reference_hash=reference_hash,
+            latents_hash=latents_hash,
             share_for_training=False,
             user_id=admin_payload['user_id']
         )
         db.add(user_voice_data)
-        db.commit()
-        db.refresh(user_voice_data)
+        await db.commit()
+        await db.refresh(user_voice_data)
 
         return {"message": "Voice cloned successfully"}
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedAudio as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/my")
 async def get_my_voices(
     admin_payload: dict = Depends(verify_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    """
+    Metadata of the user's voices; the audio itself is served by /voice/{voice_id}/audio.
+    """
     try:
-        user_voices = db.query(Voices).filter(Voices.user_id == admin_payload['user_id']).all()
-        
-        # Prepare the response data, excluding binary data or encoding it
-        response_data = [
+        user_voices = (await db.execute(
+            select(Voices.voice_id, Voices.name, Voices.share_for_training, Voices.user_id, Voices.created_at)
+            .where(Voices.user_id == admin_payload['user_id'])
+        )).all()
+
+        return [
             {
                 "voice_id": voice.voice_id,
+                "name": voice.name,
                 "share_for_training": voice.share_for_training,
                 "user_id": voice.user_id,
-                # Ensure that voice_bytes is accessed correctly and encoded
-                "voice_bytes": b64encode(voice.voice_bytes).decode('utf-8') if voice.voice_bytes else None
+                "created_at": voice.created_at.isoformat() if voice.created_at else None,
             }
             for voice in user_voices
         ]
-        
-        return response_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{voice_id}/audio")
+async def get_voice_audio(
+    voice_id: str,
+    request: Request,
+    admin_payload: dict = Depends(verify_admin),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Stream a voice's audio, with Range and If-None-Match support.
+    """
+    voice = (await db.execute(select(Voices.id, Voices.audio_hash).where(
+        Voices.user_id == admin_payload['user_id'],
+        Voices.voice_id == voice_id
+    ))).first()
+    if not voice:
+        raise HTTPException(status_code=404, detail="Voice not found")
+
+    audio_hash = voice.audio_hash
+    if audio_hash is None:
+        # Not moved to the blob store yet, so move it now
+        voice_bytes = (await db.execute(select(Voices.voice_bytes).where(Voices.id == voice.id))).scalar()
+        if voice_bytes is None:
+            raise HTTPException(status_code=404, detail="Voice audio not found")
+        audio_hash = await get_blob_store().put(voice_bytes)
+        await db.execute(update(Voices).where(Voices.id == voice.id).values(audio_hash=audio_hash, voice_bytes=None))
+        await db.commit()
+
+    try:
+        return await blob_response(request, get_blob_store(), audio_hash, "audio/wav")
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="Voice audio not found")
+
+
+@router.delete("/{voice_id}")
+async def delete_voice(
+    voice_id: str,
+    admin_payload: dict = Depends(verify_admin),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Delete a voice and the audio synthesized with it. Its blobs stay, since identical
+    uploads share them.
+    """
+    voice = (await db.execute(select(Voices.id).where(
+        Voices.user_id == admin_payload['user_id'],
+        Voices.voice_id == voice_id
+    ))).first()
+    if not voice:
+        raise HTTPException(status_code=404, detail="Voice not found")
+
+    await db.execute(delete(UserVoice).where(UserVoice.voice_id == voice.id))
+    await db.execute(delete(Voices).where(Voices.id == voice.id))
+    await db.commit()
+    await get_audio_cache().invalidate(voice_id)
+    return {"message": "Voice deleted successfully"}
+
+
 @router.post("/synthesize")
 async def generate_voice(
     voice_request: VoiceGenerateRequest,
+    request: Request,
     admin_payload: dict = Depends(verify_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    temp_voice_path = None
-    output_path = None
-    
     try:
+        # Whitespace only makes the engine produce no audio at all
+        if not voice_request.text.strip():
+            raise HTTPException(status_code=400, detail="No text to synthesize")
+
         # Get the user's voice from the database
-        user_voice = db.query(Voices).filter(
+        user_voice = (await db.execute(select(Voices).where(
             Voices.user_id == admin_payload['user_id'],
             Voices.voice_id == voice_request.voice_id
-        ).first()
+        ))).scalars().first()
         
         if not user_voice:
             raise HTTPException(status_code=404, detail="Voice not found")
 
-        # Create temporary file paths with absolute paths
-        import tempfile
-        
-        # Create temporary files with unique names
-        temp_voice_fd, temp_voice_path = tempfile.mkstemp(suffix='.wav')
-        output_fd, output_path = tempfile.mkstemp(suffix='.wav')
-        
-        # Close the file descriptors
-        os.close(temp_voice_fd)
-        os.close(output_fd)
+        if voice_request.background:
+            job = await submit_job(
+                "voice.synthesize",
+                str(admin_payload['user_id']),
+                {"text": voice_request.text, "voice_id": voice_request.voice_id},
+                str(voice_request.webhook_url) if voice_request.webhook_url else None,
+            )
+            return JSONResponse(describe(job), status_code=202)
 
-        # Write voice bytes to temporary file
-        with open(temp_voice_path, "wb") as f:
-            f.write(user_voice.voice_bytes)
+        await ensure_speaker_latents(db, user_voice)
 
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        
-        # Initialize TTS
-        tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(device)
+        # Same phrase in the same voice: serve the audio made last time
+        audio_cache = get_audio_cache()
+        key = synthesis_cache_key(voice_request.text, user_voice.latents_hash)
+        headers = {"Content-Disposition": "attachment; filename=response.wav", "ETag": f'"{key}"'}
+        if etag_matches(request, f'"{key}"'):
+            return Response(status_code=304, headers={"ETag": headers["ETag"]})
+        cached_path = await audio_cache.get(user_voice.voice_id, key)
+        if cached_path is not None:
+            return FileResponse(cached_path, media_type="audio/wav", headers=headers)
 
-        # Generate audio
-        tts.tts_to_file(
-            text=voice_request.text,
-            speaker_wav=temp_voice_path,
-            language="en",
-            file_path=output_path
-        )
+        if voice_request.stream:
+            chunks = await get_synthesis_server().synthesize_stream(
+                text=voice_request.text,
+                latents_hash=user_voice.latents_hash,
+                language="en",
+            )
+            # Wait for the first audio so that failures still get an error status
+            first_chunk = await anext(chunks, None)
+            if first_chunk is None:
+                raise HTTPException(status_code=500, detail="Synthesis produced no audio")
 
-        # Verify the output file exists and has content
-        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
-            raise HTTPException(status_code=500, detail="Failed to generate audio file")
+            async def audio_stream():
+                try:
+                    yield first_chunk
+                    async for chunk in chunks:
+                        yield chunk
+                finally:
+                    await chunks.aclose()
 
-        # Read the file and stream it
-        with open(output_path, "rb") as f:
-            audio_data = f.read()
+            return StreamingResponse(audio_stream(), media_type="audio/wav")
 
-        return StreamingResponse(
-            iter([audio_data]),
-            media_type="audio/wav",
-            headers={"Content-Disposition": "attachment; filename=response.wav"}
+        # Runs on the resident TTS workers, which keep the model and recent latents loaded
+        audio_data = await get_synthesis_server().synthesize(
+            text=voice_request.text,
+            latents_hash=user_voice.latents_hash,
+            language="en",
         )
+        try:
+            await audio_cache.put(user_voice.voice_id, key, audio_data)
+        except OSError as e:
+            logger.error(f"Caching synthesized audio failed: {e}")
+
+        return Response(audio_data, media_type="audio/wav", headers=headers)
 
+    except HTTPException:
+        raise
+    except SynthesisBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        # Clean up temporary files
-        for file_path in [temp_voice_path, output_path]:
-            if file_path and os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except Exception:
-                    pass
+
+
+@job_handler("voice.synthesize", media_type="audio/wav")
+async def synthesize_voice_job(user_id: str, payload: dict) -> bytes:
+    """``/voice/synthesize`` with ``background``: the same audio, kept as the job's result."""
+    async with get_async_session_factory()() as db:
+        user_voice = (await db.execute(select(Voices).where(
+            Voices.user_id == user_id,
+            Voices.voice_id == payload["voice_id"]
+        ))).scalars().first()
+        if not user_voice:
+            raise PermanentJobError("Voice not found")
+        await ensure_speaker_latents(db, user_voice)
+
+    audio_cache = get_audio_cache()
+    key = synthesis_cache_key(payload["text"], user_voice.latents_hash)
+    cached_path = await audio_cache.get(user_voice.voice_id, key)
+    if cached_path is not None:
+        with suppress(OSError):
+            return await asyncio.to_thread(Path(cached_path).read_bytes)
+
+    audio_data = await get_synthesis_server().synthesize(
+        text=payload["text"],
+        latents_hash=user_voice.latents_hash,
+        language="en",
+    )
+    try:
+        await audio_cache.put(user_voice.voice_id, key, audio_data)
+    except OSError as e:
+        logger.error(f"Caching synthesized audio failed: {e}")
+    return audio_data
 
 @router.post("/share-for-training")
 async def share_voice_for_training(
     audio_file: UploadFile = File(...),
     admin_payload: dict = Depends(verify_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     environment_manager: EnvironmentManager = Depends(get_environment_manager)
 ):
     """
@@ -173,47 +365,47 @@ async def share_voice_for_training(
                 detail="Invalid file type. Please upload an audio file."
             )
             
-        content = await audio_file.read()
-
-        # Get the private key from environment
         private_key = environment_manager.get_key(EnvironmentKeys.PRIVATE_KEY.name)
         if not private_key:
             raise HTTPException(status_code=500, detail="Private key not found in environment")
-        
-        # Generate a random salt
-        salt = os.urandom(16)  # 16 bytes = 128 bits is a common salt size
-        
-        # Convert the private key to a valid Fernet key using PBKDF2
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,  # Use the random salt
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(private_key.encode()))
-        f = Fernet(key)
-        
-        # Encrypt the voice data
-        encrypted_content = f.encrypt(content)
-        voice_id = str(uuid.uuid4())
-        user_voice_data = Voices(
-            voice_id=voice_id,
-            voice_bytes=get_dummy_voice_bytes(),
-            share_for_training=True,
-            salt=b64encode(salt).decode('utf-8'),
-            ipfs_hash="cid",
-            user_id=admin_payload['user_id']
+        chunks = await read_audio_upload(audio_file)
+
+        # The encryption key is derived from the private key and this salt
+        salt = os.urandom(16)
+        # Encrypted in full before the voice is saved or anything is sent, so an upload over
+        # the size limit or a failed encryption gets an error status and leaves no row.
+        # Spooled to disk past ENCRYPTED_SPOOL_SIZE, so memory stays bounded
+        ciphertext = tempfile.SpooledTemporaryFile(max_size=ENCRYPTED_SPOOL_SIZE)
+        try:
+            async for chunk in encrypt_stream(private_key, salt, chunks):
+                await asyncio.to_thread(ciphertext.write, chunk)
+
+            voice_id = str(uuid.uuid4())
+            user_voice_data = Voices(
+                voice_id=voice_id,
+                audio_hash=await get_blob_store().put(get_dummy_voice_bytes()),
+                share_for_training=True,
+                salt=b64encode(salt).decode('utf-8'),
+                ipfs_hash="cid",
+                user_id=admin_payload['user_id']
+            )
+            db.add(user_voice_data)
+            await db.commit()
+            await db.refresh(user_voice_data)
+        except BaseException:
+            ciphertext.close()
+            raise
+
+        return StreamingResponse(
+            encrypted_voice_json(voice_id, audio_file.filename, read_spooled(ciphertext)),
+            media_type="application/json",
         )
-        db.add(user_voice_data)
-        db.commit()
-        db.refresh(user_voice_data)
-
-        # Return the encrypted data and salt
-        return {
-            "id": voice_id,
-            "encrypted_voice": b64encode(encrypted_content).decode('utf-8'),
-            "original_filename": audio_file.filename
-        }
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedAudio as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -224,13 +416,13 @@ async def clone_ipfs_voice(
         voice_id: str,
         name: str,
         admin_payload: dict = Depends(verify_admin),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        user_voice_data = db.query(Voices).filter(
+        user_voice_data = (await db.execute(select(Voices).where(
             Voices.user_id == admin_payload['user_id'],
             Voices.voice_id == voice_id
-        ).first()
+        ))).scalars().first()
         
         if not user_voice_data:
             raise HTTPException(status_code=404, detail="Voice not found")
@@ -238,8 +430,8 @@ async def clone_ipfs_voice(
         user_voice_data.ipfs_hash = cid
         user_voice_data.name = name
         db.add(user_voice_data)
-        db.commit()
-        db.refresh(user_voice_data)
+        await db.commit()
+        await db.refresh(user_voice_data)
 
         return {"message": "Voice cloned successfully"}
     except Exception as e:
@@ -248,18 +440,18 @@ async def clone_ipfs_voice(
 @router.get("/ipfs")
 async def get_ipfs_voices(
     admin_payload: dict = Depends(verify_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Fetch all voices that have been saved to IPFS for the authenticated user.
     Only returns voices where ipfs_hash is not empty.
     """
     try:
-        user_voices = db.query(Voices).filter(
+        user_voices = (await db.execute(select(Voices).where(
             Voices.user_id == admin_payload['user_id'],
             Voices.ipfs_hash != "",
             Voices.ipfs_hash != None
-        ).all()
+        ))).scalars().all()
         
         # Prepare the response data
         response_data = [
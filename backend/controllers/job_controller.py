@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.responses import Response, StreamingResponse
+
+from jobs.queue import FINISHED, SUCCEEDED, describe, get_job_queue
+from jobs.runner import get_job_handler
+from middleware.with_admin import verify_admin
+from models.job import Jobs
+from utils.blob_store import BlobNotFound, get_blob_store
+from utils.responses import blob_response
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+async def _own_job(job_id: str, admin_payload: dict) -> Jobs:
+    job = await get_job_queue().get(job_id)
+    if job is None or job.user_id != str(admin_payload['user_id']):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+async def job_events(job_id: str, poll_interval: float):
+    """Server-sent ``status`` events whenever the job changes, ending once it has finished.
+
+    Polls the table, since the job may be running in another process.
+    """
+    last = None
+    while True:
+        job = await get_job_queue().get(job_id)
+        if job is None:
+            return
+        status = describe(job)
+        if status != last:
+            yield f"event: status\ndata: {json.dumps(status)}\n\n".encode()
+            last = status
+        if job.status in FINISHED:
+            return
+        await asyncio.sleep(poll_interval)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, admin_payload: dict = Depends(verify_admin)):
+    return describe(await _own_job(job_id, admin_payload))
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str, request: Request, admin_payload: dict = Depends(verify_admin)):
+    job = await _own_job(job_id, admin_payload)
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.result_hash is None:
+        return Response(job.result, media_type="application/json")
+    handler = get_job_handler(job.kind)
+    media_type = handler.media_type if handler else "application/octet-stream"
+    try:
+        return await blob_response(request, get_blob_store(), job.result_hash, media_type)
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="Job result not found")
+
+
+@router.get("/{job_id}/events")
+async def get_job_events(job_id: str, admin_payload: dict = Depends(verify_admin)):
+    """Follow a job until it finishes, as an alternative to a webhook."""
+    await _own_job(job_id, admin_payload)
+    return StreamingResponse(
+        job_events(job_id, get_job_queue().config.poll_interval),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
 from controllers.request_models.admin_models import CreateChainRequest, CreateKnowledgeBaseRequest, CreateLLMProviderRequest
-from models.chain import Chain, KnowledgeBase, LlmProvider, agent_chain, Agents
-from utils.database import get_db
+from models.chain import Chain, KnowledgeBase, LlmProvider, agent_chain, agent_knowledge_base, agent_llm_provider, Agents
+from utils.catalog_cache import catalog_cache
+from utils.database import get_async_db
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -12,10 +14,25 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 # TODO here: Implement method to authenticate admin login, validate credentials and generate JWT.
 # TODO Frontend app has a message checking for web3 wallet, handle that operation here
 
+
+async def _set_disabled(db: AsyncSession, model, row_id: str, disabled: bool) -> bool:
+    """Single UPDATE instead of load-modify-flush; returns whether the row exists."""
+    result = await db.execute(update(model).where(model.id == row_id).values(disabled=disabled))
+    await catalog_cache.commit(db, model)
+    return result.rowcount > 0
+
+
+async def _delete_with_links(db: AsyncSession, model, row_id: str, link_column) -> bool:
+    """Delete a catalog row and its agent association rows in one transaction."""
+    await db.execute(delete(link_column.table).where(link_column == row_id))
+    result = await db.execute(delete(model).where(model.id == row_id))
+    await catalog_cache.commit(db, model)
+    return result.rowcount > 0
+
 @router.post("/chain")
 async def add_chain(
     request: CreateChainRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         chain = Chain(
@@ -26,8 +43,7 @@ async def add_chain(
             disabled=request.disabled
         )
         db.add(chain)
-        db.commit()
-        db.refresh(chain)
+        await catalog_cache.commit(db, Chain)
         return chain
     except Exception as e:
         print(f"Error occurred: {e}")
@@ -36,147 +52,133 @@ async def add_chain(
 @router.delete("/chain/{chain_id}")
 async def delete_chain(
     chain_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    chain = db.query(Chain).filter(Chain.id == chain_id).first()
-    if chain is None:
+    if not await _delete_with_links(db, Chain, chain_id, agent_chain.c.chain_id):
         return {"message": "Chain not found"}
-    
-    db.delete(chain)
-    db.commit()
     return {"message": "Chain and associated agents deleted successfully"}
 
 @router.get("/chain")
 async def get_chains(
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    chains = db.query(Chain).all()
-    return chains
+    return await catalog_cache.response(request, db, Chain)
 
 @router.put("/chain/disable/{chain_id}")
 async def get_chain(
     chain_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    chain = db.query(Chain).filter(Chain.id == chain_id).first()
-    if chain is None:
+    if not await _set_disabled(db, Chain, chain_id, True):
         return {"message": "Chain not found"}
-    chain.disabled = True
-    db.commit()
     return {"message": "Chain disabled successfully"}
 
 @router.put("/chain/enable/{chain_id}")
 async def get_chain(
     chain_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    chain = db.query(Chain).filter(Chain.id == chain_id).first()
-    if chain is None:
+    if not await _set_disabled(db, Chain, chain_id, False):
         return {"message": "Chain not found"}
-    chain.disabled = False
-    db.commit()
     return {"message": "Chain enabled successfully"}
 
 @router.post("/kb")
 async def add_knowledge_base(
     request: CreateKnowledgeBaseRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     kb = KnowledgeBase(id=str(uuid.uuid4()),name=request.name,disabled=request.disabled)
     db.add(kb)
-    db.commit()
-    db.refresh(kb)
+    await catalog_cache.commit(db, KnowledgeBase)
     return kb
 
 @router.delete("/kb/{kb_id}")
 async def delete_knowledge_base(
     kb_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    kb = db.query(KnowledgeBase).filter(KnowledgeBase.id == kb_id).first()
-    if kb is None:
+    if not await _delete_with_links(db, KnowledgeBase, kb_id, agent_knowledge_base.c.knowledge_base_id):
         return {"message": "Knowledge base not found"}
-    db.delete(kb)
-    db.commit()
     return {"message": "Knowledge base deleted successfully"}
 
 @router.get("/kb")
 async def get_knowledge_bases(
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    kbs = db.query(KnowledgeBase).all()
-    return kbs
+    return await catalog_cache.response(request, db, KnowledgeBase)
 
 @router.put("/kb/disable/{kb_id}")
 async def get_knowledge_base(
     kb_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db.query(KnowledgeBase).filter(KnowledgeBase.id == kb_id).update({"disabled": True})
-    db.commit()
+    if not await _set_disabled(db, KnowledgeBase, kb_id, True):
+        return {"message": "Knowledge base not found"}
     return {"message": "Knowledge base disabled successfully"}
 
 @router.put("/kb/enable/{kb_id}")
 async def get_knowledge_base(
     kb_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db.query(KnowledgeBase).filter(KnowledgeBase.id == kb_id).update({"disabled": False})
-    db.commit()
+    if not await _set_disabled(db, KnowledgeBase, kb_id, False):
+        return {"message": "Knowledge base not found"}
     return {"message": "Knowledge base enabled successfully"}
 
 @router.post("/llm-providers")
 async def add_llm_provider(
     request: CreateLLMProviderRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     provider = LlmProvider(id=str(uuid.uuid4()),name=request.name, disabled=request.disabled)
     db.add(provider)
-    db.commit()
-    db.refresh(provider)
+    await catalog_cache.commit(db, LlmProvider)
     return provider
 
 @router.delete("/llm-providers/{provider_id}")
 async def delete_llm_provider(
     provider_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    provider = db.query(LlmProvider).filter(LlmProvider.id == provider_id).first()
-    if provider is None:
+    # Agents cascade with their provider; remove them and all of their association rows in bulk
+    agent_ids = (await db.execute(
+        select(agent_llm_provider.c.agent_id).where(agent_llm_provider.c.llm_provider_id == provider_id)
+    )).scalars().all()
+    if agent_ids:
+        for link_column in (agent_chain.c.agent_id, agent_knowledge_base.c.agent_id, agent_llm_provider.c.agent_id):
+            await db.execute(delete(link_column.table).where(link_column.in_(agent_ids)))
+        await db.execute(delete(Agents).where(Agents.id.in_(agent_ids)))
+    result = await db.execute(delete(LlmProvider).where(LlmProvider.id == provider_id))
+    await catalog_cache.commit(db, LlmProvider)
+    if result.rowcount == 0:
         return {"message": "LLM Provider not found"}
-    db.delete(provider)
-    db.commit()
     return {"message": "LLM Provider deleted successfully"}
 
 @router.get("/llm-providers")
 async def get_llm_providers(
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    providers = db.query(LlmProvider).all()
-    return providers
+    return await catalog_cache.response(request, db, LlmProvider)
 
 @router.put("/llm-providers/disable/{provider_id}")
 async def disable_llm_provider(
     provider_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    provider = db.query(LlmProvider).filter(LlmProvider.id == provider_id).first()
-    if provider is None:
+    if not await _set_disabled(db, LlmProvider, provider_id, True):
         return {"message": "LLM Provider not found"}
-    provider.disabled = True
-    db.commit()
     return {"message": "LLM Provider disabled successfully"}
 
 @router.put("/llm-providers/enable/{provider_id}")
 async def enable_llm_provider(
     provider_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    provider = db.query(LlmProvider).filter(LlmProvider.id == provider_id).first()
-    if provider is None:
+    if not await _set_disabled(db, LlmProvider, provider_id, False):
         return {"message": "LLM Provider not found"}
-    provider.disabled = False
-    db.commit()
     return {"message": "LLM Provider enabled successfully"}
 
 
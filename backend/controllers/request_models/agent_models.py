@@ -1,12 +1,18 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
+from jobs.webhooks import WebhookUrl
+
 
 class AgentRequest(BaseModel):
     message: str
     wallet_address:str
 
+class AgentJobRequest(AgentRequest):
+    # POSTed the job's status when the chat finishes
+    webhook_url: Optional[WebhookUrl] = None
+
 class AgentResponse(BaseModel):
     response: str
 
@@ -15,4 +21,32 @@ class SaveAgentRequest(BaseModel):
     description: str
     llm_provider: str
     chains: List[str]
-    knowledge_bases: List[str]
\ No newline at end of file
+    knowledge_bases: List[str]
+
+class AgentChainResponse(BaseModel):
+    id: str
+    name: str
+    icon: Optional[str] = None
+    is_embedded: Optional[bool] = None
+    disabled: Optional[bool] = None
+
+
+class AgentLlmProviderResponse(BaseModel):
+    id: str
+    name: str
+    disabled: Optional[bool] = None
+
+
+class AgentSummaryResponse(BaseModel):
+    id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+    is_on_point_system: Optional[bool] = None
+    chains: List[AgentChainResponse] = []
+    llm_providers: List[AgentLlmProviderResponse] = []
+
+
+class AgentPageResponse(BaseModel):
+    agents: List[AgentSummaryResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
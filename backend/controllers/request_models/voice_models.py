@@ -1,9 +1,19 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
+from jobs.webhooks import WebhookUrl
+
 
 class VoiceRequest(BaseModel):
     voice: bytes
 
 class VoiceGenerateRequest(BaseModel):
     text: str
-    voice_id: str
\ No newline at end of file
+    voice_id: str
+    # Send audio as it is generated: a WAV header with open-ended sizes, then PCM
+    stream: bool = False
+    # Answer 202 with a job at once instead of waiting for the audio; see /jobs
+    background: bool = False
+    # POSTed the job's status when a background synthesis finishes
+    webhook_url: Optional[WebhookUrl] = None
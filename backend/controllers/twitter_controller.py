@@ -1,12 +1,15 @@
-import requests
+import httpx
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import TwitterUsers
 from utils.constants.environment_keys import EnvironmentKeys
-from utils.database import get_db
+from utils.database import get_async_db
 from utils.environment_manager import get_environment_manager, EnvironmentManager
+from utils.oauth_state import get_oauth_state_store
+from utils.twitter_http import get_me, twitter_request
 import secrets
 import urllib.parse
 import base64
@@ -25,8 +28,6 @@ def generate_code_challenge(code_verifier):
     digest = hashlib.sha256(code_verifier.encode()).digest()
     return base64.urlsafe_b64encode(digest).decode("utf-8").rstrip("=")
 
-verifiers = {}
-
 # Using plain code challenge as shown in the documentation
 @router.get("/login")
 async def login(
@@ -37,15 +38,16 @@ async def login(
     REDIRECT_URI = f"{environment_manager.get_key(EnvironmentKeys.BACKEND_API_URL.name)}/api/twitter/callback"
     code_verifier = generate_code_verifier()
     code_challenge = generate_code_challenge(code_verifier)
-
-    request.session["code_verifier"] = code_verifier
+    # Left by logins started before the verifier moved to the state store
+    request.session.pop("code_verifier", None)
 
     # Use the exact format from X documentation
     scope = "tweet.read users.read"
     state = secrets.token_urlsafe(16)
     encoded_scope = urllib.parse.quote(scope, safe='')
     redirect_uri = urllib.parse.quote(REDIRECT_URI, safe='')
-    verifiers[state] = code_verifier
+    # Shared by all API processes, so the callback may land on any of them
+    await get_oauth_state_store().put(state, code_verifier)
 
     # Format the authorization URL exactly as shown in the documentation
     auth_url = (f"{AUTHORIZATION_URL}?"
@@ -65,14 +67,17 @@ async def login(
 async def callback(
     request: Request,
     code: str,
-    db: Session = Depends(get_db),
+    state: str,
+    db: AsyncSession = Depends(get_async_db),
     environment_manager: EnvironmentManager = Depends(get_environment_manager)
 ):
     REDIRECT_URI = f"{environment_manager.get_key(EnvironmentKeys.BACKEND_API_URL.name)}/api/twitter/callback"
     print(f"Received code: {code}")  # Log the received code
-    code_verifier = request.session.get("code_verifier")
+    request.session.pop("code_verifier", None)
+    # Only the store has the verifier: it returns it once, and not after the login's ttl
+    code_verifier = await get_oauth_state_store().pop(state)
     if code_verifier is None:
-        code_verifier = verifiers[request.query_params.get("state")]
+        raise HTTPException(status_code=400, detail="Unknown or expired login state")
     # Get client ID and client secret
     client_id = environment_manager.get_key(EnvironmentKeys.TWITTER_CLIENT_ID.name)
     client_secret = environment_manager.get_key(EnvironmentKeys.TWITTER_CLIENT_SECRET.name)
@@ -95,17 +100,17 @@ async def callback(
     }
 
     try:
-        token_response = requests.post(TOKEN_URL, data=data, headers=headers)
+        token_response = await twitter_request("POST", TOKEN_URL, data=data, headers=headers)
 
-        print(f"Token request data: {token_response.request.body}")  # Log the request body
+        print(f"Token request data: {token_response.request.content}")  # Log the request body
         print(f"Token response status: {token_response.status_code}")
         print(f"Token response content: {token_response.text}")
 
         token_response.raise_for_status()
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         error_msg = f"Failed to obtain access token: {str(e)}"
-        if hasattr(e, 'response') and e.response is not None:
+        if isinstance(e, httpx.HTTPStatusError):
             error_msg = f"{error_msg}. Response: {e.response.text}"
         raise HTTPException(status_code=400, detail=error_msg)
 
@@ -122,22 +127,18 @@ async def callback(
     # Step 5: Get user profile information
     user_data = None
     try:
-        user_response = requests.get('https://api.x.com/2/users/me', headers={
-            'Authorization': f'Bearer {token_data.get("access_token")}'
-        })
-        user_response.raise_for_status()
-        user_data = user_response.json()
+        user_data = await get_me(token_data.get("access_token"))
         user = {
             'id': user_data.get('data', {}).get('id'),
             'username': user_data.get('data', {}).get('username'),
             'name': user_data.get('data', {}).get('name')
         }
-        user_from_db = db.query(TwitterUsers).filter(TwitterUsers.user_id == user["id"]).first()
+        user_from_db = (await db.execute(select(TwitterUsers).where(TwitterUsers.user_id == user["id"]))).scalars().first()
         if user_from_db is None:
             db_user = TwitterUsers(user_id=user["id"], username=user["username"], name=user["name"])
             db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
+            await db.commit()
+            await db.refresh(db_user)
         request.session['user'] = user
         print(f"User data: {user_data}")
     except Exception as e: 
@@ -168,11 +169,7 @@ async def get_user(request: Request):
     if not user:
         try:
             # Try to fetch user profile if not in session
-            user_response = requests.get('https://api.x.com/2/users/me', headers={
-                'Authorization': f'Bearer {access_token}'
-            })
-            user_response.raise_for_status()
-            user_data = user_response.json()
+            user_data = await get_me(access_token)
             user = {
                 'id': user_data.get('data', {}).get('id'),
                 'username': user_data.get('data', {}).get('username'),
@@ -0,0 +1,72 @@
+"""Move inline ``Voices.voice_bytes`` audio into the blob store.
+
+Run after the ``voice_audio_blob_store`` Prisma migration, with the same blob store
+configuration as the API::
+
+    PYTHONPATH=. python -m data_migrations.move_voice_blobs --batch-size 100
+
+Rows are handled in primary-key order, one committed batch at a time, so the script can be
+stopped and rerun. ``--keep-bytes`` records the digest but leaves the inline copy in place.
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.user import Voices
+from utils.blob_store import BlobStore, get_blob_store
+from utils.database import get_async_engine, get_async_session_factory
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Move voice audio out of the Voices table")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--keep-bytes", action="store_true", help="Leave voice_bytes populated after copying")
+    return parser.parse_args()
+
+
+async def move_voice_blobs(session_factory: async_sessionmaker, store: BlobStore,
+                           batch_size: int = 100, keep_bytes: bool = False) -> dict:
+    moved = stored_bytes = 0
+    digests = set()
+    last_id = 0
+    while True:
+        async with session_factory() as db:
+            rows = (await db.execute(
+                select(Voices.id, Voices.voice_bytes)
+                .where(Voices.audio_hash.is_(None), Voices.voice_bytes.is_not(None), Voices.id > last_id)
+                .order_by(Voices.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            for row_id, voice_bytes in rows:
+                digest = await store.put(voice_bytes)
+                values = {"audio_hash": digest}
+                if not keep_bytes:
+                    values["voice_bytes"] = None
+                await db.execute(update(Voices).where(Voices.id == row_id).values(**values))
+                if digest not in digests:
+                    digests.add(digest)
+                    stored_bytes += len(voice_bytes)
+                moved += 1
+            await db.commit()
+            last_id = rows[-1].id
+    return {"moved": moved, "blobs": len(digests), "blob_bytes": stored_bytes}
+
+
+async def main_async(args) -> dict:
+    try:
+        return await move_voice_blobs(get_async_session_factory(), get_blob_store(), args.batch_size, args.keep_bytes)
+    finally:
+        await get_async_engine().dispose()
+
+
+def main():
+    print(json.dumps(asyncio.run(main_async(parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
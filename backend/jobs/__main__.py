@@ -0,0 +1,47 @@
+"""Run background jobs in a process of their own.
+
+Uses the API's database and blob store configuration::
+
+    PYTHONPATH=. python -m jobs --concurrency 4
+
+Start as many as needed, alongside the API or instead of the API's own runners
+(``JOBS_RUN_IN_APP=0``). Runners share the ``Jobs`` table, so a job is run by exactly
+one of them; one that is stopped puts its jobs back, and the jobs of one that dies are
+picked up once their lease expires.
+"""
+import argparse
+import asyncio
+import signal
+
+# Importing the controllers registers their job handlers
+from controllers import agent_controller, clone_voice_controller  # noqa: F401
+from jobs.queue import get_job_queue
+from jobs.runner import JobRunner
+from synthesis.server import get_synthesis_server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run queued background jobs")
+    parser.add_argument("--concurrency", type=int, help="Jobs to run at once (default JOBS_CONCURRENCY)")
+    return parser.parse_args()
+
+
+async def run(concurrency=None):
+    runner = JobRunner(get_job_queue(), concurrency)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    runner.start()
+    await stop.wait()
+    await runner.stop()
+    await asyncio.to_thread(get_synthesis_server().stop)
+
+
+def main():
+    args = parse_args()
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+
+
+@dataclass(frozen=True)
+class JobsConfig:
+    # Run jobs inside each API process; with 0, only `python -m jobs` processes run them
+    run_in_app: bool = True
+    # Jobs one runner process works on at once
+    concurrency: int = 4
+    # Per-user caps: jobs running across all runners, and jobs waiting or running before
+    # submissions get 429
+    max_running_per_user: int = 2
+    max_queued_per_user: int = 20
+    max_attempts: int = 3
+    # A runner renews the lease of each job it is running every third of this
+    lease_seconds: float = 60.0
+    # How often an idle runner looks for jobs submitted by other processes
+    poll_interval: float = 1.0
+    # Delay before the first retry, doubling with each further attempt
+    retry_backoff: float = 5.0
+    # Finished jobs are deleted after this long
+    retention_hours: float = 24.0
+    webhook_timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "JobsConfig":
+        environment = get_environment()
+        return cls(
+            run_in_app=environment.get_bool(EnvironmentKeys.JOBS_RUN_IN_APP.value),
+            concurrency=environment.get_int(EnvironmentKeys.JOBS_CONCURRENCY.value),
+            max_running_per_user=environment.get_int(EnvironmentKeys.JOBS_MAX_RUNNING_PER_USER.value),
+            max_queued_per_user=environment.get_int(EnvironmentKeys.JOBS_MAX_QUEUED_PER_USER.value),
+            max_attempts=environment.get_int(EnvironmentKeys.JOBS_MAX_ATTEMPTS.value),
+            lease_seconds=environment.get_float(EnvironmentKeys.JOBS_LEASE_SECONDS.value),
+            poll_interval=environment.get_float(EnvironmentKeys.JOBS_POLL_INTERVAL.value),
+            retry_backoff=environment.get_float(EnvironmentKeys.JOBS_RETRY_BACKOFF.value),
+            retention_hours=environment.get_float(EnvironmentKeys.JOBS_RETENTION_HOURS.value),
+            webhook_timeout=environment.get_float(EnvironmentKeys.JOBS_WEBHOOK_TIMEOUT.value),
+        )
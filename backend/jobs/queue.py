@@ -0,0 +1,227 @@
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from jobs.config import JobsConfig
+from models.job import Jobs
+from utils.database import get_async_session_factory
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# Due jobs a runner considers per claim; the rest wait for the next one
+CLAIM_BATCH = 20
+LEASE_EXPIRED = "The job's runner stopped responding"
+
+
+class QueueFull(Exception):
+    """The user already has as many jobs waiting or running as they are allowed."""
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() + "Z" if value is not None else None
+
+
+def describe(job: Jobs) -> dict:
+    """A job's status as served to its owner and posted to its webhook."""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": _isoformat(job.created_at),
+        "started_at": _isoformat(job.started_at),
+        "finished_at": _isoformat(job.finished_at),
+        "result_url": f"/jobs/{job.id}/result" if job.status == SUCCEEDED else None,
+    }
+
+
+class JobQueue:
+    """Jobs stored in the ``Jobs`` table, so that they outlive the request that submitted
+    them and any runner process, on SQLite and Postgres alike.
+
+    Runners claim a job with a conditional UPDATE rather than a row lock: the update only
+    matches while the job is still queued with the attempt count the runner read, so of
+    several runners racing for a job exactly one gets it. The attempt count then fences
+    the claim: a runner whose lease expired and whose job was handed on can no longer
+    complete, fail or renew it.
+    """
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None, config: Optional[JobsConfig] = None):
+        self._session_factory = session_factory
+        self.config = config or JobsConfig.from_env()
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        return self._session_factory or get_async_session_factory()
+
+    async def submit(self, kind: str, user_id: str, payload: dict, webhook_url: Optional[str] = None) -> Jobs:
+        async with self.session_factory() as db:
+            pending = (await db.execute(select(func.count()).select_from(Jobs).where(
+                Jobs.user_id == user_id, Jobs.status.in_([QUEUED, RUNNING])
+            ))).scalar()
+            if pending >= self.config.max_queued_per_user:
+                raise QueueFull(f"At most {self.config.max_queued_per_user} jobs can be waiting or running at once")
+            now = utcnow()
+            job = Jobs(
+                id=str(uuid.uuid4()),
+                kind=kind,
+                user_id=user_id,
+                status=QUEUED,
+                payload=json.dumps(payload),
+                attempts=0,
+                max_attempts=self.config.max_attempts,
+                webhook_url=webhook_url,
+                run_after=now,
+                created_at=now,
+            )
+            db.add(job)
+            await db.commit()
+            return job
+
+    async def get(self, job_id: str) -> Optional[Jobs]:
+        async with self.session_factory() as db:
+            return await db.get(Jobs, job_id)
+
+    async def claim(self, kinds: Iterable[str]) -> Optional[Jobs]:
+        """Start the oldest due job of one of ``kinds`` whose user is under the running cap."""
+        now = utcnow()
+        running = aliased(Jobs)
+        async with self.session_factory() as db:
+            candidates = (await db.execute(
+                select(Jobs.id, Jobs.user_id, Jobs.attempts)
+                .where(Jobs.status == QUEUED, Jobs.run_after <= now, Jobs.kind.in_(list(kinds)))
+                .order_by(Jobs.run_after)
+                .limit(CLAIM_BATCH)
+            )).all()
+            for candidate in candidates:
+                users_running = (
+                    select(func.count()).select_from(running)
+                    .where(running.user_id == candidate.user_id, running.status == RUNNING)
+                    .scalar_subquery()
+                )
+                claimed = await db.execute(
+                    update(Jobs)
+                    .where(Jobs.id == candidate.id, Jobs.status == QUEUED, Jobs.attempts == candidate.attempts,
+                           users_running < self.config.max_running_per_user)
+                    .values(status=RUNNING, attempts=candidate.attempts + 1, started_at=now,
+                            locked_until=now + timedelta(seconds=self.config.lease_seconds))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                if claimed.rowcount == 1:
+                    return await db.get(Jobs, candidate.id, populate_existing=True)
+        return None
+
+    async def _update_claimed(self, job: Jobs, **values) -> bool:
+        async with self.session_factory() as db:
+            updated = await db.execute(
+                update(Jobs)
+                .where(Jobs.id == job.id, Jobs.status == RUNNING, Jobs.attempts == job.attempts)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return updated.rowcount == 1
+
+    async def heartbeat(self, job: Jobs) -> bool:
+        """Renew a running job's lease; False if the job is no longer this runner's."""
+        return await self._update_claimed(job, locked_until=utcnow() + timedelta(seconds=self.config.lease_seconds))
+
+    async def complete(self, job: Jobs, result: Optional[str] = None, result_hash: Optional[str] = None) -> bool:
+        return await self._update_claimed(
+            job, status=SUCCEEDED, result=result, result_hash=result_hash, error=None,
+            locked_until=None, finished_at=utcnow(),
+        )
+
+    async def fail(self, job: Jobs, error: str, retry: bool = True) -> Optional[str]:
+        """Queue the job again after a backoff, or fail it for good once it is out of
+        attempts or ``retry`` is False. Returns its new status, or None if it is no longer
+        this runner's.
+        """
+        now = utcnow()
+        if retry and job.attempts < job.max_attempts:
+            delay = self.config.retry_backoff * 2 ** (job.attempts - 1)
+            status, values = QUEUED, {"run_after": now + timedelta(seconds=delay)}
+        else:
+            status, values = FAILED, {"finished_at": now}
+        if await self._update_claimed(job, status=status, error=error, locked_until=None, **values):
+            return status
+        return None
+
+    async def release(self, job: Jobs) -> bool:
+        """Put back a job its runner is shutting down on, without counting the attempt."""
+        return await self._update_claimed(job, status=QUEUED, attempts=job.attempts - 1, run_after=utcnow(),
+                                          locked_until=None)
+
+    async def expire_leases(self) -> List[Jobs]:
+        """Queue again, or fail, running jobs whose runner stopped renewing their lease.
+        Returns the ones that failed.
+        """
+        async with self.session_factory() as db:
+            expired = (await db.execute(
+                select(Jobs).where(Jobs.status == RUNNING, Jobs.locked_until < utcnow())
+            )).scalars().all()
+        failed = []
+        for job in expired:
+            if await self.fail(job, LEASE_EXPIRED) == FAILED:
+                failed.append(job)
+        return failed
+
+    async def delete_finished(self) -> int:
+        """Delete jobs that finished longer ago than the retention period."""
+        cutoff = utcnow() - timedelta(hours=self.config.retention_hours)
+        async with self.session_factory() as db:
+            deleted = await db.execute(
+                delete(Jobs).where(Jobs.status.in_(FINISHED), Jobs.finished_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return deleted.rowcount
+
+    async def metrics(self) -> dict:
+        """Queue depth: jobs waiting and running, by kind, and how long the oldest has waited."""
+        now = utcnow()
+        async with self.session_factory() as db:
+            rows = (await db.execute(
+                select(Jobs.kind, Jobs.status, func.count(), func.min(Jobs.created_at))
+                .where(Jobs.status.in_([QUEUED, RUNNING]))
+                .group_by(Jobs.kind, Jobs.status)
+            )).all()
+            due = (await db.execute(select(func.count()).select_from(Jobs).where(
+                Jobs.status == QUEUED, Jobs.run_after <= now
+            ))).scalar()
+        metrics = {QUEUED: 0, RUNNING: 0, "due": due, "oldest_queued_s": 0.0, "by_kind": {}}
+        for kind, status, count, oldest in rows:
+            metrics[status] += count
+            metrics["by_kind"].setdefault(kind, {QUEUED: 0, RUNNING: 0})[status] = count
+            if status == QUEUED:
+                metrics["oldest_queued_s"] = max(metrics["oldest_queued_s"], round((now - oldest).total_seconds(), 3))
+        return metrics
+
+
+_queue: Optional[JobQueue] = None
+_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        with _lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from jobs.queue import FAILED, QUEUED, SUCCEEDED, JobQueue, describe, get_job_queue
+from jobs.webhooks import send_webhook
+from models.job import Jobs
+from utils.blob_store import get_blob_store
+from utils.logger import logger
+
+# Finished jobs are deleted at most this often
+CLEANUP_INTERVAL = 3600.0
+
+JobOutput = Union[bytes, dict, list, str, None]
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures that retrying won't fix, such as a missing voice."""
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    run: Callable[[str, dict], Awaitable[JobOutput]]
+    # Of the result: bytes outputs are stored in the blob store, anything else as JSON
+    media_type: str
+
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str, media_type: str = "application/json"):
+    """Register ``async def handler(user_id, payload)`` as what runs jobs of ``kind``."""
+    def register(run):
+        _handlers[kind] = JobHandler(run, media_type)
+        return run
+    return register
+
+
+def get_job_handler(kind: str) -> Optional[JobHandler]:
+    return _handlers.get(kind)
+
+
+@dataclass
+class _Stats:
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    run_seconds: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class JobRunner:
+    """Works on up to ``concurrency`` jobs at once in this process's event loop.
+
+    Handlers await the TTS workers or run blocking work in threads, so one runner per
+    process is enough; more API processes or ``python -m jobs`` processes add capacity.
+    Jobs submitted in this process start at once, others within a poll interval.
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: Optional[int] = None):
+        self.queue = queue
+        self.config = queue.config
+        self.concurrency = concurrency or self.config.concurrency
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._active = 0
+        self._stats = _Stats()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+        logger.info(f"Job runner started with {self.concurrency} slots for {sorted(_handlers)}")
+
+    async def stop(self):
+        """Stop claiming jobs; the ones in progress are put back for another runner."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """A job was just submitted in this process."""
+        self._wake.set()
+
+    async def _work(self):
+        while True:
+            self._wake.clear()
+            try:
+                job = await self.queue.claim(list(_handlers))
+            except Exception as e:
+                logger.error(f"Claiming a job failed: {e}")
+                job = None
+            if job is None:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self.config.poll_interval)
+                continue
+            await self._run(job)
+
+    async def _maintain(self):
+        last_cleanup = 0.0
+        while True:
+            await asyncio.sleep(self.config.lease_seconds / 3)
+            try:
+                for job in await self.queue.expire_leases():
+                    await self._finished(job.id)
+                if time.monotonic() - last_cleanup > CLEANUP_INTERVAL:
+                    await self.queue.delete_finished()
+                    last_cleanup = time.monotonic()
+            except Exception as e:
+                logger.error(f"Job queue maintenance failed: {e}")
+
+    async def _heartbeat(self, job: Jobs):
+        while True:
+            await asyncio.sleep(self.config.lease_seconds / 3)
+            if not await self.queue.heartbeat(job):
+                logger.error(f"Job {job.id} was handed to another runner")
+                return
+
+    async def _run(self, job: Jobs):
+        handler = _handlers[job.kind]
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        started = time.perf_counter()
+        self._active += 1
+        try:
+            output = await handler.run(job.user_id, json.loads(job.payload))
+            if isinstance(output, bytes):
+                result, result_hash = None, await get_blob_store().put(output)
+            else:
+                result, result_hash = json.dumps(output), None
+        except asyncio.CancelledError:
+            await self.queue.release(job)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {e}")
+            status = await self.queue.fail(job, str(e) or type(e).__name__, retry=not isinstance(e, PermanentJobError))
+            if status == QUEUED:
+                self._stats.retried += 1
+            elif status == FAILED:
+                self._stats.failed += 1
+                await self._finished(job.id)
+            return
+        finally:
+            self._active -= 1
+            heartbeat.cancel()
+        self._stats.run_seconds.append(time.perf_counter() - started)
+        if await self.queue.complete(job, result, result_hash):
+            self._stats.succeeded += 1
+            await self._finished(job.id)
+
+    async def _finished(self, job_id: str):
+        job = await self.queue.get(job_id)
+        if job is not None and job.webhook_url:
+            await send_webhook(job.webhook_url, describe(job), self.config.webhook_timeout)
+
+    async def metrics(self) -> dict:
+        stats = self._stats
+        return {
+            "queue": await self.queue.metrics(),
+            "runner": {
+                "running": self.running,
+                "slots": self.concurrency,
+                "active": self._active,
+                SUCCEEDED: stats.succeeded,
+                FAILED: stats.failed,
+                "retried": stats.retried,
+                "run_p50_s": round(_percentile(stats.run_seconds, 50), 3),
+                "run_p95_s": round(_percentile(stats.run_seconds, 95), 3),
+            },
+        }
+
+
+_runner: Optional[JobRunner] = None
+_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        with _lock:
+            if _runner is None:
+                _runner = JobRunner(get_job_queue())
+    return _runner
+
+
+async def submit_job(kind: str, user_id: str, payload: dict, webhook_url: Optional[str] = None) -> Jobs:
+    """Queue a job for a registered handler; raises QueueFull past the user's cap."""
+    if kind not in _handlers:
+        raise ValueError(f"No handler for {kind} jobs")
+    job = await get_job_queue().submit(kind, user_id, payload, webhook_url)
+    get_job_runner().notify()
+    return job
@@ -0,0 +1,125 @@
+"""Delivery of job webhooks.
+
+Webhook URLs come from users, so the server only posts to ``https`` URLs. The host must
+be on ``JOBS_WEBHOOK_ALLOWED_HOSTS`` when that is set, and otherwise must resolve only to
+public addresses, which keeps loopback, private networks and cloud metadata endpoints out
+of reach. Requests go to the address that was checked, so DNS can't change it in between.
+
+Each delivery is signed with ``JOBS_WEBHOOK_SECRET``. ``X-Webhook-Signature`` is
+``sha256=`` followed by the hex HMAC-SHA256 of ``"<X-Webhook-Timestamp>."`` and the raw
+body. Receivers should recompute it and reject old timestamps. Without a secret,
+webhooks are off.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import time
+from contextlib import nullcontext
+from typing import Annotated, FrozenSet, Optional
+
+import httpx
+from pydantic import AfterValidator, HttpUrl
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+from utils.logger import logger
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Webhook-Timestamp"
+
+
+class WebhookNotAllowed(ValueError):
+    pass
+
+
+def webhook_secret() -> Optional[str]:
+    return get_environment().get_key(EnvironmentKeys.JOBS_WEBHOOK_SECRET.value) or None
+
+
+def allowed_hosts() -> FrozenSet[str]:
+    hosts = get_environment().get_key(EnvironmentKeys.JOBS_WEBHOOK_ALLOWED_HOSTS.value) or ""
+    return frozenset(host.strip().lower() for host in hosts.split(",") if host.strip())
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_webhook_url(url: str) -> str:
+    """Raise ``WebhookNotAllowed`` unless ``url`` may receive webhooks, as far as can be told
+    without DNS; ``send_webhook`` checks the addresses the host resolves to.
+    """
+    if webhook_secret() is None:
+        raise WebhookNotAllowed("Webhooks are not enabled on this server")
+    target = httpx.URL(url)
+    if target.scheme != "https":
+        raise WebhookNotAllowed("Webhook URLs must use https")
+    host = target.host.lower()
+    allowed = allowed_hosts()
+    if allowed:
+        if host not in allowed:
+            raise WebhookNotAllowed("Webhook host is not allowed")
+        return url
+    if host == "localhost" or host.endswith(".localhost"):
+        raise WebhookNotAllowed("Webhook URLs must be on a public address")
+    try:
+        public = _is_public(host)
+    except ValueError:
+        return url  # A name, checked once it is resolved
+    if not public:
+        raise WebhookNotAllowed("Webhook URLs must be on a public address")
+    return url
+
+
+def _validate_webhook_url(url: HttpUrl) -> HttpUrl:
+    check_webhook_url(str(url))
+    return url
+
+
+# For request models: URLs that fail check_webhook_url get a 422
+WebhookUrl = Annotated[HttpUrl, AfterValidator(_validate_webhook_url)]
+
+
+async def resolve_webhook_host(host: str, port: int) -> str:
+    """The address to send a webhook to; every address of a host that isn't on the allow-list must be public."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise WebhookNotAllowed(f"{host} has no addresses")
+    if host.lower() not in allowed_hosts() and not all(_is_public(address) for address in addresses):
+        raise WebhookNotAllowed(f"{host} resolves to a non-public address")
+    return addresses[0]
+
+
+def sign_webhook(secret: str, timestamp: str, body: bytes) -> str:
+    return "sha256=" + hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+
+
+async def send_webhook(url: str, body: dict, timeout: float, client: Optional[httpx.AsyncClient] = None):
+    """POST a job's status to its webhook, signed; failures are logged, not raised."""
+    try:
+        check_webhook_url(url)
+        target = httpx.URL(url)
+        address = await resolve_webhook_host(target.host, target.port or 443)
+        content = json.dumps(body).encode()
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            # The URL names the checked address, so the host goes in Host and TLS SNI
+            "Host": target.netloc.decode("ascii"),
+            TIMESTAMP_HEADER: timestamp,
+            SIGNATURE_HEADER: sign_webhook(webhook_secret(), timestamp, content),
+        }
+        # Redirects aren't followed, so they can't lead anywhere unchecked
+        async with nullcontext(client) if client else httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.post(target.copy_with(host=address), content=content, headers=headers,
+                                         extensions={"sni_hostname": target.host}, follow_redirects=False)
+            response.raise_for_status()
+    except (httpx.HTTPError, OSError, WebhookNotAllowed) as e:
+        logger.error(f"Job webhook to {url} failed: {e}")
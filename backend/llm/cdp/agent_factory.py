@@ -8,6 +8,9 @@ from typing import Callable, Dict
 from llm.cdp.coinbase_agentkit import AgentKit, AgentKitConfig, cdp_api_action_provider, weth_action_provider, \
     wallet_action_provider, pyth_action_provider, erc20_action_provider, cdp_wallet_action_provider
 from llm.cdp.coinbase_agentkit import EthAccountWalletProvider, EthAccountWalletProviderConfig
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+from utils.tracing import TracingCallbackHandler
 
 def initialize_cdp_agent(on_transaction_sign: Callable[[str], None],smart_wallet_address:str,chain_id:str) -> \
         [CompiledGraph,Dict[str,str]]:
@@ -19,7 +22,9 @@ def initialize_cdp_agent(on_transaction_sign: Callable[[str], None],smart_wallet
     cdp_config = EthAccountWalletProviderConfig(
         chain_id=chain_id,
         smart_wallet_address = smart_wallet_address,
-        on_transaction_sign=on_transaction_sign
+        on_transaction_sign=on_transaction_sign,
+        # Lets benchmarks and local development point every chain at a local node
+        rpc_url=get_environment().get_key(EnvironmentKeys.EVM_RPC_URL.value)
     )
 
     wallet_provider = EthAccountWalletProvider(cdp_config)
@@ -45,7 +50,8 @@ def initialize_cdp_agent(on_transaction_sign: Callable[[str], None],smart_wallet
             "thread_id": "CDP Agentkit Chatbot Example!",
             "checkpoint_ns": "default_ns",  # Add a default namespace
             "checkpoint_id": "default_id"   # Add a default checkpoint ID
-        }
+        },
+        "callbacks": [TracingCallbackHandler()]
     }
 
     # Create ReAct Agent using the LLM and CDP Agentkit tools.
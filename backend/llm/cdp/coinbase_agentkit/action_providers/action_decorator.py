@@ -7,6 +7,8 @@ from typing import Any, TypedDict
 
 from pydantic import BaseModel
 
+from utils.tracing import trace_span
+
 from ..analytics import RequiredEventData, send_analytics_event
 
 
@@ -66,11 +68,13 @@ def create_action(name: str, description: str, schema: type[BaseModel] | None =
             )
 
             try:
-                send_analytics_event(event_data)
+                with trace_span("action.analytics_event", action_name=prefixed_name):
+                    send_analytics_event(event_data)
             except Exception as e:
                 print(f"Warning: Failed to track action invocation: {e}")
 
-            return func(*args, **kwargs)
+            with trace_span("action.invoke", action_name=prefixed_name):
+                return func(*args, **kwargs)
 
         wrapper._action_metadata = ActionMetadata(
             name=prefixed_name,
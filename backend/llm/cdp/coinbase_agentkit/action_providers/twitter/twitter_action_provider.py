@@ -4,6 +4,10 @@ import os
 from json import dumps
 from typing import Any
 
+from requests.adapters import HTTPAdapter
+
+from utils.twitter_http import rate_limit_retry
+
 from ...network import Network
 from ..action_decorator import create_action
 from ..action_provider import ActionProvider
@@ -56,6 +60,10 @@ class TwitterActionProvider(ActionProvider):
                 bearer_token=bearer_token,
                 return_type=dict,
             )
+            # Same 429 handling as the API's own X calls: wait for x-rate-limit-reset, within bounds
+            self.client.session.mount(
+                "https://", HTTPAdapter(pool_maxsize=10, max_retries=rate_limit_retry())
+            )
         except ImportError as e:
             raise ImportError(
                 "Failed to import tweepy. Please install it with 'pip install tweepy'."
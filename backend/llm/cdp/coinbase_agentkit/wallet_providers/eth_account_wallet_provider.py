@@ -10,6 +10,8 @@ from pydantic import BaseModel, Field
 from web3 import Web3
 from web3.types import BlockIdentifier, ChecksumAddress, HexStr, TxParams
 
+from utils.tracing import trace_span
+
 from ..network import CHAIN_ID_TO_NETWORK_ID, NETWORK_ID_TO_CHAIN, Network
 from .evm_wallet_provider import EvmGasConfig, EvmWalletProvider
 
@@ -217,20 +219,24 @@ class EthAccountWalletProvider(EvmWalletProvider):
         transaction["from"] = address
         transaction["chainId"] = int(self._network.chain_id)
 
-        nonce = self.web3.eth.get_transaction_count(address)
-        transaction["nonce"] = nonce
+        with trace_span("rpc.send_transaction", chain_id=self._network.chain_id):
+            with trace_span("rpc.get_transaction_count"):
+                nonce = self.web3.eth.get_transaction_count(address)
+            transaction["nonce"] = nonce
 
-        max_priority_fee_per_gas, max_fee_per_gas = self.estimate_fees()
-        transaction["maxPriorityFeePerGas"] = max_priority_fee_per_gas
-        transaction["maxFeePerGas"] = max_fee_per_gas
+            with trace_span("rpc.estimate_fees"):
+                max_priority_fee_per_gas, max_fee_per_gas = self.estimate_fees()
+            transaction["maxPriorityFeePerGas"] = max_priority_fee_per_gas
+            transaction["maxFeePerGas"] = max_fee_per_gas
 
-        gas = int(self.web3.eth.estimate_gas(transaction) * self._gas_limit_multiplier)
-        transaction["gas"] = gas
+            with trace_span("rpc.estimate_gas"):
+                gas = int(self.web3.eth.estimate_gas(transaction) * self._gas_limit_multiplier)
+            transaction["gas"] = gas
 
-        if self.on_transaction_sign:
-            return transaction
-        else:
-            return Web3.to_hex(self.web3.eth.send_transaction(transaction))
+            if self.on_transaction_sign:
+                return transaction
+            else:
+                return Web3.to_hex(self.web3.eth.send_transaction(transaction))
 
     def wait_for_transaction_receipt(
         self, tx_hash: HexStr, timeout: float = 120, poll_latency: float = 0.1
@@ -278,7 +284,8 @@ class EthAccountWalletProvider(EvmWalletProvider):
         func = contract.functions[function_name]
         if args is None:
             args = []
-        return func(*args).call(block_identifier=block_identifier)
+        with trace_span("rpc.read_contract", chain_id=self._network.chain_id, function_name=function_name):
+            return func(*args).call(block_identifier=block_identifier)
 
     def native_transfer(self, to: str, value: Decimal) -> str:
         """Transfer the native asset of the network.
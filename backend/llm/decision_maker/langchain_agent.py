@@ -5,6 +5,7 @@ from langgraph.prebuilt import create_react_agent
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import MemorySaver
 
+from utils.tracing import TracingCallbackHandler
 from .tools import CdpBaseTool, CdpArbitrumTool, CdpEthereumTool, CdpOptimismTool
 
 class LangChainAgent:
@@ -16,7 +17,8 @@ class LangChainAgent:
                 "thread_id": "CDP Agentkit Chatbot Example!",
                 "checkpoint_ns": "default_ns",  # Add a default namespace
                 "checkpoint_id": "default_id"  # Add a default checkpoint ID
-            }
+            },
+            "callbacks": [TracingCallbackHandler()]
         }
         memory = MemorySaver()
         # Create ReAct Agent using the LLM and CDP Agentkit tools.
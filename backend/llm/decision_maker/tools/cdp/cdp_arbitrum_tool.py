@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from llm.cdp.cdp_arbitrum.agent import get_arbitrum_agent
 from llm.decision_maker.tools.model import CdpToolParams
 from llm.decision_maker.tools.utils import process_agent_stream
+from utils.tracing import traced
 
 
 class CdpArbitrumTool(BaseTool):
@@ -13,6 +14,7 @@ class CdpArbitrumTool(BaseTool):
     description:str = "Whenever an user request is made about Arbitrum Blockchain, use this tool"
     args_schema: Type[BaseModel] = CdpToolParams
 
+    @traced("tool.cdp_arbitrum")
     def _run(self, user_input: str, user_wallet: str) -> str:
         signature_result = ""
 
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from llm.cdp.cdp_base import get_base_agent
 from llm.decision_maker.tools.model import CdpToolParams
 from llm.decision_maker.tools.utils import process_agent_stream
+from utils.tracing import traced
 
 
 class CdpBaseTool(BaseTool):
@@ -15,6 +16,7 @@ class CdpBaseTool(BaseTool):
     args_schema:Type[BaseModel] = CdpToolParams
 
 
+    @traced("tool.cdp_base")
     def _run(self, user_input: str, user_wallet: str) -> str:
         signature_result = ""
 
@@ -8,6 +8,7 @@ from llm.cdp.cdp_base import get_base_agent
 from llm.cdp.cdp_ethereum.agent import get_ethereum_agent
 from llm.decision_maker.tools.model import CdpToolParams
 from llm.decision_maker.tools.utils import process_agent_stream
+from utils.tracing import traced
 
 
 class CdpEthereumTool(BaseTool):
@@ -15,6 +16,7 @@ class CdpEthereumTool(BaseTool):
     description:str = "Whenever an user request is made about Ethereum Blockchain, use this tool"
     args_schema: Type[BaseModel] = CdpToolParams
 
+    @traced("tool.cdp_ethereum")
     def _run(self, user_input: str, user_wallet: str) -> str:
         signature_result = ""
 
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from llm.cdp.cdp_optimism.agent import get_optimism_agent
 from llm.decision_maker.tools.model import CdpToolParams
 from llm.decision_maker.tools.utils import process_agent_stream
+from utils.tracing import traced
 
 
 class CdpOptimismTool(BaseTool):
@@ -13,6 +14,7 @@ class CdpOptimismTool(BaseTool):
     description:str = "Whenever an user request is made about Optimism Blockchain, use this tool"
     args_schema: Type[BaseModel] = CdpToolParams
 
+    @traced("tool.cdp_optimism")
     def _run(self, user_input: str, user_wallet: str) -> str:
         signature_result = ""
 
@@ -1,20 +1,64 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from controllers import auth_controller,agent_controller, twitter_controller, page_manager_controller, clone_voice_controller
+from controllers import auth_controller,agent_controller, twitter_controller, page_manager_controller, clone_voice_controller, \
+    job_controller
+from sqlalchemy import make_url
 from starlette.middleware.sessions import SessionMiddleware
 
-from utils.environment_manager import get_environment_manager
+from jobs.runner import get_job_runner
+from middleware.with_admin import verify_admin
+from middleware.upload_limit import UploadSizeLimit
+from synthesis.server import get_synthesis_server
+from utils.audio_upload import max_upload_bytes
+from utils.catalog_cache import catalog_cache
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.database import get_pool_metrics
+from utils.environment_manager import get_environment
+from utils.twitter_http import close_twitter_client
+from utils.voice_encryption import shutdown_encryption_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Other workers NOTIFY when they change the admin catalog; only Postgres supports it
+    connection_string = get_environment().environment_values.get(EnvironmentKeys.CONNECTION_STRING.value)
+    listener = None
+    if connection_string and make_url(connection_string).get_backend_name() == "postgresql":
+        listener = asyncio.create_task(catalog_cache.listen_for_invalidations(connection_string))
+    # Load the TTS model in the worker processes now rather than on the first /voice/synthesize
+    if get_environment().get_bool(EnvironmentKeys.TTS_PRELOAD.value):
+        get_synthesis_server().start()
+    # Jobs live in the database, so without one there is nothing to run
+    run_jobs = bool(connection_string) and get_job_runner().config.run_in_app
+    if run_jobs:
+        get_job_runner().start()
+    yield
+    if run_jobs:
+        await get_job_runner().stop()
+    if listener is not None:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
+    await asyncio.to_thread(get_synthesis_server().stop)
+    await asyncio.to_thread(shutdown_encryption_pool)
+    await close_twitter_client()
+
 
 app = FastAPI(
     title="API Project",
     description="Work in progress",
     version='0.1',
     swagger_ui_parameters={"docExpansion": "none"},
+    lifespan=lifespan,
 )
 routers = [
     auth_controller.router,
     agent_controller.router,
     clone_voice_controller.router,
+    job_controller.router,
     twitter_controller.router,
     page_manager_controller.router
 ]
@@ -23,6 +67,7 @@ app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000","https
 , allow_methods=["*"], allow_headers=["*"],
                    allow_credentials=True)
 app.add_middleware(SessionMiddleware, secret_key='your_secret_key',session_cookie="session")
+app.add_middleware(UploadSizeLimit, paths=["/voice/clone", "/voice/share-for-training"], max_bytes=max_upload_bytes())
 
 for router in routers:  # routers_test
     app.include_router(router)
@@ -32,11 +77,28 @@ def read_root():
     return {"message": "App is running"}
 
 
+# Metrics expose internals, so like the API they need a bearer token
+@app.get("/metrics/db-pool", dependencies=[Depends(verify_admin)])
+def read_db_pool_metrics():
+    return get_pool_metrics()
+
+
+@app.get("/metrics/tts", dependencies=[Depends(verify_admin)])
+def read_tts_metrics():
+    return get_synthesis_server().metrics()
+
+
+@app.get("/metrics/jobs", dependencies=[Depends(verify_admin)])
+async def read_job_metrics():
+    return await get_job_runner().metrics()
+
+
 @app.get("/items/{item_id}")
 def read_item(item_id: int, q: str = None):
     return {"item_id": item_id, "q": q}
 
-environment_manager = get_environment_manager()
+# Read the configuration once, before the first request
+environment_manager = get_environment()
 
 if __name__ == "__main__":
     import uvicorn
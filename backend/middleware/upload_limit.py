@@ -0,0 +1,27 @@
+from starlette.responses import JSONResponse
+
+# Multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadSizeLimit:
+    """Answers 413 to uploads on ``paths`` whose Content-Length is over ``max_bytes``.
+
+    Runs before the multipart body is read, so an oversized file is refused without
+    receiving it. Bodies without a Content-Length are counted by the handlers as they
+    read them.
+    """
+
+    def __init__(self, app, paths, max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > self.max_bytes + MULTIPART_OVERHEAD:
+                limit_mb = self.max_bytes // (1024 * 1024)
+                response = JSONResponse({"detail": f"Audio files are limited to {limit_mb} MB"}, status_code=413)
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
@@ -1,20 +1,25 @@
 from fastapi import Request, HTTPException
 import jwt
 from utils.constants.environment_keys import EnvironmentKeys
-from utils.environment_manager import EnvironmentManager
+from utils.environment_manager import get_environment
+from utils.token_cache import verified_tokens
 
 
 async def verify_admin(request: Request):
-    env_manager = EnvironmentManager()
     auth_header = request.headers.get("Authorization")
-    
+
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-    
+
     token = auth_header.split(" ")[1]
-    
-    try:
-        payload = jwt.decode(token, env_manager.get_key(EnvironmentKeys.SECRET_KEY.name), algorithms=["HS256"])
+
+    # Clients send the same token on every call, so the signature is checked once
+    payload = verified_tokens.get(token)
+    if payload is not None:
         return payload
+    try:
+        payload = jwt.decode(token, get_environment().get_key(EnvironmentKeys.SECRET_KEY.name), algorithms=["HS256"])
     except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token") 
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    verified_tokens.put(token, payload)
+    return payload
@@ -1,32 +1,31 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Table, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
+# The primary keys lead with agent_id; the second-column indexes serve lookups from the catalog side
 agent_chain = Table('agent_chain', Base.metadata,
     Column('agent_id', String, ForeignKey('Agents.id'), primary_key=True),
-    Column('chain_id', String, ForeignKey('Chains.id'), primary_key=True)
+    Column('chain_id', String, ForeignKey('Chains.id'), primary_key=True),
+    Index('agent_chain_chain_id_idx', 'chain_id'),
 )
 agent_knowledge_base = Table('agent_knowledge_base', Base.metadata,
     Column('agent_id', String, ForeignKey('Agents.id'), primary_key=True),
-    Column('knowledge_base_id', String, ForeignKey('KnowledgeBases.id'), primary_key=True)
+    Column('knowledge_base_id', String, ForeignKey('KnowledgeBases.id'), primary_key=True),
+    Index('agent_knowledge_base_knowledge_base_id_idx', 'knowledge_base_id'),
 )
 agent_llm_provider = Table('agent_llm_provider', Base.metadata,
     Column('agent_id', String, ForeignKey('Agents.id'), primary_key=True),
-    Column('llm_provider_id', String, ForeignKey('LlmProviders.id'), primary_key=True)
-)
-agent_user = Table('agent_user', Base.metadata,
-    Column('agent_id', String, ForeignKey('Agents.id'), primary_key=True),
-    Column('user_id', String, ForeignKey('TwitterUser.id'), primary_key=True)
+    Column('llm_provider_id', String, ForeignKey('LlmProviders.id'), primary_key=True),
+    Index('agent_llm_provider_llm_provider_id_idx', 'llm_provider_id'),
 )
 
-
 class TwitterUsers(Base):
     __tablename__ = 'TwitterUsers'
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, index=True)
+    user_id = Column(String, unique=True, index=True)
     username = Column(String)
     name = Column(String)
     agents = relationship('Agents', back_populates='user')
@@ -42,6 +41,7 @@ class SpecialUserCode(Base):
     code = Column(String, index=True)
     is_used = Column(Boolean, default=False)
     used_by = Column(String, index=True)
+    __table_args__ = (Index('SpecialUserCodes_code_is_used_idx', 'code', 'is_used'),)
 
 class UserWallet(Base):
     __tablename__ = 'UserWallet'
@@ -71,8 +71,9 @@ class Transaction(Base):
     __tablename__ = 'Transactions'
     id = Column(Integer, primary_key=True, index=True)
     transaction_hash = Column(String, unique=True, index=True)
-    user_wallet = Column(String, index=True,name="userWallet")
-    created_at = Column(DateTime, server_default=func.now())
+    user_wallet = Column(String, index=True)
+    created_at = Column(DateTime, server_default=func.now(), name="createdAt")
+    __table_args__ = (Index('Transactions_user_wallet_createdAt_idx', 'user_wallet', 'createdAt'),)
 
 class Chain(Base):
     __tablename__ = 'Chains'
@@ -112,8 +113,10 @@ class Agents(Base):
                                 back_populates='agents',
                                 cascade="all, delete")
     _knowledge_bases = relationship('KnowledgeBase', secondary=agent_knowledge_base, back_populates='agents')
-    user_id = Column(String, ForeignKey('TwitterUsers.user_id'))
+    user_id = Column(Integer, ForeignKey('TwitterUsers.id'))
     user = relationship('TwitterUsers', back_populates='agents')
+    # Serves /agent/my keyset pages and the (user_id, id) single-agent lookup
+    __table_args__ = (Index('Agents_user_id_id_idx', 'user_id', 'id'),)
 
     @property
     def knowledgeBases(self):
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+
+from models.chain import Base
+
+
+class Jobs(Base):
+    """Long-running work submitted by a request and carried out by a job runner.
+
+    Times are naive UTC set by the queue, so that every runner compares them the same way
+    whatever the database's clock or time zone.
+    """
+    __tablename__ = "Jobs"
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    # Twitter user id from the submitter's token
+    user_id = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    # JSON arguments for the handler and, once it succeeds, its JSON result; handlers that
+    # produce audio store it in the blob store instead and keep the digest in result_hash
+    payload = Column(Text, nullable=False, default="{}")
+    result = Column(Text, nullable=True)
+    result_hash = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    webhook_url = Column(String, nullable=True)
+    # Not claimed before this time; pushed back between retries
+    run_after = Column(DateTime, nullable=False)
+    # A running job whose runner stops renewing this lease is handed to another runner
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Runners look for due queued jobs and expired leases by status; caps count by user
+    __table_args__ = (
+        Index('Jobs_status_run_after_idx', 'status', 'run_after'),
+        Index('Jobs_user_id_status_idx', 'user_id', 'status'),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Index, String
+
+from models.chain import Base
+
+
+class OAuthStates(Base):
+    """PKCE verifiers of Twitter logins in progress, keyed by the OAuth ``state`` parameter,
+    so that the callback can land on any API process. Rows are deleted when used or expired.
+    """
+    __tablename__ = "OAuthStates"
+    state = Column(String, primary_key=True)
+    code_verifier = Column(String, nullable=False)
+    # Naive UTC
+    expires_at = Column(DateTime, nullable=False)
+    __table_args__ = (Index('OAuthStates_expires_at_idx', 'expires_at'),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, Boolean, Table, ForeignKey, LargeBinary
+from sqlalchemy import Column, Integer, String, DateTime, func, Boolean, Table, ForeignKey, LargeBinary, Index
 from models.chain import Base, TwitterUsers
 from sqlalchemy import event
 
@@ -6,7 +6,13 @@ class Voices(Base):
     __tablename__ = "Voices"
     id = Column(Integer, primary_key=True, index=True)
     voice_id = Column(String, unique=True)
-    voice_bytes = Column(LargeBinary)
+    # Legacy inline audio; new rows keep only the blob store digest in audio_hash
+    voice_bytes = Column(LargeBinary, nullable=True)
+    audio_hash = Column(String, nullable=True)
+    # Blob store digests of the recording as normalized for TTS (mono, resampled, trimmed)
+    # and of the speaker's conditioning latents computed from it
+    reference_hash = Column(String, nullable=True)
+    latents_hash = Column(String, nullable=True)
     user_id = Column(String, ForeignKey('TwitterUsers.user_id'))
     ipfs_hash = Column(String, default="")
     salt = Column(String, default="")
@@ -14,6 +20,13 @@ class Voices(Base):
     share_for_training = Column(Boolean, default=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Leads with user_id for /voice/my; voice_id lookups already hit its unique index
+    __table_args__ = (Index('Voices_user_id_ipfs_hash_idx', 'user_id', 'ipfs_hash'),)
+
+class UserVoice(Base):
+    __tablename__ = "user_voice"
+    user_id = Column(String, ForeignKey('TwitterUsers.user_id'), primary_key=True)
+    voice_id = Column(Integer, ForeignKey('Voices.id'), primary_key=True)
 
 @event.listens_for(Voices, 'before_insert')
 def set_created_updated_at(mapper, connection, target):
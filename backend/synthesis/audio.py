@@ -0,0 +1,108 @@
+import io
+import os
+import struct
+import tempfile
+import wave
+
+import numpy as np
+
+# Size fields of a WAV whose length isn't known when the header is sent
+STREAMING_SIZE = 0xFFFFFFFF
+
+# Leading and trailing audio quieter than this, relative to the loudest frame, is silence
+SILENCE_DB = -40.0
+SILENCE_FRAME_MS = 20
+# Kept either side of the speech so that onsets and decays aren't clipped
+SILENCE_MARGIN_MS = 100
+
+# RAM-backed, for the rare recording torchaudio can only decode from a path
+TMPFS_DIR = "/dev/shm"
+
+
+def encode_wav(samples, sample_rate: int, normalize: bool = True) -> bytes:
+    """16-bit mono WAV of float samples, peak-normalised the way Coqui's ``save_wav`` does.
+
+    With ``normalize=False`` the levels are kept as they are, clipped to [-1, 1].
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if normalize:
+        peak = max(0.01, float(np.max(np.abs(samples)))) if samples.size else 1.0
+        pcm = (samples * (32767 / peak)).astype(np.int16)
+    else:
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def streaming_wav_header(sample_rate: int) -> bytes:
+    """Header of a 16-bit mono WAV to be followed by PCM of unknown length."""
+    return b"".join([
+        b"RIFF", struct.pack("<I", STREAMING_SIZE), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16),
+        b"data", struct.pack("<I", STREAMING_SIZE),
+    ])
+
+
+def encode_pcm16(samples) -> bytes:
+    """16-bit PCM of float samples. Streamed audio can't be peak-normalised, so it is clipped."""
+    samples = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (samples * 32767).astype(np.int16).tobytes()
+
+
+def decode_audio(data: bytes, sample_rate: int):
+    """Mono float tensor at ``sample_rate`` of encoded audio held in memory.
+
+    Matches what XTTS's ``load_audio`` does with a file: channels averaged, resampled,
+    clipped to [-1, 1]. torchaudio decodes file-like objects directly; a format whose
+    backend only takes paths goes through a file in tmpfs rather than on disk.
+    """
+    import torch
+    import torchaudio
+
+    try:
+        audio, source_rate = torchaudio.load(io.BytesIO(data))
+    except RuntimeError:
+        directory = TMPFS_DIR if os.path.isdir(TMPFS_DIR) else None
+        with tempfile.NamedTemporaryFile(dir=directory) as f:
+            f.write(data)
+            f.flush()
+            audio, source_rate = torchaudio.load(f.name)
+    if audio.size(0) != 1:
+        audio = torch.mean(audio, dim=0, keepdim=True)
+    if source_rate != sample_rate:
+        audio = torchaudio.functional.resample(audio, source_rate, sample_rate)
+    return audio.clip_(-1, 1)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Mono samples without leading and trailing silence, judged by frame RMS."""
+    frame = max(1, sample_rate * SILENCE_FRAME_MS // 1000)
+    frames = len(samples) // frame
+    if frames == 0:
+        return samples
+    rms = np.sqrt(np.mean(np.square(samples[:frames * frame].reshape(frames, frame)), axis=1))
+    loud = np.nonzero(rms > rms.max() * 10 ** (SILENCE_DB / 20))[0]
+    if len(loud) == 0:
+        return samples
+    margin = sample_rate * SILENCE_MARGIN_MS // 1000
+    start = max(0, loud[0] * frame - margin)
+    end = min(len(samples), (loud[-1] + 1) * frame + margin)
+    return samples[start:end]
+
+
+def normalize_reference(data: bytes, sample_rate: int, max_seconds: float) -> bytes:
+    """A reference recording as the TTS model wants it: a mono 16-bit WAV at ``sample_rate``,
+    trimmed of silence at either end and cut to ``max_seconds``.
+
+    Levels are left alone; the model's own reference normalisation still applies.
+    """
+    samples = decode_audio(data, sample_rate).squeeze(0).numpy()
+    samples = trim_silence(samples, sample_rate)[:int(sample_rate * max_seconds)]
+    if samples.size == 0:
+        raise ValueError("The reference recording has no audio")
+    return encode_wav(samples, sample_rate, normalize=False)
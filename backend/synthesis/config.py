@@ -0,0 +1,51 @@
+import os
+from dataclasses import dataclass
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+
+XTTS_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+
+@dataclass(frozen=True)
+class SynthesisConfig:
+    engine: str = "synthesis.xtts:XttsEngine"
+    model_name: str = XTTS_MODEL
+    device: str = "auto"
+    # "int8" dynamically quantizes the GPT's linear layers (CPU only); see synthesis.quantization
+    quantization: str = "none"
+    workers: int = 1
+    # torch intra-op threads per worker; 0 splits the machine's cores evenly between workers
+    threads: int = 0
+    queue_size: int = 32
+    job_timeout: float = 300.0
+    # Speaker latents each worker keeps in memory
+    latent_cache_size: int = 64
+    # Micro-batching: up to batch_size waiting jobs with the same language, whose texts
+    # differ in length by at most batch_length_ratio, share one forward pass. The oldest
+    # job waits up to batch_wait_ms for company. A batch_size of 1 turns batching off.
+    batch_size: int = 1
+    batch_wait_ms: float = 20.0
+    batch_length_ratio: float = 2.0
+
+    @property
+    def threads_per_worker(self) -> int:
+        return self.threads or max(1, (os.cpu_count() or 1) // max(1, self.workers))
+
+    @classmethod
+    def from_env(cls) -> "SynthesisConfig":
+        environment = get_environment()
+        return cls(
+            engine=environment.get_key(EnvironmentKeys.TTS_ENGINE.value),
+            model_name=environment.get_key(EnvironmentKeys.TTS_MODEL.value),
+            device=environment.get_key(EnvironmentKeys.TTS_DEVICE.value),
+            quantization=environment.get_key(EnvironmentKeys.TTS_QUANTIZATION.value),
+            workers=environment.get_int(EnvironmentKeys.TTS_WORKERS.value),
+            threads=environment.get_int(EnvironmentKeys.TTS_THREADS.value),
+            queue_size=environment.get_int(EnvironmentKeys.TTS_QUEUE_SIZE.value),
+            job_timeout=environment.get_float(EnvironmentKeys.TTS_JOB_TIMEOUT.value),
+            latent_cache_size=environment.get_int(EnvironmentKeys.TTS_LATENT_CACHE_SIZE.value),
+            batch_size=environment.get_int(EnvironmentKeys.TTS_BATCH_SIZE.value),
+            batch_wait_ms=environment.get_float(EnvironmentKeys.TTS_BATCH_WAIT_MS.value),
+            batch_length_ratio=environment.get_float(EnvironmentKeys.TTS_BATCH_LENGTH_RATIO.value),
+        )
@@ -0,0 +1,46 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Callable
+
+from utils.blob_store import get_blob_store
+
+
+def read_blob(digest: str) -> bytes:
+    """Blob contents from inside a worker process, which has no event loop of its own."""
+    store = get_blob_store()
+    path = store.local_path(digest)
+    if path is not None:
+        with open(path, "rb") as f:
+            return f.read()
+    return asyncio.run(store.read(digest))
+
+
+class LatentCache:
+    """Least-recently-used speaker latents, keyed by the digest of their serialized form.
+
+    ``load`` turns a digest into latents on a miss; the worker keeps one cache for its
+    lifetime so a voice used again skips both the blob read and deserialization.
+    """
+
+    def __init__(self, load: Callable[[str], Any], max_size: int = 64):
+        self._load = load
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str):
+        if digest in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(digest)
+            return self._entries[digest]
+        self.misses += 1
+        latents = self._load(digest)
+        if self.max_size > 0:
+            self._entries[digest] = latents
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return latents
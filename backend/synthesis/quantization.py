@@ -0,0 +1,32 @@
+QUANTIZATION_MODES = ("none", "int8")
+
+
+def _linear_from_conv1d(conv1d):
+    """``nn.Linear`` equivalent of a transformers ``Conv1D``, which stores its weight transposed."""
+    import torch
+
+    linear = torch.nn.Linear(conv1d.weight.shape[0], conv1d.nf)
+    with torch.no_grad():
+        linear.weight.copy_(conv1d.weight.t())
+        linear.bias.copy_(conv1d.bias)
+    return linear
+
+
+def quantize_gpt(gpt) -> int:
+    """Dynamically quantize the XTTS GPT's linear layers to int8, in place; returns how many.
+
+    GPT-2 blocks use transformers' ``Conv1D`` for their projections, which
+    ``quantize_dynamic`` doesn't recognise, so those are rewritten as ``nn.Linear``
+    first. Weights are stored as int8 and activations quantized on the fly, which suits
+    the small matmuls of token-by-token generation on CPU. The HiFi-GAN decoder is
+    convolutional and stays in full precision.
+    """
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for module in list(gpt.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, Conv1D):
+                setattr(module, name, _linear_from_conv1d(child))
+    torch.ao.quantization.quantize_dynamic(gpt, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return sum(isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in gpt.modules())
@@ -0,0 +1,446 @@
+import asyncio
+import itertools
+import multiprocessing
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from synthesis.config import SynthesisConfig
+from synthesis.worker import run_worker
+from utils.logger import logger
+
+# Engine methods the scheduler may batch; engines implement them as ``<method>_batch``
+BATCHED_METHODS = {"synthesize"}
+
+
+class SynthesisError(Exception):
+    pass
+
+
+class SynthesisBusy(SynthesisError):
+    """The job queue is full."""
+
+
+@dataclass
+class _Job:
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    enqueued_at: float
+    started_at: Optional[float] = None
+    # Streaming jobs deliver their output here as it is produced, then None
+    chunks: Optional[asyncio.Queue] = None
+    first_chunk_at: Optional[float] = None
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    conn: Connection
+    load_seconds: Optional[float] = None
+    load_error: Optional[str] = None
+    job_ids: List[int] = field(default_factory=list)
+    jobs_done: int = 0
+
+    @property
+    def idle(self) -> bool:
+        return self.load_seconds is not None and not self.job_ids
+
+
+@dataclass
+class _Stats:
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    restarts: int = 0
+    queue_wait: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    inference: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    total: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    first_audio: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    batch_sizes: Deque[int] = field(default_factory=lambda: deque(maxlen=1000))
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def _resolve(job: _Job, result=None, error: Optional[Exception] = None):
+    def settle():
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+        if job.chunks is not None:
+            job.chunks.put_nowait(None)
+    job.loop.call_soon_threadsafe(settle)
+
+
+class SynthesisServer:
+    """Resident TTS worker processes fed from a local job queue.
+
+    Each worker loads the engine once when it starts, so requests only pay for inference,
+    and torch runs outside the API's event loop. Jobs wait in a queue here and are handed
+    to idle workers over per-worker pipes. A reader thread collects results; a worker that
+    dies is noticed by its pipe closing, its jobs failed, and the worker restarted.
+
+    With ``batch_size`` above 1, compatible waiting jobs are handed over together and run
+    as one batch; see ``_next_batch``.
+    """
+
+    def __init__(self, config: Optional[SynthesisConfig] = None):
+        self.config = config or SynthesisConfig.from_env()
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: Dict[int, _Worker] = {}
+        self._pending: Dict[int, _Job] = {}
+        self._waiting: Deque[Tuple[int, str, dict]] = deque()
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._reader: Optional[threading.Thread] = None
+        self._wakeup: Optional[Tuple[Connection, Connection]] = None
+        self._stopping = False
+        # When the oldest waiting job stops waiting for a fuller batch
+        self._batch_deadline: Optional[float] = None
+        self.stats = _Stats()
+
+    @property
+    def started(self) -> bool:
+        return self._reader is not None
+
+    def start(self):
+        with self._lock:
+            if self.started:
+                return
+            self._stopping = False
+            self._wakeup = self._context.Pipe(duplex=False)
+            for worker_id in range(self.config.workers):
+                self._spawn(worker_id)
+            self._reader = threading.Thread(target=self._read_results, name="synthesis-results", daemon=True)
+            self._reader.start()
+
+    def stop(self, timeout: float = 10):
+        with self._lock:
+            if not self.started:
+                return
+            self._stopping = True
+            for worker in self._workers.values():
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+        deadline = time.monotonic() + timeout
+        for worker in list(self._workers.values()):
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+        with self._lock:
+            self._wakeup[1].send(None)
+        self._reader.join()
+        with self._lock:
+            self._reader = None
+            for worker in self._workers.values():
+                worker.conn.close()
+            self._workers.clear()
+            self._waiting.clear()
+            pending, self._pending = self._pending, {}
+        for job in pending.values():
+            _resolve(job, error=SynthesisError("Synthesis server stopped"))
+
+    def _spawn(self, worker_id: int):
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=run_worker, args=(worker_id, self.config, child_conn),
+            name=f"synthesis-worker-{worker_id}", daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._workers[worker_id] = _Worker(process, conn)
+
+    async def wait_ready(self, timeout: Optional[float] = None):
+        """Wait until every worker has loaded the engine (or failed to)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not all(w.load_seconds is not None or w.load_error for w in self._workers.values()):
+            if deadline is not None and time.monotonic() > deadline:
+                raise SynthesisError("Timed out waiting for synthesis workers")
+            await asyncio.sleep(0.05)
+
+    async def synthesize(self, **payload) -> bytes:
+        """WAV audio for ``payload`` (text, language and the speaker's latents or reference audio)."""
+        return await self.run("synthesize", **payload)
+
+    async def compute_latents(self, **payload) -> bytes:
+        """Serialized speaker conditioning latents for a reference recording."""
+        return await self.run("compute_latents", **payload)
+
+    async def normalize_reference(self, **payload) -> bytes:
+        """A reference recording decoded, downmixed, resampled and trimmed for the model, as WAV."""
+        return await self.run("normalize_reference", **payload)
+
+    async def synthesize_stream(self, **payload) -> AsyncIterator[bytes]:
+        """Like ``synthesize``, but yields the audio sentence by sentence as it is generated."""
+        return await self.stream("synthesize_stream", **payload)
+
+    async def run(self, method: str, **payload):
+        """Call ``method`` on a worker's engine with ``payload`` and return its result."""
+        job_id, job = self._submit(method, payload)
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), self.config.job_timeout)
+        except asyncio.TimeoutError:
+            raise SynthesisError("Synthesis timed out")
+        finally:
+            self._cancel(job_id)
+
+    async def stream(self, method: str, **payload) -> AsyncIterator[bytes]:
+        """Queue a job whose engine method is a generator, and iterate over what it yields.
+
+        Queueing happens before this returns, so a full queue raises here rather than
+        mid-iteration. ``job_timeout`` bounds the wait for each chunk; closing the iterator
+        early stops the worker at its next chunk.
+        """
+        job_id, job = self._submit(method, payload, streaming=True)
+
+        async def chunks():
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(job.chunks.get(), self.config.job_timeout)
+                    except asyncio.TimeoutError:
+                        raise SynthesisError("Synthesis timed out")
+                    if chunk is None:
+                        await job.future  # raises if the job failed
+                        return
+                    yield chunk
+            finally:
+                self._cancel(job_id)
+
+        return chunks()
+
+    def _submit(self, method: str, payload: dict, streaming: bool = False) -> Tuple[int, _Job]:
+        if not self.started:
+            self.start()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._workers and all(w.load_error for w in self._workers.values()):
+                raise SynthesisError("TTS engine failed to load")
+            if len(self._waiting) >= self.config.queue_size:
+                self.stats.rejected += 1
+                raise SynthesisBusy("Synthesis queue is full")
+            job_id = next(self._ids)
+            job = _Job(loop.create_future(), loop, time.perf_counter(), chunks=asyncio.Queue() if streaming else None)
+            self._pending[job_id] = job
+            self._waiting.append((job_id, method, payload))
+            self._dispatch()
+            if self._batch_deadline is not None:
+                self._wakeup[1].send(True)  # so the reader wakes up at the new deadline
+        return job_id, job
+
+    def _cancel(self, job_id: int):
+        """Forget a job; if a worker is still running it, ask the worker to stop early."""
+        with self._lock:
+            if self._pending.pop(job_id, None) is None:
+                return
+            for worker in self._workers.values():
+                if job_id in worker.job_ids and not worker.conn.closed:
+                    try:
+                        worker.conn.send(([job_id], "cancel", None))
+                    except OSError:
+                        pass
+
+    def _dispatch(self):
+        """Hand waiting jobs to idle workers. Called with the lock held."""
+        self._batch_deadline = None
+        for worker in self._workers.values():
+            if not worker.idle:
+                continue
+            batch = self._next_batch()
+            if not batch:
+                break
+            started = time.perf_counter()
+            for job_id, _, _ in batch:
+                self._pending[job_id].started_at = started
+            worker.job_ids = [job_id for job_id, _, _ in batch]
+            self.stats.batch_sizes.append(len(batch))
+            worker.conn.send((worker.job_ids, batch[0][1], [payload for _, _, payload in batch]))
+
+    def _next_batch(self) -> List[Tuple[int, str, dict]]:
+        """Take the next jobs to run together off the queue.
+
+        The oldest job goes first, joined by later jobs for the same method and language
+        whose text is of similar length, up to ``batch_size``. Until it has a full batch or
+        has waited ``batch_wait_ms``, nothing is taken and ``_batch_deadline`` is set.
+        """
+        while self._waiting and self._waiting[0][0] not in self._pending:
+            self._waiting.popleft()  # gave up while queued
+        if not self._waiting:
+            return []
+        head = self._waiting[0]
+        if self.config.batch_size <= 1 or head[1] not in BATCHED_METHODS:
+            return [self._waiting.popleft()]
+
+        batch = [item for item in self._waiting if item[0] in self._pending and self._batchable(head, item)]
+        batch = batch[:self.config.batch_size]
+        deadline = self._pending[head[0]].enqueued_at + self.config.batch_wait_ms / 1000
+        if len(batch) < self.config.batch_size and time.perf_counter() < deadline:
+            self._batch_deadline = deadline
+            return []
+        chosen = {job_id for job_id, _, _ in batch}
+        self._waiting = deque(item for item in self._waiting if item[0] not in chosen)
+        return batch
+
+    def _batchable(self, head: Tuple[int, str, dict], other: Tuple[int, str, dict]) -> bool:
+        if other[1] != head[1] or other[2].get("language") != head[2].get("language"):
+            return False
+        lengths = len(head[2].get("text", "")), len(other[2].get("text", ""))
+        return max(lengths) <= self.config.batch_length_ratio * max(1, min(lengths))
+
+    def _read_results(self):
+        wakeup = self._wakeup[0]
+        while True:
+            with self._lock:
+                connections = {worker.conn: worker_id for worker_id, worker in self._workers.items()
+                               if not worker.conn.closed}
+                timeout = None
+                if self._batch_deadline is not None:
+                    timeout = max(0.0, self._batch_deadline - time.perf_counter())
+            for conn in wait([wakeup, *connections], timeout):
+                if conn is wakeup:
+                    if wakeup.recv() is None:
+                        return
+                    continue
+                worker_id = connections[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self._worker_exited(worker_id)
+                    continue
+                with self._lock:
+                    try:
+                        self._handle(worker_id, *message)
+                    except Exception as e:
+                        logger.error(f"Synthesis result handling failed: {e}")
+            with self._lock:
+                self._dispatch()
+
+    def _handle(self, worker_id: int, kind: str, *rest):
+        worker = self._workers[worker_id]
+        if kind == "ready":
+            worker.load_seconds = rest[0]
+            logger.info(f"Synthesis worker {worker_id} loaded the engine in {rest[0]:.1f}s")
+        elif kind == "load_failed":
+            worker.load_error = rest[0]
+            logger.error(f"Synthesis worker {worker_id} failed to load the engine: {rest[0]}")
+            if all(w.load_error for w in self._workers.values()):
+                self._fail_waiting(SynthesisError("TTS engine failed to load"))
+        elif kind == "chunk":
+            job = self._pending.get(rest[0])
+            if job is None or job.chunks is None:
+                return
+            if job.first_chunk_at is None:
+                job.first_chunk_at = time.perf_counter()
+                self.stats.first_audio.append(job.first_chunk_at - job.enqueued_at)
+            job.loop.call_soon_threadsafe(job.chunks.put_nowait, rest[1])
+        elif kind in ("done", "failed"):
+            job = self._pending.get(rest[0])
+            if rest[0] in worker.job_ids:
+                worker.job_ids.remove(rest[0])
+            worker.jobs_done += 1
+            if kind == "failed":
+                self.stats.failed += 1
+                if job is not None:
+                    _resolve(job, error=SynthesisError(rest[1]))
+                return
+            result, inference_seconds = rest[1], rest[2]
+            self.stats.completed += 1
+            if job is not None:
+                finished = time.perf_counter()
+                self.stats.queue_wait.append(job.started_at - job.enqueued_at)
+                self.stats.inference.append(inference_seconds)
+                self.stats.total.append(finished - job.enqueued_at)
+                _resolve(job, result)
+
+    def _worker_exited(self, worker_id: int):
+        with self._lock:
+            worker = self._workers[worker_id]
+            worker.conn.close()
+            worker.process.join(5)
+            if self._stopping or worker.load_error:
+                return
+            if worker.load_seconds is None:
+                # Died while loading; restarting would most likely crash again
+                self._handle(worker_id, "load_failed", f"Exited with code {worker.process.exitcode} while loading")
+                return
+            logger.error(f"Synthesis worker {worker_id} exited with code {worker.process.exitcode}; restarting")
+            for job_id in worker.job_ids:
+                job = self._pending.get(job_id)
+                if job is not None:
+                    self.stats.failed += 1
+                    _resolve(job, error=SynthesisError("Synthesis worker exited"))
+            self.stats.restarts += 1
+            self._spawn(worker_id)
+
+    def _fail_waiting(self, error: Exception):
+        while self._waiting:
+            job = self._pending.get(self._waiting.popleft()[0])
+            if job is not None:
+                _resolve(job, error=error)
+
+    def metrics(self) -> dict:
+        def latency(values) -> dict:
+            return {f"p{pct}_ms": round(_percentile(values, pct) * 1000, 1) for pct in (50, 95, 99)}
+
+        with self._lock:
+            workers = [
+                {
+                    "id": worker_id,
+                    "pid": worker.process.pid,
+                    "alive": worker.process.is_alive(),
+                    "model_load_s": round(worker.load_seconds, 3) if worker.load_seconds is not None else None,
+                    "load_error": worker.load_error,
+                    "jobs": worker.jobs_done,
+                }
+                for worker_id, worker in sorted(self._workers.items())
+            ]
+            running = sum(len(worker.job_ids) for worker in self._workers.values())
+            waiting = len(self._waiting)
+            batch_sizes = list(self.stats.batch_sizes)
+        return {
+            "engine": self.config.engine,
+            "workers": workers,
+            "threads_per_worker": self.config.threads_per_worker,
+            "queue_depth": waiting,
+            "running": running,
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "rejected": self.stats.rejected,
+            "restarts": self.stats.restarts,
+            "queue_wait": latency(self.stats.queue_wait),
+            "inference": latency(self.stats.inference),
+            "total": latency(self.stats.total),
+            "first_audio": latency(self.stats.first_audio),
+            "batching": {
+                "max_size": self.config.batch_size,
+                "wait_ms": self.config.batch_wait_ms,
+                "mean_size": round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else 0.0,
+            },
+        }
+
+
+_server: Optional[SynthesisServer] = None
+_server_lock = threading.Lock()
+
+
+def get_synthesis_server() -> SynthesisServer:
+    """Process-wide synthesis server, configured from the environment on first use."""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = SynthesisServer()
+    return _server
@@ -0,0 +1,83 @@
+import importlib
+import inspect
+import time
+import traceback
+from typing import List
+
+from synthesis.config import SynthesisConfig
+
+
+def load_engine(config: SynthesisConfig):
+    module_name, _, attribute = config.engine.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)(config)
+
+
+def run_worker(worker_id: int, config: SynthesisConfig, conn):
+    """Entry point of a synthesis process: load the engine once, then serve jobs until a ``None`` job.
+
+    ``conn`` is this worker's own pipe to the server. A job is a list of job ids, the engine
+    method to call and a list with each job's keyword arguments; more than one id means
+    a batch. Every message sent back is a tuple starting with its kind.
+    Methods that return a generator stream their output as ``chunk`` messages before ``done``.
+    """
+    started = time.perf_counter()
+    try:
+        engine = load_engine(config)
+    except Exception:
+        conn.send(("load_failed", traceback.format_exc(limit=5)))
+        return
+    conn.send(("ready", time.perf_counter() - started))
+
+    stopping = False
+    while not stopping and (job := conn.recv()) is not None:
+        job_ids, method, payloads = job
+        if method == "cancel":
+            continue  # the job it names has already finished
+        if len(job_ids) > 1:
+            _run_batch(engine, conn, job_ids, method, payloads)
+            continue
+        job_id, payload = job_ids[0], payloads[0]
+        started = time.perf_counter()
+        try:
+            result = getattr(engine, method)(**payload)
+            if inspect.isgenerator(result):
+                # Streamed jobs send each chunk as it is made. Only a cancel or a stop
+                # can arrive while a job runs, and either ends the job early.
+                for chunk in result:
+                    conn.send(("chunk", job_id, chunk))
+                    if conn.poll():
+                        stopping = conn.recv() is None
+                        result.close()
+                        break
+                result = None
+        except Exception as e:
+            conn.send(("failed", job_id, f"{type(e).__name__}: {e}"))
+            continue
+        conn.send(("done", job_id, result, time.perf_counter() - started))
+
+
+def _run_batch(engine, conn, job_ids: List[int], method: str, payloads: List[dict]):
+    """Run jobs the server batched through the engine's ``<method>_batch``, which returns a
+    result or an exception per job. Engines without one run the jobs one after another."""
+    started = time.perf_counter()
+    run_batch = getattr(engine, f"{method}_batch", None)
+    try:
+        if run_batch is not None:
+            results = run_batch(payloads)
+        else:
+            results = [_call(getattr(engine, method), payload) for payload in payloads]
+    except Exception as e:
+        results = [e] * len(job_ids)
+    seconds = time.perf_counter() - started
+    for job_id, result in zip(job_ids, results):
+        if isinstance(result, Exception):
+            conn.send(("failed", job_id, f"{type(result).__name__}: {result}"))
+        else:
+            conn.send(("done", job_id, result, seconds))
+
+
+def _call(function, payload: dict):
+    try:
+        return function(**payload)
+    except Exception as e:
+        return e
@@ -0,0 +1,257 @@
+import io
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from synthesis.audio import decode_audio, encode_pcm16, encode_wav, normalize_reference, streaming_wav_header
+from synthesis.config import SynthesisConfig
+from synthesis.latents import LatentCache, read_blob
+from synthesis.quantization import QUANTIZATION_MODES, quantize_gpt
+
+# Silence after each sentence, in samples; the same pause TTS.api inserts
+SENTENCE_PAUSE = 10000
+# Rate reference audio is loaded at for conditioning, as in ``Xtts.get_conditioning_latents``
+REFERENCE_SAMPLE_RATE = 22050
+
+
+def join_sentences(wavs: list) -> np.ndarray:
+    """One waveform of per-sentence arrays, each followed by the sentence pause."""
+    pause = np.zeros(SENTENCE_PAUSE, dtype=np.float32)
+    return np.concatenate([part for wav in wavs for part in (wav, pause)])
+
+
+class XttsEngine:
+    """Coqui XTTS v2, loaded once per worker process.
+
+    A voice's conditioning latents (``gpt_cond_latent`` and ``speaker_embedding``) are
+    computed once from its reference audio and stored as a blob; synthesis conditions on
+    them directly instead of preprocessing the reference recording on every request.
+    """
+
+    def __init__(self, config: SynthesisConfig):
+        import torch
+        from TTS.api import TTS
+        from TTS.config.shared_configs import BaseDatasetConfig
+        from TTS.tts.configs.xtts_config import XttsArgs, XttsAudioConfig, XttsConfig
+
+        torch.serialization.add_safe_globals([XttsConfig, XttsAudioConfig, XttsArgs, BaseDatasetConfig])
+        # Workers split the cores between them; within a worker one op at a time uses them all
+        torch.set_num_threads(config.threads_per_worker)
+        torch.set_num_interop_threads(1)
+        device = config.device
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        if config.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown TTS_QUANTIZATION: {config.quantization}")
+        if config.quantization == "int8" and device != "cpu":
+            raise ValueError("int8 quantization runs on CPU only; set TTS_DEVICE=cpu")
+        self.torch = torch
+        self.device = device
+        self.tts = TTS(config.model_name).to(device)
+        self.model = self.tts.synthesizer.tts_model
+        if config.quantization == "int8":
+            quantize_gpt(self.model.gpt)
+        self.batch_size = max(1, config.batch_size)
+        self.latents = LatentCache(lambda digest: self._deserialize(read_blob(digest)), config.latent_cache_size)
+
+    def _reference(self, audio: bytes):
+        """Reference audio as ``get_conditioning_latents`` prepares it, decoded in memory."""
+        model_config = self.model.config
+        reference = decode_audio(audio, REFERENCE_SAMPLE_RATE)
+        reference = reference[:, :REFERENCE_SAMPLE_RATE * model_config.max_ref_len].to(self.device)
+        if model_config.sound_norm_refs:
+            reference = reference / reference.abs().max() * 0.75
+        return reference
+
+    def normalize_reference(self, audio_hash: Optional[str] = None, audio: Optional[bytes] = None) -> bytes:
+        """The reference recording at the conditioning rate, without silence at either end and
+        no longer than the model reads, so later latent computations start from a small WAV."""
+        data = read_blob(audio_hash) if audio_hash is not None else audio
+        return normalize_reference(data, REFERENCE_SAMPLE_RATE, self.model.config.max_ref_len)
+
+    def compute_latents(self, audio_hash: Optional[str] = None, audio: Optional[bytes] = None) -> bytes:
+        """Serialized conditioning latents for a reference recording, by blob digest or content.
+
+        The recording is read and decoded in memory; ``get_conditioning_latents`` itself
+        only takes file paths.
+        """
+        model_config = self.model.config
+        reference = self._reference(read_blob(audio_hash) if audio_hash is not None else audio)
+        with self.torch.inference_mode():
+            speaker_embedding = self.model.get_speaker_embedding(reference, REFERENCE_SAMPLE_RATE)
+            gpt_cond_latent = self.model.get_gpt_cond_latents(
+                reference, REFERENCE_SAMPLE_RATE,
+                length=model_config.gpt_cond_len, chunk_length=model_config.gpt_cond_chunk_len,
+            )
+        buffer = io.BytesIO()
+        self.torch.save({"gpt_cond_latent": gpt_cond_latent.cpu(), "speaker_embedding": speaker_embedding.cpu()}, buffer)
+        return buffer.getvalue()
+
+    def speaker_similarity(self, audio: bytes, latents_hash: str) -> float:
+        """Cosine similarity of the speaker in ``audio`` to the voice it was made with.
+
+        Not used when serving; benchmarks use it to compare quality across backends.
+        """
+        with self.torch.inference_mode():
+            produced = self.model.get_speaker_embedding(self._reference(audio), REFERENCE_SAMPLE_RATE)
+        _, reference = self.latents.get(latents_hash)
+        return float(self.torch.nn.functional.cosine_similarity(produced.flatten(), reference.flatten(), dim=0))
+
+    def _deserialize(self, data: bytes):
+        latents = self.torch.load(io.BytesIO(data), map_location=self.device, weights_only=True)
+        return latents["gpt_cond_latent"], latents["speaker_embedding"]
+
+    def _sampling(self) -> dict:
+        model_config = self.model.config
+        return {
+            "temperature": model_config.temperature,
+            "length_penalty": model_config.length_penalty,
+            "repetition_penalty": model_config.repetition_penalty,
+            "top_k": model_config.top_k,
+            "top_p": model_config.top_p,
+        }
+
+    def synthesize(self, text: str, language: str, latents_hash: str) -> bytes:
+        gpt_cond_latent, speaker_embedding = self.latents.get(latents_hash)
+        model_config = self.model.config
+        wav = []
+        with self.torch.inference_mode():
+            for sentence in self.tts.synthesizer.split_into_sentences(text):
+                output = self.model.inference(sentence, language, gpt_cond_latent, speaker_embedding, **self._sampling())
+                wav.append(output["wav"].squeeze().cpu().numpy())
+        if not wav:
+            raise RuntimeError("Failed to generate audio file")
+        return encode_wav(join_sentences(wav), model_config.audio.output_sample_rate)
+
+    def synthesize_batch(self, payloads: List[dict]) -> list:
+        """``synthesize`` for several jobs at once; returns audio or an exception per job.
+
+        Sentences from all jobs are sorted by token count and their GPT codes generated
+        ``batch_size`` at a time in one padded pass, which is where nearly all of the time
+        goes on CPU. Each sentence is then decoded to audio on its own.
+        """
+        results: list = [None] * len(payloads)
+        sentences = []  # (job index, text tokens, gpt_cond_latent, speaker_embedding)
+        for index, payload in enumerate(payloads):
+            try:
+                gpt_cond_latent, speaker_embedding = self.latents.get(payload["latents_hash"])
+                language = payload["language"].split("-")[0]
+                for sentence in self.tts.synthesizer.split_into_sentences(payload["text"]):
+                    sentences.append((index, self._text_tokens(sentence, language), gpt_cond_latent, speaker_embedding))
+            except Exception as e:
+                results[index] = e
+
+        decoded: list = [None] * len(sentences)
+        order = sorted(range(len(sentences)), key=lambda i: sentences[i][1].shape[-1])
+        with self.torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                group = order[start:start + self.batch_size]
+                try:
+                    codes = self._generate_codes([sentences[i][2] for i in group], [sentences[i][1] for i in group])
+                    for i, sentence_codes in zip(group, codes):
+                        _, tokens, gpt_cond_latent, speaker_embedding = sentences[i]
+                        decoded[i] = self._decode(tokens, sentence_codes, gpt_cond_latent, speaker_embedding)
+                except Exception as e:
+                    for i in group:
+                        decoded[i] = e
+
+        wavs = {index: [] for index in range(len(payloads))}
+        for (index, *_), wav in zip(sentences, decoded):
+            if isinstance(wav, Exception):
+                results[index] = results[index] or wav
+            else:
+                wavs[index].append(wav.numpy())
+        sample_rate = self.model.config.audio.output_sample_rate
+        for index, wav in wavs.items():
+            if results[index] is None:
+                results[index] = encode_wav(join_sentences(wav), sample_rate) if wav else RuntimeError("Failed to generate audio file")
+        return results
+
+    def _text_tokens(self, sentence: str, language: str):
+        tokens = self.model.tokenizer.encode(sentence.strip().lower(), lang=language)
+        if len(tokens) >= self.model.args.gpt_max_text_tokens:
+            raise ValueError(f"XTTS can only generate text with a maximum of {self.model.args.gpt_max_text_tokens} tokens")
+        return self.torch.IntTensor(tokens).unsqueeze(0).to(self.device)
+
+    def _generate_codes(self, gpt_cond_latents: list, text_tokens: list) -> list:
+        """Audio codes for several prompts from one ``generate`` call.
+
+        Prompts are left-padded so they all end where generation starts, and masked out.
+        The XTTS GPT has no position embeddings of its own (text positions are embedded
+        per prompt before padding), so padding doesn't shift anything else.
+        """
+        torch = self.torch
+        functional = torch.nn.functional
+        gpt = self.model.gpt
+        prompts = []
+        for gpt_cond_latent, tokens in zip(gpt_cond_latents, text_tokens):
+            tokens = functional.pad(tokens, (0, 1), value=gpt.stop_text_token)
+            tokens = functional.pad(tokens, (1, 0), value=gpt.start_text_token)
+            text_embedding = gpt.text_embedding(tokens) + gpt.text_pos_embedding(tokens)
+            prompts.append(torch.cat([gpt_cond_latent.to(self.device), text_embedding], dim=1))
+        width = max(prompt.shape[1] for prompt in prompts)
+        prefix = torch.cat([functional.pad(prompt, (0, 0, width - prompt.shape[1], 0)) for prompt in prompts])
+        attention_mask = torch.zeros((len(prompts), width + 1), dtype=torch.long, device=prefix.device)
+        for row, prompt in enumerate(prompts):
+            attention_mask[row, width - prompt.shape[1]:] = 1
+        inputs = torch.ones_like(attention_mask)
+        inputs[:, -1] = gpt.start_audio_token
+
+        gpt.gpt_inference.store_prefix_emb(prefix)
+        codes = gpt.gpt_inference.generate(
+            inputs,
+            attention_mask=attention_mask,
+            bos_token_id=gpt.start_audio_token,
+            pad_token_id=gpt.stop_audio_token,
+            eos_token_id=gpt.stop_audio_token,
+            max_length=gpt.max_gen_mel_tokens + inputs.shape[-1],
+            do_sample=True,
+            num_beams=1,
+            output_attentions=False,
+            **self._sampling(),
+        )[:, inputs.shape[-1]:]
+
+        # Rows that finished early are padded with stop tokens; keep each up to its first one
+        trimmed = []
+        for row in codes:
+            stops = (row == gpt.stop_audio_token).nonzero()
+            end = int(stops[0]) + 1 if len(stops) else row.shape[0]
+            trimmed.append(row[:end].unsqueeze(0))
+        return trimmed
+
+    def _decode(self, text_tokens, codes, gpt_cond_latent, speaker_embedding):
+        """Waveform for one sentence's audio codes, as ``Xtts.inference`` does it."""
+        gpt = self.model.gpt
+        latents = gpt(
+            text_tokens,
+            self.torch.tensor([text_tokens.shape[-1]], device=self.device),
+            codes,
+            self.torch.tensor([codes.shape[-1] * gpt.code_stride_len], device=self.device),
+            cond_latents=gpt_cond_latent.to(self.device),
+            return_attentions=False,
+            return_latent=True,
+        )
+        return self.model.hifigan_decoder(latents, g=speaker_embedding.to(self.device)).cpu().squeeze()
+
+    def synthesize_stream(self, text: str, language: str, latents_hash: str,
+                          stream_chunk_size: int = 20) -> Iterator[bytes]:
+        """A streaming WAV header, then 16-bit PCM as XTTS decodes it, sentence by sentence.
+
+        ``stream_chunk_size`` is the number of GPT tokens per chunk: smaller chunks reach the
+        client sooner at some cost in total time.
+        """
+        gpt_cond_latent, speaker_embedding = self.latents.get(latents_hash)
+        # Sent with the first audio, so the first chunk marks the time to first audio
+        header = streaming_wav_header(self.model.config.audio.output_sample_rate)
+        pause = encode_pcm16([0.0] * SENTENCE_PAUSE)
+        with self.torch.inference_mode():
+            for sentence in self.tts.synthesizer.split_into_sentences(text):
+                for chunk in self.model.inference_stream(
+                    sentence, language, gpt_cond_latent, speaker_embedding,
+                    stream_chunk_size=stream_chunk_size, enable_text_splitting=False, **self._sampling(),
+                ):
+                    yield header + encode_pcm16(chunk.squeeze().cpu().numpy())
+                    header = b""
+                yield pause
+        if header:
+            raise RuntimeError("Failed to generate audio file")
@@ -0,0 +1,149 @@
+import base64
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from controllers import clone_voice_controller
+from middleware.with_admin import verify_admin
+from models.chain import Base
+from models.user import Voices
+from synthesis.config import SynthesisConfig
+from utils import audio_upload, environment_manager
+from utils.audio_cache import AudioCache
+from utils.blob_store import FileSystemBlobStore
+from utils.database import get_async_db
+from utils.environment_manager import EnvironmentManager, get_environment_manager
+from utils.voice_encryption import decrypt_voice, shutdown_encryption_pool
+
+USER_ID = "voice-user"
+PRIVATE_KEY = "test-private-key"
+WAV = b"RIFF\x00\x00\x00\x00WAVE" + os.urandom(3000)
+
+
+class EmptyStreamServer:
+    """A synthesis server whose streams end before any audio."""
+    config = SynthesisConfig()
+
+    async def synthesize_stream(self, **payload):
+        async def chunks():
+            return
+            yield
+        return chunks()
+
+
+class VoiceControllerTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        path = os.path.join(self.tmp.name, "voices.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        self.db = Session(engine)
+        self.addCleanup(engine.dispose)
+        self.addCleanup(self.db.close)
+        session_factory = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool))
+
+        async def get_test_db():
+            async with session_factory() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(clone_voice_controller.router)
+        app.dependency_overrides[get_async_db] = get_test_db
+        app.dependency_overrides[verify_admin] = lambda: {"user_id": USER_ID}
+        with patch.dict(os.environ, {"OS": "test", "PRIVATE_KEY": PRIVATE_KEY}):
+            environment = EnvironmentManager()
+        app.dependency_overrides[get_environment_manager] = lambda: environment
+        self.client = TestClient(app)
+        blob_store = FileSystemBlobStore(os.path.join(self.tmp.name, "blobs"))
+        blob_store_patch = patch.object(clone_voice_controller, "get_blob_store", return_value=blob_store)
+        blob_store_patch.start()
+        self.addCleanup(blob_store_patch.stop)
+
+    def voices(self):
+        return self.db.execute(select(Voices)).scalars().all()
+
+
+class TestGenerateVoice(VoiceControllerTestCase):
+
+    def test_empty_text_is_rejected(self):
+        for text in ("", "  \n"):
+            response = self.client.post("/voice/synthesize", json={"text": text, "voice_id": "any", "stream": True})
+            assert response.status_code == 400 and response.json()["detail"] == "No text to synthesize"
+
+    def test_internal_webhook_urls_are_rejected(self):
+        previous = environment_manager._environment
+        environment_manager._environment = None
+        try:
+            with patch.dict(os.environ, {"OS": "test", "JOBS_WEBHOOK_SECRET": "secret"}):
+                for url in ("https://127.0.0.1/hook", "https://10.1.2.3/hook", "http://hooks.example.com/"):
+                    response = self.client.post("/voice/synthesize", json={
+                        "text": "hi", "voice_id": "voice", "background": True, "webhook_url": url,
+                    })
+                    assert response.status_code == 422, url
+        finally:
+            environment_manager._environment = previous
+
+    def test_stream_without_audio_is_an_error(self):
+        self.db.add(Voices(voice_id="voice", user_id=USER_ID, latents_hash="0" * 64))
+        self.db.commit()
+        cache = AudioCache(os.path.join(self.tmp.name, "cache"), 1024 * 1024)
+        with patch.object(clone_voice_controller, "get_synthesis_server", return_value=EmptyStreamServer()), \
+                patch.object(clone_voice_controller, "get_audio_cache", return_value=cache):
+            response = self.client.post("/voice/synthesize", json={"text": "hi", "voice_id": "voice", "stream": True})
+        assert response.status_code == 500 and response.json()["detail"] == "Synthesis produced no audio"
+
+
+async def failing_encryption(private_key, salt, chunks):
+    yield b"header"
+    raise RuntimeError("encryption pool is gone")
+
+
+def multipart_chunks(data: bytes):
+    """A multipart body with one audio file, sent without a Content-Length."""
+    yield (b'--boundary\r\nContent-Disposition: form-data; name="audio_file"; filename="voice.wav"\r\n'
+           b'Content-Type: audio/wav\r\n\r\n')
+    for i in range(0, len(data), 1024):
+        yield data[i:i + 1024]
+    yield b"\r\n--boundary--\r\n"
+
+
+class TestShareVoiceForTraining(VoiceControllerTestCase):
+
+    def share(self):
+        return self.client.post("/voice/share-for-training", files={"audio_file": ("voice.wav", WAV, "audio/wav")})
+
+    def test_voice_is_encrypted_and_saved(self):
+        self.addCleanup(shutdown_encryption_pool)
+        response = self.share()
+        assert response.status_code == 200
+        body = response.json()
+        [voice] = self.voices()
+        assert voice.voice_id == body["id"] and voice.share_for_training
+        ciphertext = base64.b64decode(body["encrypted_voice"])
+        assert decrypt_voice(PRIVATE_KEY, base64.b64decode(voice.salt), ciphertext) == WAV
+
+    def test_oversized_chunked_upload_is_rejected(self):
+        with patch.object(audio_upload, "max_upload_bytes", return_value=1024):
+            response = self.client.post(
+                "/voice/share-for-training",
+                content=multipart_chunks(WAV),
+                headers={"Content-Type": "multipart/form-data; boundary=boundary"},
+            )
+        assert response.status_code == 413
+        assert self.voices() == []
+
+    def test_failed_encryption_saves_nothing(self):
+        with patch.object(clone_voice_controller, "encrypt_stream", failing_encryption):
+            response = self.share()
+        assert response.status_code == 500 and response.json()["detail"] == "encryption pool is gone"
+        assert self.voices() == []
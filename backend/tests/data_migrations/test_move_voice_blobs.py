@@ -0,0 +1,64 @@
+import asyncio
+import hashlib
+import tempfile
+from unittest import TestCase
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from data_migrations.move_voice_blobs import move_voice_blobs
+from models.chain import Base, TwitterUsers
+from models.user import Voices
+from utils.blob_store import FileSystemBlobStore
+
+
+class TestMoveVoiceBlobs(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = FileSystemBlobStore(self.tmp.name)
+        self.loop = asyncio.new_event_loop()
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        self.session_factory = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.wait(self.seed())
+
+    def tearDown(self):
+        self.wait(self.engine.dispose())
+        self.loop.close()
+        self.tmp.cleanup()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    async def seed(self):
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all, tables=[TwitterUsers.__table__, Voices.__table__])
+        async with self.session_factory() as db:
+            db.add(TwitterUsers(id=1, user_id="42", username="u", name="n"))
+            db.add_all([
+                Voices(voice_id="a", user_id="42", voice_bytes=b"same audio"),
+                Voices(voice_id="b", user_id="42", voice_bytes=b"same audio"),
+                Voices(voice_id="c", user_id="42", voice_bytes=b"other audio"),
+            ])
+            await db.commit()
+
+    async def voices(self):
+        async with self.session_factory() as db:
+            return {voice.voice_id: voice for voice in (await db.execute(select(Voices))).scalars()}
+
+    def test_moves_and_deduplicates(self):
+        report = self.wait(move_voice_blobs(self.session_factory, self.store, batch_size=2))
+        assert report == {"moved": 3, "blobs": 2, "blob_bytes": len(b"same audio") + len(b"other audio")}
+
+        voices = self.wait(self.voices())
+        assert voices["a"].audio_hash == voices["b"].audio_hash == hashlib.sha256(b"same audio").hexdigest()
+        assert all(voice.voice_bytes is None for voice in voices.values())
+        assert self.wait(self.store.read(voices["c"].audio_hash)) == b"other audio"
+
+        # Nothing left to do on a second run
+        assert self.wait(move_voice_blobs(self.session_factory, self.store))["moved"] == 0
+
+    def test_keep_bytes(self):
+        self.wait(move_voice_blobs(self.session_factory, self.store, keep_bytes=True))
+        voices = self.wait(self.voices())
+        assert all(voice.audio_hash and voice.voice_bytes for voice in voices.values())
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import tempfile
+from datetime import timedelta
+from unittest import TestCase
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from jobs.config import JobsConfig
+from jobs.queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, QueueFull, describe, utcnow
+from jobs.runner import JobRunner, PermanentJobError, job_handler
+from models.chain import Base
+from models.job import Jobs
+
+
+@job_handler("test.echo")
+async def echo_job(user_id: str, payload: dict) -> dict:
+    if payload.get("missing"):
+        raise PermanentJobError("Nothing to echo")
+    return {"user_id": user_id, **payload}
+
+
+@job_handler("test.sleep")
+async def sleep_job(user_id: str, payload: dict):
+    await asyncio.sleep(60)
+
+
+class QueueTestCase(TestCase):
+    """Each test runs in its own event loop against a fresh SQLite file."""
+
+    config = JobsConfig()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite+aiosqlite:///{os.path.join(self.tmp.name, 'jobs.db')}"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_with_queue(self, test, **config):
+        async def run():
+            engine = create_async_engine(self.url)
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            try:
+                queue = JobQueue(async_sessionmaker(engine, expire_on_commit=False), JobsConfig(**config))
+                return await test(queue)
+            finally:
+                await engine.dispose()
+        return asyncio.run(run())
+
+
+class TestJobQueue(QueueTestCase):
+
+    def test_claim_and_complete(self):
+        async def test(queue):
+            job = await queue.submit("test.echo", "42", {"text": "hi"})
+            claimed = await queue.claim(["test.echo"])
+            assert (claimed.id, claimed.status, claimed.attempts) == (job.id, RUNNING, 1)
+            assert await queue.claim(["test.echo"]) is None
+            assert await queue.complete(claimed, result='{"ok": true}')
+            finished = await queue.get(job.id)
+            assert finished.status == SUCCEEDED and finished.result == '{"ok": true}'
+            assert describe(finished)["result_url"] == f"/jobs/{job.id}/result"
+        self.run_with_queue(test)
+
+    def test_only_claims_the_given_kinds(self):
+        async def test(queue):
+            await queue.submit("test.echo", "42", {})
+            assert await queue.claim(["test.sleep"]) is None
+        self.run_with_queue(test)
+
+    def test_failures_retry_with_backoff_until_out_of_attempts(self):
+        async def test(queue):
+            job = await queue.submit("test.echo", "42", {})
+            claimed = await queue.claim(["test.echo"])
+            assert await queue.fail(claimed, "boom") == QUEUED
+            waiting = await queue.get(job.id)
+            assert waiting.run_after > utcnow() + timedelta(seconds=9)
+            assert await queue.claim(["test.echo"]) is None
+
+            async with queue.session_factory() as db:
+                await db.execute(update(Jobs).where(Jobs.id == job.id).values(run_after=utcnow()))
+                await db.commit()
+            claimed = await queue.claim(["test.echo"])
+            assert claimed.attempts == 2
+            assert await queue.fail(claimed, "boom again") == FAILED
+            failed = await queue.get(job.id)
+            assert (failed.status, failed.error) == (FAILED, "boom again")
+            assert failed.finished_at is not None
+        self.run_with_queue(test, max_attempts=2, retry_backoff=10.0)
+
+    def test_permanent_failures_are_not_retried(self):
+        async def test(queue):
+            await queue.submit("test.echo", "42", {})
+            claimed = await queue.claim(["test.echo"])
+            assert await queue.fail(claimed, "no such voice", retry=False) == FAILED
+        self.run_with_queue(test)
+
+    def test_per_user_caps(self):
+        async def test(queue):
+            first = await queue.submit("test.echo", "a", {})
+            await queue.submit("test.echo", "a", {})
+            other = await queue.submit("test.echo", "b", {})
+            # User a is at the running cap, so their second job waits behind user b's
+            assert (await queue.claim(["test.echo"])).id == first.id
+            assert (await queue.claim(["test.echo"])).id == other.id
+            assert await queue.claim(["test.echo"]) is None
+
+            await queue.submit("test.echo", "a", {})
+            with self.assertRaises(QueueFull):
+                await queue.submit("test.echo", "a", {})
+        self.run_with_queue(test, max_running_per_user=1, max_queued_per_user=3)
+
+    def test_expired_leases_are_handed_on(self):
+        async def test(queue):
+            job = await queue.submit("test.echo", "42", {})
+            stale = await queue.claim(["test.echo"])
+            assert await queue.expire_leases() == []
+            reclaimed = await queue.claim(["test.echo"])
+            assert reclaimed.attempts == 2
+            # The first runner no longer owns the job
+            assert not await queue.heartbeat(stale)
+            assert not await queue.complete(stale, result="{}")
+            assert await queue.complete(reclaimed, result="{}")
+            assert (await queue.get(job.id)).status == SUCCEEDED
+        self.run_with_queue(test, lease_seconds=-1.0, retry_backoff=0.0)
+
+    def test_metrics(self):
+        async def test(queue):
+            await queue.submit("test.echo", "a", {})
+            await queue.submit("test.echo", "b", {})
+            await queue.submit("test.sleep", "c", {})
+            await queue.claim(["test.sleep"])
+            metrics = await queue.metrics()
+            assert (metrics[QUEUED], metrics[RUNNING], metrics["due"]) == (2, 1, 2)
+            assert metrics["by_kind"]["test.echo"] == {QUEUED: 2, RUNNING: 0}
+            assert metrics["oldest_queued_s"] >= 0
+        self.run_with_queue(test)
+
+    def test_delete_finished(self):
+        async def test(queue):
+            job = await queue.submit("test.echo", "42", {})
+            await queue.complete(await queue.claim(["test.echo"]), result="{}")
+            assert await queue.delete_finished() == 1
+            assert await queue.get(job.id) is None
+        self.run_with_queue(test, retention_hours=-1.0)
+
+
+class TestJobRunner(QueueTestCase):
+
+    async def wait_for(self, queue, job_id, statuses):
+        for _ in range(200):
+            job = await queue.get(job_id)
+            if job.status in statuses:
+                return job
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"job {job_id} is still {job.status}")
+
+    def test_runs_jobs_to_completion(self):
+        async def test(queue):
+            runner = JobRunner(queue, concurrency=2)
+            runner.start()
+            try:
+                done = await queue.submit("test.echo", "42", {"text": "hi"})
+                missing = await queue.submit("test.echo", "42", {"missing": True})
+                runner.notify()
+                done = await self.wait_for(queue, done.id, (SUCCEEDED,))
+                assert done.result == '{"user_id": "42", "text": "hi"}'
+                missing = await self.wait_for(queue, missing.id, (FAILED,))
+                assert (missing.attempts, missing.error) == (1, "Nothing to echo")
+                metrics = await runner.metrics()
+                assert (metrics["runner"][SUCCEEDED], metrics["runner"][FAILED]) == (1, 1)
+            finally:
+                await runner.stop()
+        self.run_with_queue(test, poll_interval=0.05)
+
+    def test_stopping_puts_running_jobs_back(self):
+        async def test(queue):
+            runner = JobRunner(queue, concurrency=1)
+            runner.start()
+            job = await queue.submit("test.sleep", "42", {})
+            runner.notify()
+            await self.wait_for(queue, job.id, (RUNNING,))
+            await runner.stop()
+            job = await queue.get(job.id)
+            assert (job.status, job.attempts) == (QUEUED, 0)
+        self.run_with_queue(test, poll_interval=0.05)
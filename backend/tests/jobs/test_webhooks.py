@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+import httpx
+from pydantic import ValidationError
+
+from controllers.request_models.agent_models import AgentJobRequest
+from jobs.webhooks import SIGNATURE_HEADER, TIMESTAMP_HEADER, WebhookNotAllowed, check_webhook_url, \
+    resolve_webhook_host, send_webhook
+from utils import environment_manager
+
+SECRET = "webhook-secret"
+
+
+class WebhookTestCase(TestCase):
+    environment = {"OS": "test", "JOBS_WEBHOOK_SECRET": SECRET, "JOBS_WEBHOOK_ALLOWED_HOSTS": ""}
+
+    def setUp(self):
+        previous = environment_manager._environment
+        environment_manager._environment = None
+        env = patch.dict(os.environ, self.environment)
+        env.start()
+
+        def restore():
+            env.stop()
+            environment_manager._environment = previous
+        self.addCleanup(restore)
+
+
+class TestCheckWebhookUrl(WebhookTestCase):
+
+    def test_public_https_urls_are_allowed(self):
+        for url in ("https://hooks.example.com/jobs", "https://93.184.216.34:8443/hook"):
+            assert check_webhook_url(url) == url
+
+    def test_internal_and_plain_http_urls_are_rejected(self):
+        for url in ("http://hooks.example.com/jobs", "https://127.0.0.1/hook", "https://localhost/hook",
+                    "https://10.0.0.5/hook", "https://192.168.1.1/hook", "https://169.254.169.254/latest/meta-data",
+                    "https://[::1]/hook", "https://[::ffff:127.0.0.1]/hook", "https://0.0.0.0/hook"):
+            with self.assertRaises(WebhookNotAllowed, msg=url):
+                check_webhook_url(url)
+
+    def test_request_models_reject_them(self):
+        with self.assertRaises(ValidationError):
+            AgentJobRequest(message="hi", wallet_address="0x0", webhook_url="https://169.254.169.254/")
+        request = AgentJobRequest(message="hi", wallet_address="0x0", webhook_url="https://hooks.example.com/")
+        assert str(request.webhook_url) == "https://hooks.example.com/"
+
+    def test_names_resolving_to_internal_addresses_are_rejected(self):
+        with self.assertRaises(WebhookNotAllowed):
+            asyncio.run(resolve_webhook_host("localhost", 443))
+
+
+class TestWebhookAllowList(WebhookTestCase):
+    environment = {**WebhookTestCase.environment, "JOBS_WEBHOOK_ALLOWED_HOSTS": "hooks.internal, 10.0.0.5"}
+
+    def test_only_listed_hosts_are_allowed(self):
+        assert check_webhook_url("https://10.0.0.5/hook")
+        assert check_webhook_url("https://hooks.internal/hook")
+        with self.assertRaises(WebhookNotAllowed):
+            check_webhook_url("https://hooks.example.com/hook")
+
+
+class TestWebhooksOff(WebhookTestCase):
+    environment = {**WebhookTestCase.environment, "JOBS_WEBHOOK_SECRET": ""}
+
+    def test_urls_are_rejected_without_a_secret(self):
+        with self.assertRaises(WebhookNotAllowed):
+            check_webhook_url("https://hooks.example.com/jobs")
+
+
+class TestSendWebhook(WebhookTestCase):
+
+    def test_deliveries_are_signed(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(204)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                await send_webhook("https://93.184.216.34/hook", {"id": "job", "status": "succeeded"}, 5, client)
+        asyncio.run(run())
+
+        [request] = requests
+        assert json.loads(request.content) == {"id": "job", "status": "succeeded"}
+        expected = hmac.new(SECRET.encode(), request.headers[TIMESTAMP_HEADER].encode() + b"." + request.content,
+                            hashlib.sha256).hexdigest()
+        assert request.headers[SIGNATURE_HEADER] == f"sha256={expected}"
+
+    def test_internal_urls_are_not_called(self):
+        requests = []
+
+        async def run():
+            transport = httpx.MockTransport(lambda request: requests.append(request) or httpx.Response(204))
+            async with httpx.AsyncClient(transport=transport) as client:
+                # Stored before the check existed
+                await send_webhook("https://127.0.0.1/hook", {"id": "job"}, 5, client)
+        asyncio.run(run())
+        assert requests == []
@@ -0,0 +1,101 @@
+import glob
+import os
+import re
+from unittest import TestCase, skipUnless
+
+from sqlalchemy import Index, create_engine, delete, select, text, update
+
+from models.chain import (Agents, Base, Chain, KnowledgeBase, LlmProvider, SpecialUserCode, Transaction,
+                          TwitterUsers, agent_chain, agent_knowledge_base, agent_llm_provider)
+from models.job import Jobs
+from models.oauth_state import OAuthStates
+from models.user import Voices
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), "..", "..", "..", "frontend_app", "prisma", "migrations")
+PLAN_CONNECTION_STRING = os.getenv("QUERY_PLAN_CONNECTION_STRING")
+
+AGENT_COLUMNS = (Agents.id, Agents.name, Agents.description, Agents.is_on_point_system)
+AGENT_IDS = ["a1", "a2", "a3"]
+
+
+def hot_queries():
+    """The filtered lookups the request handlers run, keyed by a readable name.
+
+    Full listings of the admin catalogs and the special-code list are left out: they read
+    the whole table on purpose.
+    """
+    return {
+        "twitter user by user_id": select(TwitterUsers).where(TwitterUsers.user_id == "42"),
+        "agent page": select(*AGENT_COLUMNS).join(TwitterUsers, Agents.user_id == TwitterUsers.id)
+        .where(TwitterUsers.user_id == "42", Agents.id > "a1").order_by(Agents.id).limit(51),
+        "agent by owner": select(*AGENT_COLUMNS).join(TwitterUsers, Agents.user_id == TwitterUsers.id)
+        .where(TwitterUsers.user_id == "42", Agents.id == "a1"),
+        "agent chains": select(agent_chain.c.agent_id, agent_chain.c.chain_id)
+        .where(agent_chain.c.agent_id.in_(AGENT_IDS)),
+        "agent llm providers": select(agent_llm_provider.c.agent_id, agent_llm_provider.c.llm_provider_id)
+        .where(agent_llm_provider.c.agent_id.in_(AGENT_IDS)),
+        "disable chain": update(Chain).where(Chain.id == "c1").values(disabled=True),
+        "chain links": delete(agent_chain).where(agent_chain.c.chain_id == "c1"),
+        "knowledge base links": delete(agent_knowledge_base).where(agent_knowledge_base.c.knowledge_base_id == "k1"),
+        "llm provider agents": select(agent_llm_provider.c.agent_id).where(agent_llm_provider.c.llm_provider_id == "l1"),
+        "delete agents": delete(Agents).where(Agents.id.in_(AGENT_IDS)),
+        "delete llm provider": delete(LlmProvider).where(LlmProvider.id == "l1"),
+        "delete knowledge base": delete(KnowledgeBase).where(KnowledgeBase.id == "k1"),
+        "unused special code": select(SpecialUserCode).where(SpecialUserCode.code == "X", SpecialUserCode.is_used == False),
+        "user voices": select(Voices).where(Voices.user_id == "42"),
+        "user voice": select(Voices).where(Voices.user_id == "42", Voices.voice_id == "v1"),
+        "user ipfs voices": select(Voices).where(Voices.user_id == "42", Voices.ipfs_hash != "", Voices.ipfs_hash != None),
+        "wallet transactions": select(Transaction).where(Transaction.user_wallet == "0xabc")
+        .order_by(Transaction.created_at.desc()).limit(20),
+        "due jobs": select(Jobs.id).where(Jobs.status == "queued", Jobs.run_after <= "2026-01-01")
+        .order_by(Jobs.run_after).limit(20),
+        "expired job leases": select(Jobs).where(Jobs.status == "running", Jobs.locked_until < "2026-01-01"),
+        "user pending jobs": select(Jobs.id).where(Jobs.user_id == "42", Jobs.status.in_(["queued", "running"])),
+        "expired oauth states": delete(OAuthStates).where(OAuthStates.expires_at <= "2026-01-01"),
+        "oauth state": delete(OAuthStates).where(OAuthStates.state == "s"),
+    }
+
+
+def explain(connection, prefix: str, statement) -> str:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    return "\n".join(" ".join(str(value) for value in row) for row in connection.exec_driver_sql(f"{prefix} {sql}"))
+
+
+class TestQueryPlans(TestCase):
+
+    def test_sqlite_plans_use_indexes(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with engine.connect() as connection:
+            for name, statement in hot_queries().items():
+                plan = explain(connection, "EXPLAIN QUERY PLAN", statement)
+                # "SCAN <table>" is a full table read; index scans show up as "SCAN ... USING INDEX"
+                full_scans = [line for line in plan.splitlines()
+                              if re.search(r"\bSCAN \w+$", line.strip()) and "USING" not in line]
+                assert not full_scans, f"{name} scans a whole table:\n{plan}"
+                assert "USE TEMP B-TREE" not in plan, f"{name} sorts outside an index:\n{plan}"
+        engine.dispose()
+
+    @skipUnless(PLAN_CONNECTION_STRING, "QUERY_PLAN_CONNECTION_STRING not set")
+    def test_postgres_plans_use_indexes(self):
+        """Checks a database migrated by Prisma; sequential scans are disabled so an
+        empty table still shows which index the planner would pick."""
+        engine = create_engine(PLAN_CONNECTION_STRING)
+        with engine.connect() as connection:
+            connection.execute(text("SET enable_seqscan = off"))
+            for name, statement in hot_queries().items():
+                plan = explain(connection, "EXPLAIN", statement)
+                assert "Seq Scan" not in plan, f"{name} falls back to a sequential scan:\n{plan}"
+        engine.dispose()
+
+    @skipUnless(os.path.isdir(MIGRATIONS), "Prisma migrations not checked out")
+    def test_model_indexes_have_migrations(self):
+        """Composite and link-table indexes declared on the models must be created by a Prisma migration."""
+        created = set()
+        for path in glob.glob(os.path.join(MIGRATIONS, "*", "migration.sql")):
+            with open(path) as f:
+                created.update(re.findall(r'CREATE (?:UNIQUE )?INDEX "([^"]+)"', f.read()))
+        declared = {index.name for table in Base.metadata.tables.values() for index in table.indexes
+                    if isinstance(index, Index) and not index.name.startswith("ix_")}
+        assert declared, "no named indexes declared"
+        assert declared <= created, f"missing migrations for {sorted(declared - created)}"
@@ -0,0 +1,52 @@
+import hashlib
+import os
+import time
+from typing import Optional
+
+from synthesis.latents import read_blob
+
+
+class FakeEngine:
+    """Stands in for XTTS in the synthesis tests; the text decides what happens."""
+
+    def __init__(self, config):
+        if config.model_name == "broken":
+            raise RuntimeError("no such model")
+        self.pid = os.getpid()
+
+    def compute_latents(self, audio_hash: Optional[str] = None, audio: Optional[bytes] = None) -> bytes:
+        if audio_hash is not None:
+            audio = read_blob(audio_hash)
+        return b"latents:" + hashlib.sha256(audio).hexdigest().encode()
+
+    def normalize_reference(self, audio_hash: Optional[str] = None, audio: Optional[bytes] = None) -> bytes:
+        if audio_hash is not None:
+            audio = read_blob(audio_hash)
+        return b"RIFFreference:" + hashlib.sha256(audio).hexdigest().encode()
+
+    def synthesize(self, text: str, language: str, latents_hash: str) -> bytes:
+        if text == "fail":
+            raise ValueError("bad text")
+        if text == "crash":
+            os._exit(3)
+        if text.startswith("sleep"):
+            time.sleep(float(text.split()[1]))
+        return f"{language}:{latents_hash}:{text}:{self.pid}".encode()
+
+    def synthesize_batch(self, payloads: list) -> list:
+        results = []
+        for payload in payloads:
+            try:
+                results.append(self.synthesize(**payload) + f":batch of {len(payloads)}".encode())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def synthesize_stream(self, text: str, language: str, latents_hash: str):
+        """One chunk per word; the word "fail" raises and "slow" takes 0.2s."""
+        for word in text.split():
+            if word == "fail":
+                raise ValueError("bad text")
+            if word == "slow":
+                time.sleep(0.2)
+            yield f"{language}:{latents_hash}:{word}".encode()
@@ -0,0 +1,76 @@
+import importlib.util
+import io
+import tempfile
+import wave
+from unittest import TestCase, skipUnless
+
+import numpy as np
+
+from synthesis.audio import decode_audio, encode_wav, normalize_reference, trim_silence
+
+
+def stereo_wav(sample_rate: int, seconds: float, silence: float = 0.0) -> bytes:
+    """Two tones, with ``silence`` seconds of nothing before and after."""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    left = np.sin(2 * np.pi * 220 * t)
+    right = np.sin(2 * np.pi * 330 * t)
+    padding = np.zeros((int(sample_rate * silence), 2))
+    pcm = (np.concatenate([padding, np.stack([left, right], axis=1), padding]) * 16000).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def tone(sample_rate: int, seconds: float) -> np.ndarray:
+    return (0.5 * np.sin(2 * np.pi * 220 * np.arange(int(sample_rate * seconds)) / sample_rate)).astype(np.float32)
+
+
+class TestTrimSilence(TestCase):
+
+    def test_trims_both_ends_with_a_margin(self):
+        silence = np.zeros(16000, dtype=np.float32)
+        trimmed = trim_silence(np.concatenate([silence, tone(16000, 1.0), silence]), 16000)
+        # One second of tone plus 100 ms either side
+        assert len(trimmed) == 16000 + 2 * 1600
+
+    def test_keeps_audio_that_is_all_silence_or_too_short(self):
+        assert len(trim_silence(np.zeros(8000, dtype=np.float32), 16000)) == 8000
+        assert len(trim_silence(np.ones(10, dtype=np.float32), 16000)) == 10
+
+
+@skipUnless(importlib.util.find_spec("torchaudio"), "needs torchaudio")
+class TestDecodeAudio(TestCase):
+
+    def test_decodes_to_mono_at_the_requested_rate(self):
+        audio = decode_audio(stereo_wav(44100, 0.5), 22050)
+        assert audio.shape == (1, 11025)
+        assert float(audio.abs().max()) <= 1.0
+
+    def test_matches_loading_from_a_file(self):
+        import torch
+        import torchaudio
+
+        data = stereo_wav(16000, 0.25)
+        with tempfile.NamedTemporaryFile(suffix=".wav") as f:
+            f.write(data)
+            f.flush()
+            expected, rate = torchaudio.load(f.name)
+        expected = torchaudio.functional.resample(expected.mean(dim=0, keepdim=True), rate, 22050)
+        assert torch.allclose(decode_audio(data, 22050), expected)
+
+    def test_round_trips_encoded_output(self):
+        samples = np.sin(np.linspace(0, 100, 2400)).astype(np.float32)
+        audio = decode_audio(encode_wav(samples, 24000), 24000)
+        assert np.allclose(audio.squeeze().numpy(), samples, atol=1e-3)
+
+    def test_normalized_reference_is_mono_trimmed_and_capped(self):
+        padded = stereo_wav(44100, 5.0, silence=1.0)
+        with wave.open(io.BytesIO(normalize_reference(padded, 22050, max_seconds=30))) as wav:
+            assert (wav.getnchannels(), wav.getframerate()) == (1, 22050)
+            assert abs(wav.getnframes() - 22050 * 5.2) < 22050 * 0.05
+        with wave.open(io.BytesIO(normalize_reference(padded, 22050, max_seconds=2))) as wav:
+            assert wav.getnframes() == 22050 * 2
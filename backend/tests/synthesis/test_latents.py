@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from synthesis.latents import LatentCache
+
+
+class TestLatentCache(TestCase):
+
+    def setUp(self):
+        self.loaded = []
+        self.cache = LatentCache(self.load, max_size=2)
+
+    def load(self, digest: str):
+        self.loaded.append(digest)
+        return f"latents of {digest}"
+
+    def test_hits_skip_the_loader(self):
+        assert self.cache.get("a") == "latents of a"
+        assert self.cache.get("a") == "latents of a"
+        assert self.loaded == ["a"]
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.get("a")
+        self.cache.get("b")
+        self.cache.get("a")
+        self.cache.get("c")
+        assert len(self.cache) == 2
+        self.cache.get("a")
+        self.cache.get("b")
+        assert self.loaded == ["a", "b", "c", "b"]
+
+    def test_zero_size_disables_caching(self):
+        cache = LatentCache(self.load, max_size=0)
+        cache.get("a")
+        cache.get("a")
+        assert self.loaded == ["a", "a"]
+        assert len(cache) == 0
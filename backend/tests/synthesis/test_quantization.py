@@ -0,0 +1,24 @@
+import importlib.util
+from unittest import TestCase, skipUnless
+
+from synthesis.quantization import quantize_gpt
+
+
+@skipUnless(importlib.util.find_spec("torch") and importlib.util.find_spec("transformers"), "needs torch and transformers")
+class TestQuantizeGpt(TestCase):
+
+    def test_gpt2_projections_are_quantized(self):
+        import torch
+        from transformers import GPT2Config, GPT2Model
+
+        torch.manual_seed(0)
+        model = GPT2Model(GPT2Config(n_layer=2, n_embd=64, n_head=4)).eval()
+        inputs = torch.randn(1, 10, 64)
+        with torch.inference_mode():
+            expected = model(inputs_embeds=inputs).last_hidden_state
+
+        # Four Conv1D projections per block
+        assert quantize_gpt(model) == 8
+        with torch.inference_mode():
+            actual = model(inputs_embeds=inputs).last_hidden_state
+        assert torch.allclose(actual, expected, atol=0.05)
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from unittest import TestCase
+
+from synthesis.config import SynthesisConfig
+from synthesis.server import SynthesisBusy, SynthesisError, SynthesisServer
+
+FAKE_ENGINE = "tests.synthesis.fake_engine:FakeEngine"
+
+
+class TestSynthesisServer(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.stop()
+        self.loop.close()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def start(self, **options):
+        self.server = SynthesisServer(SynthesisConfig(engine=FAKE_ENGINE, **options))
+        self.server.start()
+        self.wait(self.server.wait_ready(timeout=60))
+        return self.server
+
+    def synthesize(self, text: str) -> bytes:
+        return self.wait(self.server.synthesize(text=text, latents_hash="ref", language="en"))
+
+    def test_jobs_run_on_resident_workers(self):
+        server = self.start(workers=2, threads=1)
+
+        async def burst():
+            return await asyncio.gather(*(
+                server.synthesize(text=f"sleep 0.2 {i}", latents_hash="ref", language="en") for i in range(4)
+            ))
+
+        results = self.wait(burst())
+        assert [result.decode().split(":")[2] for result in results] == [f"sleep 0.2 {i}" for i in range(4)]
+        # Both workers served jobs, and neither reloaded the engine
+        assert len({result.decode().split(":")[3] for result in results}) == 2
+
+        metrics = server.metrics()
+        assert metrics["completed"] == 4
+        assert all(worker["model_load_s"] is not None and worker["alive"] for worker in metrics["workers"])
+        assert metrics["inference"]["p50_ms"] >= 200
+        assert metrics["total"]["p99_ms"] >= metrics["inference"]["p50_ms"]
+
+    def test_other_engine_methods(self):
+        self.start(workers=1)
+        latents = self.wait(self.server.compute_latents(audio=b"RIFFreference"))
+        assert latents.startswith(b"latents:")
+        assert self.wait(self.server.synthesize(text="hi", latents_hash="abc", language="en")).startswith(b"en:abc:hi")
+
+    def test_streamed_output_arrives_in_chunks(self):
+        server = self.start(workers=1)
+
+        async def collect(text: str):
+            return [chunk async for chunk in await server.synthesize_stream(text=text, latents_hash="abc", language="en")]
+
+        assert self.wait(collect("one two three")) == [b"en:abc:one", b"en:abc:two", b"en:abc:three"]
+        metrics = server.metrics()
+        assert metrics["first_audio"]["p99_ms"] <= metrics["total"]["p99_ms"]
+        with self.assertRaisesRegex(SynthesisError, "bad text"):
+            self.wait(collect("one fail"))
+        metrics = server.metrics()
+        assert metrics["completed"] == 1 and metrics["failed"] == 1
+
+    def test_abandoned_stream_stops_the_worker(self):
+        server = self.start(workers=1)
+
+        async def first_chunk_only():
+            chunks = await server.synthesize_stream(text="one " + "slow " * 25, latents_hash="abc", language="en")
+            first = await anext(chunks)
+            await chunks.aclose()
+            return first
+
+        assert self.wait(first_chunk_only()) == b"en:abc:one"
+        # The worker gives up on the remaining five seconds of words and takes the next job
+        started = time.monotonic()
+        assert self.synthesize("hello").startswith(b"en:ref:hello")
+        assert time.monotonic() - started < 2
+
+    def test_compatible_jobs_are_batched(self):
+        server = self.start(workers=1, batch_size=3, batch_wait_ms=300, batch_length_ratio=3)
+
+        async def burst():
+            return await asyncio.gather(
+                server.synthesize(text="hello one", latents_hash="a", language="en"),
+                server.synthesize(text="hello two", latents_hash="b", language="en"),
+                server.synthesize(text="fail", latents_hash="a", language="en"),
+                server.synthesize(text="bonjour", latents_hash="a", language="fr"),
+                server.synthesize(text="hello " * 20, latents_hash="a", language="en"),
+                return_exceptions=True,
+            )
+
+        one, two, failed, french, long = self.wait(burst())
+        assert one == f"en:a:hello one:{one.decode().split(':')[3]}:batch of 3".encode()
+        assert two.endswith(b"batch of 3")
+        assert isinstance(failed, SynthesisError)
+        # Other languages and much longer texts wait for a batch of their own
+        assert not french.endswith(b"batch of 3") and not long.endswith(b"batch of 3")
+        assert server.metrics()["batching"]["mean_size"] == round(5 / 3, 2)
+
+    def test_lone_job_waits_at_most_the_batch_window(self):
+        self.start(workers=1, batch_size=4, batch_wait_ms=300)
+        started = time.monotonic()
+        assert self.synthesize("hello").startswith(b"en:ref:hello")
+        assert 0.25 < time.monotonic() - started < 2
+
+    def test_engine_errors_are_reported(self):
+        self.start(workers=1)
+        with self.assertRaisesRegex(SynthesisError, "bad text"):
+            self.synthesize("fail")
+        assert self.synthesize("hello").startswith(b"en:ref:hello")
+        assert self.server.metrics()["failed"] == 1
+
+    def test_crashed_worker_is_restarted(self):
+        self.start(workers=1)
+        with self.assertRaisesRegex(SynthesisError, "exited"):
+            self.synthesize("crash")
+        self.wait(self.server.wait_ready(timeout=60))
+        assert self.synthesize("hello").startswith(b"en:ref:hello")
+        assert self.server.metrics()["restarts"] == 1
+
+    def test_full_queue_rejects(self):
+        server = self.start(workers=1, queue_size=1)
+
+        async def overload():
+            running = asyncio.ensure_future(server.synthesize(text="sleep 0.5", latents_hash="", language="en"))
+            await asyncio.sleep(0.2)
+            queued = asyncio.ensure_future(server.synthesize(text="queued", latents_hash="", language="en"))
+            await asyncio.sleep(0)
+            with self.assertRaises(SynthesisBusy):
+                await server.synthesize(text="rejected", latents_hash="", language="en")
+            await asyncio.gather(running, queued)
+
+        self.wait(overload())
+        assert server.metrics()["rejected"] == 1
+
+    def test_load_failure(self):
+        self.start(workers=1, model_name="broken")
+        assert "no such model" in self.server.metrics()["workers"][0]["load_error"]
+        with self.assertRaisesRegex(SynthesisError, "failed to load"):
+            self.synthesize("hello")
@@ -0,0 +1,83 @@
+import os
+import urllib.parse
+from unittest import TestCase
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.middleware.sessions import SessionMiddleware
+
+from controllers import twitter_controller
+from utils.database import get_async_db
+from utils.environment_manager import EnvironmentManager, get_environment_manager
+from utils.oauth_state import MemoryOAuthStateStore
+
+ENVIRONMENT = {
+    "OS": "prod",
+    "BACKEND_API_URL": "http://testserver",
+    "TWITTER_CLIENT_ID": "client-id",
+    "TWITTER_CLIENT_SECRET": "client-secret",
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def rejected_token_request(method, url, **kwargs):
+    return httpx.Response(400, text="invalid_request", request=httpx.Request(method, url))
+
+
+class TestTwitterCallback(TestCase):
+
+    def setUp(self):
+        with patch.dict(os.environ, ENVIRONMENT):
+            environment = EnvironmentManager()
+        app = FastAPI()
+        app.add_middleware(SessionMiddleware, secret_key="test", session_cookie="session")
+        app.include_router(twitter_controller.router)
+        app.dependency_overrides[get_async_db] = lambda: None
+        app.dependency_overrides[get_environment_manager] = lambda: environment
+        self.client = TestClient(app)
+        self.clock = Clock()
+        self.store = MemoryOAuthStateStore(ttl=600, clock=self.clock)
+        patches = [
+            patch.object(twitter_controller, "get_oauth_state_store", return_value=self.store),
+            # The code exchange fails, so a callback that got past the state check answers
+            # with X's error rather than "Unknown or expired login state"
+            patch.object(twitter_controller, "twitter_request", rejected_token_request),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def login(self) -> str:
+        response = self.client.get("/api/twitter/login", follow_redirects=False)
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(response.headers["location"]).query)
+        return query["state"][0]
+
+    def callback(self, state: str):
+        return self.client.get("/api/twitter/callback", params={"code": "code", "state": state})
+
+    def test_state_is_used_once(self):
+        state = self.login()
+        first = self.callback(state)
+        assert first.status_code == 400 and "invalid_request" in first.json()["detail"]
+        replayed = self.callback(state)
+        assert replayed.status_code == 400 and replayed.json()["detail"] == "Unknown or expired login state"
+
+    def test_expired_state_is_rejected(self):
+        state = self.login()
+        self.clock.now = 600
+        response = self.callback(state)
+        assert response.status_code == 400 and response.json()["detail"] == "Unknown or expired login state"
+
+    def test_state_is_required(self):
+        self.login()
+        assert self.client.get("/api/twitter/callback", params={"code": "code"}).status_code == 422
+        assert self.callback("unknown").status_code == 400
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import tempfile
+from unittest import TestCase
+
+from utils.audio_cache import AudioCache, cache_key
+
+
+class TestAudioCache(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = AudioCache(self.tmp.name, max_bytes=1000)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.tmp.cleanup()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_key_normalizes_text_and_covers_params(self):
+        assert cache_key("Hello  there\n", language="en") == cache_key(" Hello there", language="en")
+        # Composed and decomposed forms of é
+        assert cache_key("caf\u00e9", language="en") == cache_key("cafe\u0301", language="en")
+        assert cache_key("Hello there", language="en") != cache_key("hello there", language="en")
+        assert cache_key("Hello", language="en") != cache_key("Hello", language="fr")
+
+    def test_hit_and_miss(self):
+        assert self.wait(self.cache.get("voice", "k1")) is None
+        path = self.wait(self.cache.put("voice", "k1", b"RIFFaudio"))
+        assert self.wait(self.cache.get("voice", "k1")) == path
+        with open(path, "rb") as f:
+            assert f.read() == b"RIFFaudio"
+
+    def test_least_recently_used_is_evicted(self):
+        for index, key in enumerate(["a", "b", "c"]):
+            path = self.wait(self.cache.put("voice", key, os.urandom(300)))
+            os.utime(path, (index, index))
+        # Reading "a" makes "b" the least recently used
+        self.wait(self.cache.get("voice", "a"))
+        self.wait(self.cache.put("voice", "d", os.urandom(300)))
+
+        assert self.wait(self.cache.get("voice", "b")) is None
+        for key in ["a", "c", "d"]:
+            assert self.wait(self.cache.get("voice", key)) is not None
+
+    def test_invalidate_drops_only_that_voice(self):
+        self.wait(self.cache.put("voice-1", "k", b"one"))
+        self.wait(self.cache.put("voice-2", "k", b"two"))
+        self.wait(self.cache.invalidate("voice-1"))
+        assert self.wait(self.cache.get("voice-1", "k")) is None
+        assert self.wait(self.cache.get("voice-2", "k")) is not None
+
+    def test_disabled_and_invalid_voice_ids(self):
+        disabled = AudioCache(self.tmp.name, max_bytes=0)
+        assert self.wait(disabled.put("voice", "k", b"audio")) is None
+        assert self.wait(disabled.get("voice", "k")) is None
+        with self.assertRaises(ValueError):
+            self.wait(self.cache.get("../voice", "k"))
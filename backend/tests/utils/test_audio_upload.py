@@ -0,0 +1,78 @@
+import asyncio
+import io
+import os
+from unittest import TestCase
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+from middleware.upload_limit import UploadSizeLimit
+from utils.audio_upload import UnsupportedAudio, UploadTooLarge, read_audio_upload, sniff_audio_format
+
+WAV = b"RIFF\x24\x08\x00\x00WAVEfmt "
+
+
+class TestSniffAudioFormat(TestCase):
+
+    def test_formats(self):
+        assert sniff_audio_format(WAV) == "wav"
+        assert sniff_audio_format(b"ID3\x04\x00\x00\x00\x00\x00\x00\x00\x00") == "mp3"
+        assert sniff_audio_format(b"\xff\xfb\x90\x64" + bytes(8)) == "mp3"
+        assert sniff_audio_format(b"OggS" + bytes(8)) == "ogg"
+        assert sniff_audio_format(b"fLaC" + bytes(8)) == "flac"
+        assert sniff_audio_format(b"\x00\x00\x00\x20ftypM4A ") == "mp4"
+        assert sniff_audio_format(b"\x1a\x45\xdf\xa3" + bytes(8)) == "webm"
+        assert sniff_audio_format(b"RIFF\x24\x08\x00\x00AVI ") is None
+        assert sniff_audio_format(b"<html>") is None
+        assert sniff_audio_format(b"") is None
+
+
+class TestReadAudioUpload(TestCase):
+
+    def read(self, data: bytes, max_bytes: int, declare_size: bool = True) -> bytes:
+        upload = StarletteUploadFile(io.BytesIO(data), size=len(data) if declare_size else None)
+
+        async def collect():
+            return b"".join([chunk async for chunk in await read_audio_upload(upload, max_bytes)])
+        return asyncio.run(collect())
+
+    def test_reads_in_chunks(self):
+        data = WAV + os.urandom(200_000)
+        assert self.read(data, max_bytes=len(data)) == data
+
+    def test_rejects_other_files_before_reading_on(self):
+        with self.assertRaises(UnsupportedAudio):
+            self.read(b"<html>" + bytes(100), max_bytes=1000)
+        with self.assertRaises(UnsupportedAudio):
+            self.read(b"RIFF", max_bytes=1000)
+
+    def test_enforces_the_size_limit(self):
+        data = WAV + os.urandom(200_000)
+        with self.assertRaises(UploadTooLarge):
+            self.read(data, max_bytes=100_000)
+        # Without a declared size the limit is hit while reading
+        with self.assertRaises(UploadTooLarge):
+            self.read(data, max_bytes=100_000, declare_size=False)
+
+
+class TestUploadSizeLimit(TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+        self.received = []
+
+        @app.post("/upload")
+        async def upload(audio_file: UploadFile = File(...)):
+            self.received.append(audio_file.filename)
+            return {"ok": True}
+
+        self.client = TestClient(UploadSizeLimit(app, paths=["/upload"], max_bytes=100_000))
+
+    def test_oversized_bodies_are_refused_unread(self):
+        response = self.client.post("/upload", files={"audio_file": ("big.wav", WAV + bytes(300_000), "audio/wav")})
+        assert response.status_code == 413
+        assert self.received == []
+        response = self.client.post("/upload", files={"audio_file": ("small.wav", WAV + bytes(1000), "audio/wav")})
+        assert response.status_code == 200
+        assert self.received == ["small.wav"]
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from unittest import TestCase
+
+from utils.blob_store import CHUNK_SIZE, BlobNotFound, BlobStore, FileSystemBlobStore
+
+
+class TestFileSystemBlobStore(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = FileSystemBlobStore(self.tmp.name)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.tmp.cleanup()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def collect(self, digest, start=0, end=None):
+        async def collect():
+            return [chunk async for chunk in self.store.stream(digest, start, end)]
+        return self.wait(collect())
+
+    def test_put_is_content_addressed_and_deduplicated(self):
+        data = os.urandom(1000)
+        digest = self.wait(self.store.put(data))
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert self.wait(self.store.put(data)) == digest
+
+        files = [name for _, _, names in os.walk(self.tmp.name) for name in names]
+        assert files == [digest]
+        assert self.wait(self.store.read(digest)) == data
+        assert self.store.local_path(digest).endswith(os.path.join(digest[:2], digest[2:4], digest))
+
+    def test_stream_chunks_and_ranges(self):
+        data = os.urandom(CHUNK_SIZE * 2 + 10)
+        digest = self.wait(self.store.put(data))
+
+        chunks = self.collect(digest)
+        assert [len(chunk) for chunk in chunks] == [CHUNK_SIZE, CHUNK_SIZE, 10]
+        assert b"".join(self.collect(digest, 5, CHUNK_SIZE + 4)) == data[5:CHUNK_SIZE + 5]
+        assert self.wait(self.store.size(digest)) == len(data)
+
+    def test_missing_and_invalid_digests(self):
+        missing = "0" * 64
+        assert not self.wait(self.store.exists(missing))
+        assert self.store.local_path(missing) is None
+        with self.assertRaises(BlobNotFound):
+            self.wait(self.store.size(missing))
+        with self.assertRaises(BlobNotFound):
+            self.collect(missing)
+        with self.assertRaises(ValueError):
+            self.store.local_path("../../etc/passwd")
+
+    def test_put_stream_hashes_as_it_writes(self):
+        data = os.urandom(CHUNK_SIZE * 3 + 7)
+
+        async def chunks():
+            for start in range(0, len(data), 1000):
+                yield data[start:start + 1000]
+
+        digest = self.wait(self.store.put_stream(chunks()))
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert self.wait(self.store.read(digest)) == data
+        assert self.wait(self.store.put_stream(chunks())) == digest
+
+        async def failing():
+            yield b"partial"
+            raise ValueError("client went away")
+
+        with self.assertRaises(ValueError):
+            self.wait(self.store.put_stream(failing()))
+        files = [name for _, _, names in os.walk(self.tmp.name) for name in names]
+        assert files == [digest]
+
+
+class TestBlobStore(TestCase):
+
+    def test_backends_must_implement_every_method(self):
+        class WriteOnlyBlobStore(BlobStore):
+            async def put(self, data: bytes) -> str:
+                return ""
+
+        with self.assertRaises(TypeError):
+            WriteOnlyBlobStore()
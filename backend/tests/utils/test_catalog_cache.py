@@ -0,0 +1,89 @@
+import asyncio
+import json
+from unittest import TestCase
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from models.chain import Base, Chain
+from utils.catalog_cache import CatalogCache
+
+
+class TestCatalogCache(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        self.session_factory = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.selects = 0
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self.count_selects)
+        self.cache = CatalogCache(max_age=60)
+        self.wait(self.seed())
+
+    def tearDown(self):
+        self.wait(self.engine.dispose())
+        self.loop.close()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def count_selects(self, conn, cursor, statement, *args):
+        if statement.startswith("SELECT"):
+            self.selects += 1
+
+    async def seed(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Chain.__table__])
+        async with self.session_factory() as db:
+            db.add(Chain(id="1", name="base", icon="", disabled=False))
+            await db.commit()
+
+    async def get(self):
+        async with self.session_factory() as db:
+            return await self.cache.get(db, Chain)
+
+    def test_reads_through_once(self):
+        first = self.wait(self.get())
+        second = self.wait(self.get())
+
+        assert second is first
+        assert self.selects == 1
+        assert first.ids_by_name == {"base": "1"}
+        assert json.loads(first.body)[0]["name"] == "base"
+
+    def test_commit_invalidates(self):
+        before = self.wait(self.get())
+
+        async def add_chain():
+            async with self.session_factory() as db:
+                db.add(Chain(id="2", name="arbitrum", icon="", disabled=False))
+                await self.cache.commit(db, Chain)
+
+        self.wait(add_chain())
+        after = self.wait(self.get())
+
+        assert after.ids_by_name == {"base": "1", "arbitrum": "2"}
+        assert after.etag != before.etag
+        assert self.selects == 2
+
+    def test_conditional_get(self):
+        app = FastAPI()
+
+        async def get_db():
+            async with self.session_factory() as db:
+                yield db
+
+        @app.get("/chain")
+        async def chains(request: Request, db: AsyncSession = Depends(get_db)):
+            return await self.cache.response(request, db, Chain)
+
+        client = TestClient(app)
+        response = client.get("/chain")
+        assert response.status_code == 200
+        assert response.json()[0]["id"] == "1"
+
+        cached = client.get("/chain", headers={"If-None-Match": response.headers["etag"]})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == response.headers["etag"]
@@ -0,0 +1,76 @@
+import asyncio
+from unittest import TestCase
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from utils import database
+from utils.database import TimedAsyncQueuePool, TimedQueuePool, get_async_db, get_db, get_pool_metrics, to_async_url
+
+
+class TestDatabase(TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=TimedQueuePool, pool_size=2, max_overflow=1)
+        self.previous = database._engine, database._session_factory
+        database._engine = self.engine
+        database._session_factory = sessionmaker(bind=self.engine)
+
+    def tearDown(self):
+        database._engine, database._session_factory = self.previous
+        self.engine.dispose()
+
+    def test_get_db_closes_session(self):
+        dependency = get_db()
+        db = next(dependency)
+        db.execute(text("select 1"))
+        assert get_pool_metrics(self.engine)["checked_out"] == 1
+
+        dependency.close()
+
+        metrics = get_pool_metrics(self.engine)
+        assert metrics["checked_out"] == 0
+        assert metrics["checkouts"] == 1
+        assert metrics["max_wait_ms"] >= 0
+
+    def test_get_db_reraises(self):
+        dependency = get_db()
+        next(dependency)
+        with self.assertRaises(ValueError):
+            dependency.throw(ValueError("boom"))
+        assert get_pool_metrics(self.engine)["checked_out"] == 0
+
+
+class TestAsyncDatabase(TestCase):
+
+    def setUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=TimedAsyncQueuePool, pool_size=2, max_overflow=1)
+        self.previous = database._async_engine, database._async_session_factory
+        database._async_engine = self.engine
+        database._async_session_factory = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    def tearDown(self):
+        database._async_engine, database._async_session_factory = self.previous
+        asyncio.run(self.engine.dispose())
+
+    def test_get_async_db_closes_session(self):
+        async def run():
+            dependency = get_async_db()
+            db = await anext(dependency)
+            assert (await db.execute(text("select 1"))).scalar() == 1
+            assert get_pool_metrics()["checked_out"] == 1
+            await dependency.aclose()
+
+        asyncio.run(run())
+
+        metrics = get_pool_metrics()
+        assert metrics["pool"] == "TimedAsyncQueuePool"
+        assert metrics["checked_out"] == 0
+        assert metrics["checkouts"] == 1
+
+    def test_to_async_url(self):
+        assert to_async_url("postgresql://u:p@db:5432/app?sslmode=require") == \
+            "postgresql+asyncpg://u:p@db:5432/app?ssl=require"
+        assert to_async_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+        assert to_async_url("sqlite:///local.db") == "sqlite+aiosqlite:///local.db"
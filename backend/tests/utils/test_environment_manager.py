@@ -0,0 +1,50 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from jobs.config import JobsConfig
+from synthesis.config import SynthesisConfig
+from utils import environment_manager
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import EnvironmentManager
+
+SIZE = EnvironmentKeys.AUTH_TOKEN_CACHE_SIZE.value
+MAX_AGE = EnvironmentKeys.AUTH_TOKEN_CACHE_MAX_AGE.value
+
+
+class TestEnvironmentManager(TestCase):
+
+    def test_settings_are_read_from_the_env_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env_file = os.path.join(tmp, ".env")
+            with open(env_file, "w") as f:
+                f.write(f"{SIZE}=16\n")
+            with patch.dict(os.environ, {"OS": "", MAX_AGE: "30"}):
+                environment = EnvironmentManager(env_file)
+        assert environment.get_int(SIZE) == 16
+        # Not in the file: inherited from the process environment
+        assert environment.get_float(MAX_AGE) == 30
+
+    def test_unset_settings_take_their_default(self):
+        with patch.dict(os.environ, {"OS": "prod"}):
+            os.environ.pop(SIZE, None)
+            environment = EnvironmentManager()
+        assert environment.get_int(SIZE) == 1024
+
+    def test_test_mode_reads_settings_too(self):
+        with patch.dict(os.environ, {"OS": "test", SIZE: "8"}):
+            assert EnvironmentManager().get_int(SIZE) == 8
+
+    def test_config_defaults_match_the_environment_defaults(self):
+        previous = environment_manager._environment
+        environment_manager._environment = None
+        try:
+            with patch.dict(os.environ, {"OS": "test"}):
+                for key in EnvironmentKeys:
+                    if key.name.startswith(("JOBS_", "TTS_")):
+                        os.environ.pop(key.value, None)
+                assert JobsConfig.from_env() == JobsConfig()
+                assert SynthesisConfig.from_env() == SynthesisConfig()
+        finally:
+            environment_manager._environment = previous
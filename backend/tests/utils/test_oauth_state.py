@@ -0,0 +1,86 @@
+import asyncio
+import os
+import tempfile
+from unittest import TestCase
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models.chain import Base
+from utils.oauth_state import DatabaseOAuthStateStore, MemoryOAuthStateStore, OAuthStateStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestOAuthStateStore(TestCase):
+
+    def test_backends_must_implement_every_method(self):
+        class WriteOnlyStore(OAuthStateStore):
+            async def put(self, state: str, value: str):
+                pass
+
+        with self.assertRaises(TypeError):
+            WriteOnlyStore(ttl=60)
+
+
+class TestMemoryOAuthStateStore(TestCase):
+
+    def test_values_are_returned_once_and_expire(self):
+        async def run():
+            clock = Clock()
+            store = MemoryOAuthStateStore(ttl=60, clock=clock)
+            await store.put("a", "verifier-a")
+            await store.put("b", "verifier-b")
+            assert await store.pop("a") == "verifier-a"
+            assert await store.pop("a") is None
+            clock.now = 60
+            assert await store.pop("b") is None
+        asyncio.run(run())
+
+    def test_expired_and_excess_entries_are_dropped(self):
+        async def run():
+            clock = Clock()
+            store = MemoryOAuthStateStore(ttl=60, max_entries=2, clock=clock)
+            await store.put("old", "1")
+            clock.now = 61
+            await store.put("a", "2")
+            await store.put("b", "3")
+            await store.put("c", "4")
+            assert list(store._entries) == ["b", "c"]
+        asyncio.run(run())
+
+
+class TestDatabaseOAuthStateStore(TestCase):
+
+    def run_with_store(self, test, ttl: float):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'states.db')}")
+                async with engine.begin() as connection:
+                    await connection.run_sync(Base.metadata.create_all)
+                try:
+                    await test(DatabaseOAuthStateStore(ttl, async_sessionmaker(engine)))
+                finally:
+                    await engine.dispose()
+        asyncio.run(run())
+
+    def test_values_are_returned_once(self):
+        async def test(store):
+            await store.put("a", "verifier-a")
+            # Another process reads the same table
+            other = DatabaseOAuthStateStore(store.ttl, store.session_factory)
+            assert await other.pop("a") == "verifier-a"
+            assert await store.pop("a") is None
+            assert await store.pop("unknown") is None
+        self.run_with_store(test, ttl=60)
+
+    def test_expired_values_are_not_returned(self):
+        async def test(store):
+            await store.put("a", "verifier-a")
+            assert await store.pop("a") is None
+        self.run_with_store(test, ttl=0)
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import tempfile
+from unittest import TestCase
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils.blob_store import FileSystemBlobStore
+from utils.responses import RangeNotSatisfiable, blob_response, parse_byte_range
+
+
+class RemoteBlobStore(FileSystemBlobStore):
+    """Same blobs, but without a local path, like an object store."""
+
+    def local_path(self, digest):
+        return None
+
+
+class TestParseByteRange(TestCase):
+
+    def test_ranges(self):
+        assert parse_byte_range(None, 100) is None
+        assert parse_byte_range("bytes=0-9", 100) == (0, 9)
+        assert parse_byte_range("bytes=90-", 100) == (90, 99)
+        assert parse_byte_range("bytes=95-200", 100) == (95, 99)
+        assert parse_byte_range("bytes=-10", 100) == (90, 99)
+        assert parse_byte_range("bytes=-500", 100) == (0, 99)
+        assert parse_byte_range("bytes=0-1,5-6", 100) is None
+        assert parse_byte_range("items=0-1", 100) is None
+        for header in ("bytes=100-", "bytes=9-3", "bytes=-0"):
+            with self.assertRaises(RangeNotSatisfiable):
+                parse_byte_range(header, 100)
+
+
+class TestBlobResponse(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = os.urandom(200_000)
+        stores = {"local": FileSystemBlobStore(self.tmp.name), "remote": RemoteBlobStore(self.tmp.name)}
+        app = FastAPI()
+
+        @app.get("/{kind}/{digest}")
+        async def get_blob(kind: str, digest: str, request: Request):
+            return await blob_response(request, stores[kind], digest, "audio/wav")
+
+        self.client = TestClient(app)
+        self.digest = asyncio.run(stores["local"].put(self.data))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_full_body_and_etag(self):
+        for kind in ("local", "remote"):
+            response = self.client.get(f"/{kind}/{self.digest}")
+            assert response.status_code == 200, kind
+            assert response.content == self.data
+            assert response.headers["etag"] == f'"{self.digest}"'
+            assert response.headers["accept-ranges"] == "bytes"
+            assert response.headers["content-type"] == "audio/wav"
+
+            cached = self.client.get(f"/{kind}/{self.digest}", headers={"If-None-Match": f'"{self.digest}"'})
+            assert cached.status_code == 304, kind
+            assert cached.content == b""
+
+    def test_range(self):
+        for kind in ("local", "remote"):
+            response = self.client.get(f"/{kind}/{self.digest}", headers={"Range": "bytes=100-70099"})
+            assert response.status_code == 206, kind
+            assert response.content == self.data[100:70100]
+            assert response.headers["content-range"] == f"bytes 100-70099/{len(self.data)}"
+
+            stale = self.client.get(f"/{kind}/{self.digest}", headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+            assert stale.status_code == 200, kind
+            assert len(stale.content) == len(self.data)
+
+        response = self.client.get(f"/remote/{self.digest}", headers={"Range": f"bytes={len(self.data)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(self.data)}"
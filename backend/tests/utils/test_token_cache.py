@@ -0,0 +1,93 @@
+import asyncio
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+import jwt
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from middleware.with_admin import verify_admin
+from utils import environment_manager
+from utils.environment_manager import EnvironmentManager, get_environment
+from utils.token_cache import VerifiedTokenCache, verified_tokens
+
+SECRET = "test-secret-key-at-least-32-bytes-long"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestVerifiedTokenCache(TestCase):
+
+    def test_entries_end_at_expiry_or_max_age(self):
+        clock = Clock()
+        cache = VerifiedTokenCache(max_size=10, max_age=60, clock=clock)
+        cache.put("expiring", {"user_id": "a", "exp": 1010})
+        cache.put("forever", {"user_id": "b"})
+        assert cache.get("expiring") == {"user_id": "a", "exp": 1010}
+        clock.now = 1010
+        assert cache.get("expiring") is None
+        assert cache.get("forever") == {"user_id": "b"}
+        clock.now = 1060
+        assert cache.get("forever") is None
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = VerifiedTokenCache(max_size=2, max_age=60)
+        cache.put("a", {})
+        cache.put("b", {})
+        cache.get("a")
+        cache.put("c", {})
+        assert cache.get("b") is None
+        assert cache.get("a") == {} and cache.get("c") == {}
+
+    def test_returns_copies(self):
+        cache = VerifiedTokenCache(max_size=2, max_age=60)
+        cache.put("a", {"user_id": "a"})
+        cache.get("a")["user_id"] = "changed"
+        assert cache.get("a") == {"user_id": "a"}
+
+
+def request_with(token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+@patch.dict(os.environ, {"OS": "test", "SECRET_KEY": SECRET})
+class TestVerifyAdmin(TestCase):
+
+    def setUp(self):
+        self.previous = environment_manager._environment
+        environment_manager._environment = None
+        verified_tokens.clear()
+
+    def tearDown(self):
+        environment_manager._environment = self.previous
+        verified_tokens.clear()
+
+    def test_verifies_each_token_once(self):
+        token = jwt.encode({"user_id": "42"}, SECRET, algorithm="HS256")
+        with patch("middleware.with_admin.jwt.decode", wraps=jwt.decode) as decode:
+            for _ in range(3):
+                assert asyncio.run(verify_admin(request_with(token))) == {"user_id": "42"}
+        assert decode.call_count == 1
+
+    def test_rejects_bad_signatures_every_time(self):
+        token = jwt.encode({"user_id": "42"}, "x" * 32, algorithm="HS256")
+        for _ in range(2):
+            with self.assertRaises(HTTPException):
+                asyncio.run(verify_admin(request_with(token)))
+
+    def test_configuration_is_loaded_once_and_read_only(self):
+        environment = get_environment()
+        assert get_environment() is environment
+        assert environment.get_key("SECRET_KEY") == SECRET
+        with self.assertRaises(TypeError):
+            environment.environment_values["SECRET_KEY"] = "other"
+        # Instances no longer share one class-level dict
+        assert EnvironmentManager.environment_values == {}
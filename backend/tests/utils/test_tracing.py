@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from utils import tracing
+from utils.tracing import TracingCallbackHandler, configure_tracing, trace_span, traced
+
+
+class TestTracing(TestCase):
+
+    def setUp(self):
+        self.trace_file = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False).name
+        configure_tracing(self.trace_file)
+
+    def tearDown(self):
+        configure_tracing(None)
+        os.remove(self.trace_file)
+
+    def read_spans(self):
+        with open(self.trace_file) as f:
+            return [json.loads(line) for line in f]
+
+    def test_nested_spans_share_trace(self):
+        @traced("inner")
+        def inner():
+            return 1
+
+        with trace_span("outer", user="test"):
+            inner()
+
+        inner_span, outer_span = self.read_spans()
+        assert inner_span["name"] == "inner"
+        assert inner_span["traceId"] == outer_span["traceId"]
+        assert inner_span["parentSpanId"] == outer_span["spanId"]
+        assert outer_span["attributes"] == {"user": "test"}
+
+    def test_error_is_recorded(self):
+        with self.assertRaises(ValueError):
+            with trace_span("failing"):
+                raise ValueError("boom")
+
+        span, = self.read_spans()
+        assert span["status"] == {"code": "ERROR", "message": "boom"}
+
+    def test_callback_records_token_usage(self):
+        handler = TracingCallbackHandler()
+        run_id = uuid4()
+        with trace_span("agent.chat"):
+            handler.on_chat_model_start({}, [[]], run_id=run_id, invocation_params={"model_name": "gpt-4o-mini"})
+            handler.on_llm_end(LLMResult(
+                generations=[[ChatGeneration(message=AIMessage(content="hi"))]],
+                llm_output={"token_usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}},
+            ), run_id=run_id)
+
+        llm_span, chat_span = self.read_spans()
+        assert llm_span["parentSpanId"] == chat_span["spanId"]
+        assert llm_span["attributes"]["llm.model"] == "gpt-4o-mini"
+        assert llm_span["attributes"]["llm.usage.total_tokens"] == 12
+        assert tracing.get_current_span() is None
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from utils.twitter_http import X_API_URL, ProfileCache, get_me, profile_cache, rate_limit_delay, rate_limit_retry, \
+    twitter_request
+
+
+def client_for(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url=X_API_URL, transport=httpx.MockTransport(handler))
+
+
+class TestRateLimitDelay(TestCase):
+
+    def test_waits_for_the_reset_time(self):
+        assert rate_limit_delay({"x-rate-limit-reset": "1012"}, attempt=0, clock=lambda: 1000.0) == 12
+        assert rate_limit_delay({"x-rate-limit-reset": "990"}, attempt=0, clock=lambda: 1000.0) == 0
+
+    def test_backs_off_without_a_reset_time(self):
+        assert [rate_limit_delay({}, attempt) for attempt in range(3)] == [1, 2, 4]
+
+    def test_requests_retry_policy_uses_the_reset_time(self):
+        reset = str(int(time.time()) + 5)
+        delay = rate_limit_retry().get_retry_after(HTTPResponse(headers={"x-rate-limit-reset": reset}, status=429))
+        assert 3 <= delay <= 5
+
+
+class TestTwitterRequest(TestCase):
+
+    def run_requests(self, responses):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return responses[min(len(calls), len(responses)) - 1]
+
+        async def run():
+            async with client_for(handler) as client:
+                return await twitter_request("GET", "/2/users/me", client=client)
+        return asyncio.run(run()), calls
+
+    def test_retries_once_the_window_reopens(self):
+        now = str(int(time.time()))
+        response, calls = self.run_requests([
+            httpx.Response(429, headers={"x-rate-limit-reset": now}),
+            httpx.Response(200, json={"data": {}}),
+        ])
+        assert response.status_code == 200 and len(calls) == 2
+
+    def test_gives_up_when_the_window_is_too_far_off(self):
+        later = str(int(time.time()) + 900)
+        response, calls = self.run_requests([httpx.Response(429, headers={"x-rate-limit-reset": later})])
+        assert response.status_code == 429 and len(calls) == 1
+
+    def test_gives_up_after_the_retries(self):
+        now = str(int(time.time()))
+        response, calls = self.run_requests([httpx.Response(429, headers={"x-rate-limit-reset": now})])
+        assert response.status_code == 429 and len(calls) == 3
+
+
+class TestRateLimitRetry(TestCase):
+
+    def run_requests(self, reset: str):
+        calls = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                calls.append(self.path)
+                self.send_response(429)
+                self.send_header("x-rate-limit-reset", reset)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with requests.Session() as session:
+            session.mount("http://", HTTPAdapter(max_retries=rate_limit_retry()))
+            return session.get(f"http://127.0.0.1:{server.server_port}/2/users/me"), calls
+
+    def test_gives_up_when_the_window_is_too_far_off(self):
+        response, calls = self.run_requests(str(int(time.time()) + 900))
+        assert response.status_code == 429 and len(calls) == 1
+
+    def test_gives_up_after_the_retries(self):
+        response, calls = self.run_requests(str(int(time.time())))
+        assert response.status_code == 429 and len(calls) == 3
+
+
+class TestProfileCache(TestCase):
+
+    def setUp(self):
+        profile_cache.clear()
+
+    def tearDown(self):
+        profile_cache.clear()
+
+    def test_get_me_is_cached_per_token(self):
+        tokens = []
+
+        def handler(request):
+            tokens.append(request.headers["authorization"])
+            return httpx.Response(200, json={"data": {"id": request.headers["authorization"][-1]}})
+
+        async def run():
+            async with client_for(handler) as client:
+                first = await get_me("token-a", client=client)
+                again = await get_me("token-a", client=client)
+                other = await get_me("token-b", client=client)
+                return first, again, other
+        first, again, other = asyncio.run(run())
+        assert first == again == {"data": {"id": "a"}} and other == {"data": {"id": "b"}}
+        assert tokens == ["Bearer token-a", "Bearer token-b"]
+
+    def test_errors_are_not_cached(self):
+        async def run():
+            async with client_for(lambda request: httpx.Response(401)) as client:
+                with self.assertRaises(httpx.HTTPStatusError):
+                    await get_me("revoked", client=client)
+        asyncio.run(run())
+        assert profile_cache.get("revoked") is None
+
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = ProfileCache(ttl=60, clock=lambda: now[0])
+        cache.put("token", {"data": {}})
+        assert cache.get("token") == {"data": {}}
+        now[0] = 60
+        assert cache.get("token") is None
@@ -0,0 +1,65 @@
+import asyncio
+import os
+from unittest import TestCase
+
+from utils.voice_encryption import (
+    HEADER_SIZE,
+    SEGMENT_SIZE,
+    TAG_SIZE,
+    DecryptionError,
+    decrypt_voice,
+    encrypt_stream,
+    master_key,
+    shutdown_encryption_pool,
+)
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestVoiceEncryption(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_encryption_pool()
+
+    def encrypt(self, data: bytes, salt: bytes = b"s" * 16, chunk_size: int = 100_000) -> bytes:
+        async def collect():
+            return b"".join([piece async for piece in encrypt_stream("private", salt, chunked(data, chunk_size))])
+        return asyncio.run(collect())
+
+    def test_round_trip(self):
+        for size in (0, 1, SEGMENT_SIZE, SEGMENT_SIZE + 1, 40 * SEGMENT_SIZE + 5):
+            data = os.urandom(size)
+            encrypted = self.encrypt(data)
+            segments = max(1, -(-size // SEGMENT_SIZE))
+            assert len(encrypted) == HEADER_SIZE + size + segments * TAG_SIZE
+            assert decrypt_voice("private", b"s" * 16, encrypted) == data
+
+    def test_each_upload_gets_its_own_key(self):
+        data = os.urandom(1000)
+        encrypted = self.encrypt(data, salt=b"a" * 16)
+        with self.assertRaises(DecryptionError):
+            decrypt_voice("private", b"b" * 16, encrypted)
+        with self.assertRaises(DecryptionError):
+            decrypt_voice("other", b"a" * 16, encrypted)
+
+    def test_tampering_and_truncation_are_detected(self):
+        encrypted = self.encrypt(os.urandom(3 * SEGMENT_SIZE))
+        flipped = bytearray(encrypted)
+        flipped[HEADER_SIZE + 10] ^= 1
+        with self.assertRaises(DecryptionError):
+            decrypt_voice("private", b"s" * 16, bytes(flipped))
+        # Dropping whole segments leaves one that wasn't encrypted as the last
+        with self.assertRaises(DecryptionError):
+            decrypt_voice("private", b"s" * 16, encrypted[:HEADER_SIZE + 2 * (SEGMENT_SIZE + TAG_SIZE)])
+        with self.assertRaises(DecryptionError):
+            decrypt_voice("private", b"s" * 16, b"garbage")
+
+    def test_master_key_is_derived_once(self):
+        master_key.cache_clear()
+        for _ in range(3):
+            master_key("private")
+        assert master_key.cache_info().misses == 1
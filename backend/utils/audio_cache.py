@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unicodedata
+from typing import Optional
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+from utils.logger import logger
+
+VOICE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def normalize_text(text: str) -> str:
+    """Text as it affects synthesis: NFC, with runs of whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, **params) -> str:
+    """Digest of the normalized text and everything else that shapes the audio."""
+    material = json.dumps({"text": normalize_text(text), **params}, sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class AudioCache:
+    """Synthesized audio on disk under ``root/<voice_id>/<key>.wav``, bounded to ``max_bytes``.
+
+    Hits bump the file's mtime, and when a write takes the cache over its bound the least
+    recently used files are evicted down to 90% of it. The mtimes live on disk, so API
+    processes sharing ``root`` share one LRU order. Keeping each voice in its own
+    directory lets a deleted voice be dropped in one go.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _voice_dir(self, voice_id: str) -> str:
+        if not VOICE_ID_PATTERN.match(voice_id or ""):
+            raise ValueError(f"Invalid voice id: {voice_id!r}")
+        return os.path.join(self.root, voice_id)
+
+    def _path(self, voice_id: str, key: str) -> str:
+        return os.path.join(self._voice_dir(voice_id), f"{key}.wav")
+
+    def _touch(self, path: str) -> Optional[str]:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    async def get(self, voice_id: str, key: str) -> Optional[str]:
+        """Path of the cached audio, marked as just used, or None on a miss."""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._touch, self._path(voice_id, key))
+
+    def _write(self, voice_id: str, key: str, audio: bytes) -> str:
+        path = self._path(voice_id, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(audio)
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    async def put(self, voice_id: str, key: str, audio: bytes) -> Optional[str]:
+        """Store audio and return its path; None when the cache is disabled."""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._write, voice_id, key, audio)
+
+    def _files(self):
+        for voice in os.scandir(self.root):
+            if not voice.is_dir():
+                continue
+            for entry in os.scandir(voice.path):
+                if entry.name.endswith(".wav"):
+                    try:
+                        yield entry.path, entry.stat()
+                    except FileNotFoundError:
+                        pass
+
+    def _scan_size(self) -> int:
+        return sum(stat.st_size for _, stat in self._files())
+
+    def _evict(self):
+        """Drop least recently used files down to 90% of the bound. Called with the lock held."""
+        files = sorted(self._files(), key=lambda file: file[1].st_mtime)
+        size = sum(stat.st_size for _, stat in files)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for path, stat in files:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= stat.st_size
+            evicted += 1
+        self._size = size
+        logger.info(f"Audio cache evicted {evicted} files, {size} bytes left")
+
+    def _invalidate(self, voice_id: str):
+        shutil.rmtree(self._voice_dir(voice_id), ignore_errors=True)
+        with self._lock:
+            self._size = None
+
+    async def invalidate(self, voice_id: str):
+        """Forget all audio cached for a voice."""
+        await asyncio.to_thread(self._invalidate, voice_id)
+
+
+def create_audio_cache() -> AudioCache:
+    environment = get_environment()
+    return AudioCache(
+        environment.get_key(EnvironmentKeys.AUDIO_CACHE_PATH.value),
+        int(environment.get_float(EnvironmentKeys.AUDIO_CACHE_MAX_MB.value) * 1024 * 1024),
+    )
+
+
+_audio_cache: Optional[AudioCache] = None
+_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """Process-wide audio cache, configured from the environment on first use."""
+    global _audio_cache
+    if _audio_cache is None:
+        with _lock:
+            if _audio_cache is None:
+                _audio_cache = create_audio_cache()
+    return _audio_cache
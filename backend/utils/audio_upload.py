@@ -0,0 +1,72 @@
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+from utils.blob_store import CHUNK_SIZE
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+
+# Enough of the file to tell the container formats below apart
+HEADER_SIZE = 12
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class UnsupportedAudio(ValueError):
+    pass
+
+
+def max_upload_bytes() -> int:
+    return int(get_environment().get_float(EnvironmentKeys.VOICE_UPLOAD_MAX_MB.value) * 1024 * 1024)
+
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """Audio container named by a file's first bytes, or None if it isn't one we accept."""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[4:8] == b"ftyp":
+        return "mp4"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    return None
+
+
+async def read_audio_upload(upload: UploadFile, max_bytes: Optional[int] = None) -> AsyncIterator[bytes]:
+    """The upload's bytes in chunks, once its header has been checked.
+
+    Checks the declared size and the header before returning, so a bad upload is
+    rejected before anything is stored or sent; the size is checked again as chunks are
+    read, since clients can send more than they declare. Memory use is a chunk at a
+    time whatever the file size.
+    """
+    max_bytes = max_upload_bytes() if max_bytes is None else max_bytes
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(f"Audio files are limited to {max_bytes // (1024 * 1024)} MB")
+    first = b""
+    while len(first) < HEADER_SIZE:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        first += chunk
+    if sniff_audio_format(first) is None:
+        raise UnsupportedAudio("Unsupported audio format")
+
+    async def chunks():
+        size = len(first)
+        chunk = first
+        while chunk:
+            if size > max_bytes:
+                raise UploadTooLarge(f"Audio files are limited to {max_bytes // (1024 * 1024)} MB")
+            yield chunk
+            chunk = await upload.read(CHUNK_SIZE)
+            size += len(chunk)
+
+    return chunks()
@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobNotFound(KeyError):
+    pass
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _check_digest(digest: str) -> str:
+    if not DIGEST_PATTERN.match(digest or ""):
+        raise ValueError(f"Invalid blob digest: {digest!r}")
+    return digest
+
+
+class BlobStore(ABC):
+    """Content-addressed storage: blobs are keyed by the hex SHA-256 of their bytes.
+
+    Writing bytes that are already stored is a no-op, so identical uploads share one blob.
+    ``end`` in ``stream`` is inclusive, matching HTTP byte ranges.
+    """
+
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        ...
+
+    @abstractmethod
+    async def put_stream(self, chunks: AsyncIterator[bytes]) -> str:
+        """Store bytes as they arrive, hashing them on the way; returns the digest."""
+
+    @abstractmethod
+    async def exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def size(self, digest: str) -> int:
+        ...
+
+    @abstractmethod
+    def stream(self, digest: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        ...
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """Path of the blob on local disk, or None when it lives elsewhere."""
+        return None
+
+    async def read(self, digest: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(digest)])
+
+
+class FileSystemBlobStore(BlobStore):
+    """Blobs under ``root/ab/cd/abcd...``; writes land in a temp file and are renamed into place."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, digest: str) -> str:
+        _check_digest(digest)
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def _write(self, digest: str, data: bytes):
+        path = self._path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def put(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        await asyncio.to_thread(self._write, digest, data)
+        return digest
+
+    def _move_into_place(self, tmp_path: str, digest: str):
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    async def put_stream(self, chunks: AsyncIterator[bytes]) -> str:
+        # The digest is only known at the end, so the temp file sits in the root
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        hasher = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    hasher.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+            digest = hasher.hexdigest()
+            await asyncio.to_thread(self._move_into_place, tmp_path, digest)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    async def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    async def size(self, digest: str) -> int:
+        try:
+            return os.path.getsize(self._path(digest))
+        except FileNotFoundError:
+            raise BlobNotFound(digest)
+
+    async def stream(self, digest: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            f = await asyncio.to_thread(open, self._path(digest), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(digest)
+        try:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = await asyncio.to_thread(f.read, CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    def local_path(self, digest: str) -> Optional[str]:
+        path = self._path(digest)
+        return path if os.path.exists(path) else None
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects in an S3-compatible bucket (AWS, MinIO). Credentials come from the usual AWS_* variables."""
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, prefix: str = "", client=None):
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, digest: str) -> str:
+        return self.prefix + _check_digest(digest)
+
+    def _head(self, digest: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(digest))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    async def put(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        if await asyncio.to_thread(self._head, digest) is None:
+            await asyncio.to_thread(self.client.put_object, Bucket=self.bucket, Key=self._key(digest), Body=data)
+        return digest
+
+    async def put_stream(self, chunks: AsyncIterator[bytes]) -> str:
+        # Objects are keyed by digest, which is only known at the end: spool (to disk past a
+        # few chunks), then upload, in parts when large
+        with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 16) as spool:
+            hasher = hashlib.sha256()
+            async for chunk in chunks:
+                hasher.update(chunk)
+                await asyncio.to_thread(spool.write, chunk)
+            digest = hasher.hexdigest()
+            if await asyncio.to_thread(self._head, digest) is None:
+                spool.seek(0)
+                await asyncio.to_thread(self.client.upload_fileobj, spool, self.bucket, self._key(digest))
+        return digest
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(self._head, digest) is not None
+
+    async def size(self, digest: str) -> int:
+        head = await asyncio.to_thread(self._head, digest)
+        if head is None:
+            raise BlobNotFound(digest)
+        return head["ContentLength"]
+
+    async def stream(self, digest: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        from botocore.exceptions import ClientError
+
+        options = {"Bucket": self.bucket, "Key": self._key(digest)}
+        if start or end is not None:
+            options["Range"] = f"bytes={start}-{'' if end is None else end}"
+        try:
+            response = await asyncio.to_thread(self.client.get_object, **options)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise BlobNotFound(digest)
+            raise
+        body = response["Body"]
+        try:
+            chunks = body.iter_chunks(CHUNK_SIZE)
+            while chunk := await asyncio.to_thread(next, chunks, b""):
+                yield chunk
+        finally:
+            body.close()
+
+
+_blob_store: Optional[BlobStore] = None
+_lock = threading.Lock()
+
+
+def create_blob_store() -> BlobStore:
+    environment = get_environment()
+    backend = environment.get_key(EnvironmentKeys.BLOB_STORE_BACKEND.value)
+    if backend == "filesystem":
+        return FileSystemBlobStore(environment.get_key(EnvironmentKeys.BLOB_STORE_PATH.value))
+    if backend == "s3":
+        bucket = environment.get_key(EnvironmentKeys.BLOB_STORE_S3_BUCKET.value)
+        if not bucket:
+            raise ValueError("BLOB_STORE_S3_BUCKET is required with BLOB_STORE_BACKEND=s3")
+        return S3BlobStore(
+            bucket,
+            endpoint_url=environment.get_key(EnvironmentKeys.BLOB_STORE_S3_ENDPOINT_URL.value),
+            prefix=environment.get_key(EnvironmentKeys.BLOB_STORE_S3_PREFIX.value),
+        )
+    raise ValueError(f"Unknown BLOB_STORE_BACKEND: {backend}")
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store, configured from the environment on first use."""
+    global _blob_store
+    if _blob_store is None:
+        with _lock:
+            if _blob_store is None:
+                _blob_store = create_blob_store()
+    return _blob_store
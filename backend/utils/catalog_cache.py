@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import inspect, make_url, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+from utils.logger import logger
+from utils.responses import etag_matches
+
+CATALOG_CHANNEL = "catalog_invalidation"
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    rows: List[dict]
+    rows_by_id: Dict[str, dict]
+    ids_by_name: Dict[str, str]
+    body: bytes
+    etag: str
+    loaded_at: float
+
+
+class CatalogCache:
+    """Read-through cache for the small admin catalog tables (chains, LLM providers, knowledge bases).
+
+    Entries are dropped by the endpoints that write these tables. On Postgres the writers also
+    ``NOTIFY`` ``CATALOG_CHANNEL`` inside their transaction, and every worker runs
+    ``listen_for_invalidations`` so the other processes drop their copy on commit. ``max_age``
+    bounds staleness if a notification is ever missed.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        if max_age is None:
+            max_age = get_environment().get_float(EnvironmentKeys.CATALOG_CACHE_MAX_AGE.value)
+        self.max_age = max_age
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._generations: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, table: str) -> Optional[CatalogEntry]:
+        entry = self._entries.get(table)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.max_age:
+            return entry
+        return None
+
+    async def get(self, db: AsyncSession, model) -> CatalogEntry:
+        table = model.__tablename__
+        entry = self._fresh(table)
+        if entry is not None:
+            return entry
+        lock = self._locks.setdefault(table, asyncio.Lock())
+        async with lock:
+            entry = self._fresh(table)
+            if entry is not None:
+                return entry
+            generation = self._generations.get(table, 0)
+            entry = await self._load(db, model)
+            # Skip storing if a write invalidated the table while we were reading it
+            if self._generations.get(table, 0) == generation:
+                self._entries[table] = entry
+            return entry
+
+    @staticmethod
+    async def _load(db: AsyncSession, model) -> CatalogEntry:
+        columns = [attr.key for attr in inspect(model).column_attrs]
+        records = (await db.execute(select(model).order_by(model.id))).scalars().all()
+        rows = [{column: getattr(record, column) for column in columns} for record in records]
+        rows_by_id = {row["id"]: row for row in rows}
+        ids_by_name = {}
+        for row in rows:
+            ids_by_name.setdefault(row["name"], row["id"])
+        body = json.dumps(
+            jsonable_encoder(rows), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return CatalogEntry(rows, rows_by_id, ids_by_name, body, etag, time.monotonic())
+
+    def invalidate(self, table: str):
+        self._generations[table] = self._generations.get(table, 0) + 1
+        self._entries.pop(table, None)
+
+    def invalidate_all(self):
+        for table in list(self._entries) + list(self._generations):
+            self.invalidate(table)
+
+    async def commit(self, db: AsyncSession, *models):
+        """Commit a catalog write, telling the other workers and dropping the local entries."""
+        if db.bind.dialect.name == "postgresql":
+            for model in models:
+                # Delivered to listeners only when the transaction commits
+                await db.execute(text("SELECT pg_notify(:channel, :table)"),
+                                 {"channel": CATALOG_CHANNEL, "table": model.__tablename__})
+        try:
+            await db.commit()
+        finally:
+            for model in models:
+                self.invalidate(model.__tablename__)
+
+    async def response(self, request: Request, db: AsyncSession, model) -> Response:
+        """The cached list as JSON with an ETag, or 304 when the client's copy is current."""
+        entry = await self.get(db, model)
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    async def listen_for_invalidations(self, connection_string: str, retry_seconds: float = 5):
+        """Drop entries on ``NOTIFY`` from other workers; reconnects until cancelled."""
+        import asyncpg
+
+        dsn = make_url(connection_string).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                await connection.add_listener(CATALOG_CHANNEL, lambda conn, pid, channel, table: self.invalidate(table))
+                connection.add_termination_listener(lambda conn: lost.set())
+                # Anything committed while we were not listening is unknown, so start cold
+                self.invalidate_all()
+                await lost.wait()
+                logger.warning("Catalog invalidation listener disconnected")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Catalog invalidation listener failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            self.invalidate_all()
+            await asyncio.sleep(retry_seconds)
+
+
+catalog_cache = CatalogCache()
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Dict, Optional
 
 class EnvironmentKeys(Enum):
     CONNECTION_STRING = "CONNECTION_STRING"
@@ -16,9 +17,115 @@ class EnvironmentKeys(Enum):
     FRONTEND_URL = "FRONTEND_URL"
     PRIVATE_KEY = "PRIVATE_KEY"
     BACKEND_API_URL = "BACKEND_API_URL"
+    # Tuning; unset ones take their value from ENVIRONMENT_DEFAULTS
+    AUTH_TOKEN_CACHE_SIZE = "AUTH_TOKEN_CACHE_SIZE"
+    AUTH_TOKEN_CACHE_MAX_AGE = "AUTH_TOKEN_CACHE_MAX_AGE"
+    TRACE_EXPORT_FILE = "TRACE_EXPORT_FILE"
+    EVM_RPC_URL = "EVM_RPC_URL"
+    DB_POOL_SIZE = "DB_POOL_SIZE"
+    DB_MAX_OVERFLOW = "DB_MAX_OVERFLOW"
+    DB_POOL_RECYCLE = "DB_POOL_RECYCLE"
+    DB_POOL_TIMEOUT = "DB_POOL_TIMEOUT"
+    CATALOG_CACHE_MAX_AGE = "CATALOG_CACHE_MAX_AGE"
+    BLOB_STORE_BACKEND = "BLOB_STORE_BACKEND"
+    BLOB_STORE_PATH = "BLOB_STORE_PATH"
+    BLOB_STORE_S3_BUCKET = "BLOB_STORE_S3_BUCKET"
+    BLOB_STORE_S3_ENDPOINT_URL = "BLOB_STORE_S3_ENDPOINT_URL"
+    BLOB_STORE_S3_PREFIX = "BLOB_STORE_S3_PREFIX"
+    TTS_ENGINE = "TTS_ENGINE"
+    TTS_MODEL = "TTS_MODEL"
+    TTS_DEVICE = "TTS_DEVICE"
+    TTS_WORKERS = "TTS_WORKERS"
+    TTS_THREADS = "TTS_THREADS"
+    TTS_QUEUE_SIZE = "TTS_QUEUE_SIZE"
+    TTS_JOB_TIMEOUT = "TTS_JOB_TIMEOUT"
+    TTS_PRELOAD = "TTS_PRELOAD"
+    TTS_LATENT_CACHE_SIZE = "TTS_LATENT_CACHE_SIZE"
+    TTS_BATCH_SIZE = "TTS_BATCH_SIZE"
+    TTS_BATCH_WAIT_MS = "TTS_BATCH_WAIT_MS"
+    TTS_BATCH_LENGTH_RATIO = "TTS_BATCH_LENGTH_RATIO"
+    TTS_QUANTIZATION = "TTS_QUANTIZATION"
+    AUDIO_CACHE_PATH = "AUDIO_CACHE_PATH"
+    AUDIO_CACHE_MAX_MB = "AUDIO_CACHE_MAX_MB"
+    VOICE_ENCRYPTION_WORKERS = "VOICE_ENCRYPTION_WORKERS"
+    VOICE_UPLOAD_MAX_MB = "VOICE_UPLOAD_MAX_MB"
+    JOBS_RUN_IN_APP = "JOBS_RUN_IN_APP"
+    JOBS_CONCURRENCY = "JOBS_CONCURRENCY"
+    JOBS_MAX_RUNNING_PER_USER = "JOBS_MAX_RUNNING_PER_USER"
+    JOBS_MAX_QUEUED_PER_USER = "JOBS_MAX_QUEUED_PER_USER"
+    JOBS_MAX_ATTEMPTS = "JOBS_MAX_ATTEMPTS"
+    JOBS_LEASE_SECONDS = "JOBS_LEASE_SECONDS"
+    JOBS_POLL_INTERVAL = "JOBS_POLL_INTERVAL"
+    JOBS_RETRY_BACKOFF = "JOBS_RETRY_BACKOFF"
+    JOBS_RETENTION_HOURS = "JOBS_RETENTION_HOURS"
+    JOBS_WEBHOOK_TIMEOUT = "JOBS_WEBHOOK_TIMEOUT"
+    OAUTH_STATE_BACKEND = "OAUTH_STATE_BACKEND"
+    OAUTH_STATE_TTL = "OAUTH_STATE_TTL"
+    OAUTH_STATE_REDIS_URL = "OAUTH_STATE_REDIS_URL"
+    TWITTER_HTTP_TIMEOUT = "TWITTER_HTTP_TIMEOUT"
+    TWITTER_MAX_RETRIES = "TWITTER_MAX_RETRIES"
+    TWITTER_MAX_RATE_LIMIT_WAIT = "TWITTER_MAX_RATE_LIMIT_WAIT"
+    TWITTER_PROFILE_CACHE_TTL = "TWITTER_PROFILE_CACHE_TTL"
+    JOBS_WEBHOOK_SECRET = "JOBS_WEBHOOK_SECRET"
+    JOBS_WEBHOOK_ALLOWED_HOSTS = "JOBS_WEBHOOK_ALLOWED_HOSTS"
 
 
 class TestEnvironmentKeys(Enum):
     CONNECTION_STRING = "CONNECTION_STRING"
     SECRET_KEY = "SECRET_KEY"
     PRIVATE_KEY = "PRIVATE_KEY"
+
+
+# Settings that work without being set, with the value they take then (None: off or optional)
+ENVIRONMENT_DEFAULTS: Dict[EnvironmentKeys, Optional[str]] = {
+    EnvironmentKeys.AUTH_TOKEN_CACHE_SIZE: "1024",
+    EnvironmentKeys.AUTH_TOKEN_CACHE_MAX_AGE: "300",
+    EnvironmentKeys.TRACE_EXPORT_FILE: None,
+    EnvironmentKeys.EVM_RPC_URL: None,
+    EnvironmentKeys.DB_POOL_SIZE: "10",
+    EnvironmentKeys.DB_MAX_OVERFLOW: "20",
+    EnvironmentKeys.DB_POOL_RECYCLE: "1800",
+    EnvironmentKeys.DB_POOL_TIMEOUT: "30",
+    EnvironmentKeys.CATALOG_CACHE_MAX_AGE: "300",
+    EnvironmentKeys.BLOB_STORE_BACKEND: "filesystem",
+    EnvironmentKeys.BLOB_STORE_PATH: "./data/blobs",
+    EnvironmentKeys.BLOB_STORE_S3_BUCKET: None,
+    EnvironmentKeys.BLOB_STORE_S3_ENDPOINT_URL: None,
+    EnvironmentKeys.BLOB_STORE_S3_PREFIX: "voices/",
+    EnvironmentKeys.TTS_ENGINE: "synthesis.xtts:XttsEngine",
+    EnvironmentKeys.TTS_MODEL: "tts_models/multilingual/multi-dataset/xtts_v2",
+    EnvironmentKeys.TTS_DEVICE: "auto",
+    EnvironmentKeys.TTS_WORKERS: "1",
+    EnvironmentKeys.TTS_THREADS: "0",
+    EnvironmentKeys.TTS_QUEUE_SIZE: "32",
+    EnvironmentKeys.TTS_JOB_TIMEOUT: "300",
+    EnvironmentKeys.TTS_PRELOAD: "1",
+    EnvironmentKeys.TTS_LATENT_CACHE_SIZE: "64",
+    EnvironmentKeys.TTS_BATCH_SIZE: "1",
+    EnvironmentKeys.TTS_BATCH_WAIT_MS: "20",
+    EnvironmentKeys.TTS_BATCH_LENGTH_RATIO: "2",
+    EnvironmentKeys.TTS_QUANTIZATION: "none",
+    EnvironmentKeys.AUDIO_CACHE_PATH: "./data/audio_cache",
+    EnvironmentKeys.AUDIO_CACHE_MAX_MB: "512",
+    EnvironmentKeys.VOICE_ENCRYPTION_WORKERS: "0",
+    EnvironmentKeys.VOICE_UPLOAD_MAX_MB: "20",
+    EnvironmentKeys.JOBS_RUN_IN_APP: "1",
+    EnvironmentKeys.JOBS_CONCURRENCY: "4",
+    EnvironmentKeys.JOBS_MAX_RUNNING_PER_USER: "2",
+    EnvironmentKeys.JOBS_MAX_QUEUED_PER_USER: "20",
+    EnvironmentKeys.JOBS_MAX_ATTEMPTS: "3",
+    EnvironmentKeys.JOBS_LEASE_SECONDS: "60",
+    EnvironmentKeys.JOBS_POLL_INTERVAL: "1",
+    EnvironmentKeys.JOBS_RETRY_BACKOFF: "5",
+    EnvironmentKeys.JOBS_RETENTION_HOURS: "24",
+    EnvironmentKeys.JOBS_WEBHOOK_TIMEOUT: "10",
+    EnvironmentKeys.OAUTH_STATE_BACKEND: "database",
+    EnvironmentKeys.OAUTH_STATE_TTL: "600",
+    EnvironmentKeys.OAUTH_STATE_REDIS_URL: "redis://localhost:6379/0",
+    EnvironmentKeys.TWITTER_HTTP_TIMEOUT: "10",
+    EnvironmentKeys.TWITTER_MAX_RETRIES: "2",
+    EnvironmentKeys.TWITTER_MAX_RATE_LIMIT_WAIT: "30",
+    EnvironmentKeys.TWITTER_PROFILE_CACHE_TTL: "60",
+    EnvironmentKeys.JOBS_WEBHOOK_SECRET: None,
+    EnvironmentKeys.JOBS_WEBHOOK_ALLOWED_HOSTS: None,
+}
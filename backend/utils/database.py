@@ -1,29 +1,182 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from utils.environment_manager import EnvironmentManager
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from utils.environment_manager import EnvironmentManager, get_environment
 from utils.constants.environment_keys import EnvironmentKeys
 from utils.logger import logger
 
 
-class Database:
-    def __init__(self,ev_manager = EnvironmentManager()):
-        connection_string = ev_manager.get_key(EnvironmentKeys.CONNECTION_STRING.value)
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_count = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.checkout_count += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkout_count = self.checkout_count
+        pool.total_wait_seconds = self.total_wait_seconds
+        pool.max_wait_seconds = self.max_wait_seconds
+        return pool
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """TimedQueuePool for asyncio engines."""
+
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_lock = threading.Lock()
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _pool_options() -> dict:
+    environment = get_environment()
+    return {
+        "pool_size": environment.get_int(EnvironmentKeys.DB_POOL_SIZE.value),
+        "max_overflow": environment.get_int(EnvironmentKeys.DB_MAX_OVERFLOW.value),
+        "pool_recycle": environment.get_int(EnvironmentKeys.DB_POOL_RECYCLE.value),
+        "pool_timeout": environment.get_int(EnvironmentKeys.DB_POOL_TIMEOUT.value),
+    }
+
+
+def _create_engine(connection_string: str) -> Engine:
+    if connection_string.startswith("sqlite"):
+        return create_engine(connection_string, pool_pre_ping=True)
+    return create_engine(connection_string, poolclass=TimedQueuePool, pool_pre_ping=True, **_pool_options())
+
+
+def to_async_url(connection_string: str) -> str:
+    """Rewrite a sync connection string (psycopg2 / pysqlite) for asyncpg / aiosqlite."""
+    url = make_url(connection_string)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if "sslmode" in url.query:
+        # asyncpg takes the libpq sslmode values under the name "ssl"
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.query["sslmode"]})
+    return url.render_as_string(hide_password=False)
+
+
+def _create_async_engine(connection_string: str) -> AsyncEngine:
+    url = to_async_url(connection_string)
+    if url.startswith("sqlite"):
+        return create_async_engine(url, pool_pre_ping=True)
+    return create_async_engine(url, poolclass=TimedAsyncQueuePool, pool_pre_ping=True, **_pool_options())
 
-        self.engine = create_engine(connection_string, pool_pre_ping=True)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-        self.db: Session = self.SessionLocal()
 
-    def get_session(self):
+def get_engine(ev_manager: Optional[EnvironmentManager] = None) -> Engine:
+    """Process-wide engine, created on first use."""
+    global _engine, _session_factory
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                ev_manager = ev_manager or get_environment()
+                connection_string = ev_manager.get_key(EnvironmentKeys.CONNECTION_STRING.value)
+                _engine = _create_engine(connection_string)
+                _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    return _engine
+
+
+def get_session_factory() -> sessionmaker:
+    get_engine()
+    return _session_factory
+
+
+def get_async_engine(ev_manager: Optional[EnvironmentManager] = None) -> AsyncEngine:
+    """Process-wide asyncio engine used by the request handlers, created on first use."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _lock:
+            if _async_engine is None:
+                ev_manager = ev_manager or get_environment()
+                connection_string = ev_manager.get_key(EnvironmentKeys.CONNECTION_STRING.value)
+                _async_engine = _create_async_engine(connection_string)
+                # Handlers return ORM objects after commit, so keep their loaded state
+                _async_session_factory = async_sessionmaker(
+                    bind=_async_engine, autoflush=False, expire_on_commit=False
+                )
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    get_async_engine()
+    return _async_session_factory
+
+
+class Database:
+    def __init__(self, ev_manager: Optional[EnvironmentManager] = None):
+        self.engine = get_engine(ev_manager)
+        self.SessionLocal = get_session_factory()
+
+    def get_session(self) -> Session:
         return self.SessionLocal()
 
-    def close(self):
-        self.db.close()
 
 def get_db():
-    db_instance = Database()
-    db = db_instance.get_session()  # Get an SQLAlchemy session
+    db = get_session_factory()()
+    try:
+        yield db
+    except Exception as e:
+        logger.error(e)
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    db: AsyncSession = get_async_session_factory()()
     try:
         yield db
-        logger.info("Database init is done")
     except Exception as e:
-        logger.error(e)
\ No newline at end of file
+        logger.error(e)
+        raise
+    finally:
+        await db.close()
+
+
+def get_pool_metrics(engine: Optional[Engine] = None) -> dict:
+    """Pool statistics, by default for the asyncio engine that serves requests."""
+    pool = (engine or get_async_engine().sync_engine).pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    metrics = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, TimedQueuePool):
+        metrics.update({
+            "checkouts": pool.checkout_count,
+            "avg_wait_ms": round(pool.total_wait_seconds / pool.checkout_count * 1000, 3) if pool.checkout_count else 0.0,
+            "max_wait_ms": round(pool.max_wait_seconds * 1000, 3),
+        })
+    return metrics
@@ -1,34 +1,70 @@
 import os
-from typing import Dict, Any, Generator
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Generator, Mapping, Optional
 
 from dotenv import dotenv_values
 
-from utils.constants.environment_keys import EnvironmentKeys, TestEnvironmentKeys
+from utils.constants.environment_keys import ENVIRONMENT_DEFAULTS, EnvironmentKeys, TestEnvironmentKeys
 from utils.logger import logger
 
 
 class EnvironmentManager:
-    environment_values: Dict[str, str] = dict()
+    """Configuration read from the process environment (``OS=prod`` / ``OS=test``) or the
+    ``.env`` file. Read-only once loaded; use ``get_environment()`` for the process-wide copy
+    rather than reading the environment again.
+
+    Settings in ``ENVIRONMENT_DEFAULTS`` are always present: when the source above leaves one
+    unset, it comes from the process environment (so worker processes can inherit it), and
+    otherwise from its default.
+    """
+    environment_values: Mapping[str, Optional[str]] = MappingProxyType({})
 
     def __init__(self, env_file_name="./.env"):
         env = os.getenv(EnvironmentKeys.OS.value)
+        values: Dict[str, Optional[str]]
         if env == "prod":
-            for key in EnvironmentKeys:
-                self.environment_values[key.value] = os.getenv(key.value)
+            values = {key.value: os.getenv(key.value) for key in EnvironmentKeys}
         elif env == "test":
-            for key in TestEnvironmentKeys:
-                self.environment_values[key.value] = os.getenv(key.value)
+            values = {key.value: os.getenv(key.value) for key in TestEnvironmentKeys}
         else:
-            self.environment_values = dotenv_values(env_file_name)
+            values = dotenv_values(env_file_name)
+        for key, default in ENVIRONMENT_DEFAULTS.items():
+            if values.get(key.value) is None:
+                values[key.value] = os.getenv(key.value, default)
+        self.environment_values = MappingProxyType(dict(values))
 
     def get_key(self, key) -> str:
         return self.environment_values[key]
 
+    def get_int(self, key) -> int:
+        return int(float(self.environment_values[key]))
+
+    def get_float(self, key) -> float:
+        return float(self.environment_values[key])
+
+    def get_bool(self, key) -> bool:
+        return self.environment_values[key] == "1"
+
+
+_environment: Optional[EnvironmentManager] = None
+_lock = threading.Lock()
+
+
+def get_environment() -> EnvironmentManager:
+    """Process-wide configuration, loaded on first use."""
+    global _environment
+    if _environment is None:
+        with _lock:
+            if _environment is None:
+                _environment = EnvironmentManager()
+                logger.info("Environment manager init is done")
+    return _environment
+
 
 def get_environment_manager() -> Generator[EnvironmentManager, Any, None]:
-    ev_manager = EnvironmentManager()
     try:
-        yield ev_manager
-        logger.info("Environment manager init is done")
+        yield get_environment()
     except Exception as e:
-        logger.error(e)
\ No newline at end of file
+        logger.error(e)
+        raise
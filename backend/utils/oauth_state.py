@@ -0,0 +1,143 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.oauth_state import OAuthStates
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.database import get_async_session_factory
+from utils.environment_manager import get_environment
+
+
+class OAuthStateStore(ABC):
+    """Short-lived values of OAuth logins in progress, keyed by the ``state`` parameter.
+
+    ``pop`` returns a value at most once, so a state can't be replayed, and never after
+    ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    @abstractmethod
+    async def put(self, state: str, value: str):
+        ...
+
+    @abstractmethod
+    async def pop(self, state: str) -> Optional[str]:
+        ...
+
+
+class MemoryOAuthStateStore(OAuthStateStore):
+    """States in this process only: for a single worker, or tests."""
+
+    def __init__(self, ttl: float, max_entries: int = 10000, clock=time.monotonic):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._clock = clock
+        # Every entry lives for the same ttl, so insertion order is expiry order
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def put(self, state: str, value: str):
+        now = self._clock()
+        while self._entries and (next(iter(self._entries.values()))[1] <= now
+                                 or len(self._entries) >= self.max_entries):
+            self._entries.popitem(last=False)
+        self._entries[state] = (value, now + self.ttl)
+
+    async def pop(self, state: str) -> Optional[str]:
+        entry = self._entries.pop(state, None)
+        if entry is None or entry[1] <= self._clock():
+            return None
+        return entry[0]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DatabaseOAuthStateStore(OAuthStateStore):
+    """States in the ``OAuthStates`` table, shared by every process using the database."""
+
+    def __init__(self, ttl: float, session_factory: Optional[async_sessionmaker] = None):
+        super().__init__(ttl)
+        self._session_factory = session_factory
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        return self._session_factory or get_async_session_factory()
+
+    async def put(self, state: str, value: str):
+        now = _utcnow()
+        async with self.session_factory() as db:
+            # Logins that were never finished; cheap, as it is a range on the expiry index
+            await db.execute(delete(OAuthStates).where(OAuthStates.expires_at <= now)
+                             .execution_options(synchronize_session=False))
+            db.add(OAuthStates(state=state, code_verifier=value, expires_at=now + timedelta(seconds=self.ttl)))
+            await db.commit()
+
+    async def pop(self, state: str) -> Optional[str]:
+        async with self.session_factory() as db:
+            row = (await db.execute(
+                delete(OAuthStates).where(OAuthStates.state == state)
+                .returning(OAuthStates.code_verifier, OAuthStates.expires_at)
+                .execution_options(synchronize_session=False)
+            )).first()
+            await db.commit()
+        if row is None or row.expires_at <= _utcnow():
+            return None
+        return row.code_verifier
+
+
+class RedisOAuthStateStore(OAuthStateStore):
+    """States as expiring keys on a Redis server (or anything speaking its protocol, such as
+    Valkey or KeyDB). Needs the ``redis`` package and Redis 6.2+ for GETDEL.
+    """
+
+    def __init__(self, ttl: float, url: Optional[str] = None, prefix: str = "oauth_state:", client=None):
+        super().__init__(ttl)
+        if client is None:
+            import redis.asyncio
+
+            client = redis.asyncio.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def put(self, state: str, value: str):
+        await self.client.set(self.prefix + state, value, ex=max(1, round(self.ttl)))
+
+    async def pop(self, state: str) -> Optional[str]:
+        value = await self.client.getdel(self.prefix + state)
+        return value.decode() if isinstance(value, bytes) else value
+
+
+_oauth_state_store: Optional[OAuthStateStore] = None
+_lock = threading.Lock()
+
+
+def create_oauth_state_store() -> OAuthStateStore:
+    environment = get_environment()
+    backend = environment.get_key(EnvironmentKeys.OAUTH_STATE_BACKEND.value)
+    ttl = environment.get_float(EnvironmentKeys.OAUTH_STATE_TTL.value)
+    if backend == "database":
+        return DatabaseOAuthStateStore(ttl)
+    if backend == "redis":
+        return RedisOAuthStateStore(ttl, environment.get_key(EnvironmentKeys.OAUTH_STATE_REDIS_URL.value))
+    if backend == "memory":
+        return MemoryOAuthStateStore(ttl)
+    raise ValueError(f"Unknown OAUTH_STATE_BACKEND: {backend}")
+
+
+def get_oauth_state_store() -> OAuthStateStore:
+    """Process-wide OAuth state store, configured from the environment on first use."""
+    global _oauth_state_store
+    if _oauth_state_store is None:
+        with _lock:
+            if _oauth_state_store is None:
+                _oauth_state_store = create_oauth_state_store()
+    return _oauth_state_store
@@ -0,0 +1,73 @@
+import re
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.responses import FileResponse, StreamingResponse
+
+from utils.blob_store import BlobStore
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names ``etag`` (weak comparison)."""
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` of a single-range ``Range`` header, or None to send the whole body.
+
+    Malformed and multi-range headers are ignored, which RFC 9110 allows.
+    """
+    match = RANGE_PATTERN.match((header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+async def blob_response(request: Request, store: BlobStore, digest: str, media_type: str) -> Response:
+    """Serve a blob with its digest as ETag, honouring If-None-Match and single byte ranges.
+
+    Blobs on local disk go out through ``FileResponse``, which hands the path to servers that
+    support the ``http.response.pathsend`` extension; other stores stream in chunks.
+    """
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    path = store.local_path(digest)
+    if path is not None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    size = await store.size(digest)
+    try:
+        byte_range = parse_byte_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if byte_range is not None and request.headers.get("if-range", etag) != etag:
+        byte_range = None
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(store.stream(digest), media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(store.stream(digest, start, end), status_code=206, media_type=media_type, headers=headers)
@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+
+
+class VerifiedTokenCache:
+    """Least recently used cache of JWTs whose signature has been checked, with their claims.
+
+    An entry is good until the token's ``exp`` and for at most ``max_age`` seconds, which
+    also bounds how long tokens without an expiry skip verification. Only tokens that
+    verified are stored, so a miss always falls back to the full check.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, max_age: Optional[float] = None,
+                 clock: Callable[[], float] = time.time):
+        if max_size is None:
+            max_size = get_environment().get_int(EnvironmentKeys.AUTH_TOKEN_CACHE_SIZE.value)
+        if max_age is None:
+            max_age = get_environment().get_float(EnvironmentKeys.AUTH_TOKEN_CACHE_MAX_AGE.value)
+        self.max_size = max_size
+        self.max_age = max_age
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None or entry[1] <= self._clock():
+            if entry is not None:
+                del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        # A copy, so that handlers changing their payload don't change the cached claims
+        return dict(entry[0])
+
+    def put(self, token: str, payload: dict):
+        if self.max_size <= 0:
+            return
+        expires_at = self._clock() + self.max_age
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        self._entries[token] = (dict(payload), expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache()
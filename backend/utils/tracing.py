@@ -0,0 +1,169 @@
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+from utils.logger import logger
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else ""
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self):
+        self.end_time_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_ns or time.time_ns()
+        return (end - self.start_time_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_time_ns,
+            "endTimeUnixNano": self.end_time_ns,
+            "durationMs": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+# Spans are written as one JSON object per line using the OTLP/JSON span field
+# names, so the file can be shipped to a collector (e.g. the otel filelog receiver).
+class FileSpanExporter:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.file_path, "a") as f:
+                f.write(line + "\n")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_exporter: Optional[FileSpanExporter] = None
+
+
+def configure_tracing(file_path: Optional[str] = None):
+    global _exporter
+    file_path = file_path or get_environment().get_key(EnvironmentKeys.TRACE_EXPORT_FILE.value)
+    _exporter = FileSpanExporter(file_path) if file_path else None
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _finish(span: Span):
+    span.end()
+    logger.debug(f"[trace] {span.name} took {span.duration_ms:.1f}ms {span.attributes}")
+    if _exporter is not None:
+        try:
+            _exporter.export(span)
+        except Exception as e:
+            logger.error(f"Failed to export span {span.name}: {e}")
+
+
+@contextmanager
+def trace_span(name: str, **attributes):
+    span = Span(name, parent=_current_span.get(), attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.error = str(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(span)
+
+
+def traced(name: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records every chat model call as a span with token usage attached."""
+
+    def __init__(self):
+        self._spans: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model_name") or (kwargs.get("invocation_params") or {}).get("model")
+        self._spans[run_id] = Span("llm.call", parent=_current_span.get(), attributes={
+            "llm.model": model,
+            "llm.message_count": sum(len(batch) for batch in messages),
+        })
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._spans[run_id] = Span("llm.call", parent=_current_span.get(), attributes={
+            "llm.prompt_count": len(prompts),
+        })
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        for key, value in _token_usage(response).items():
+            span.set_attribute(f"llm.usage.{key}", value)
+        _finish(span)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        span.error = str(error)
+        _finish(span)
+
+
+def _token_usage(response) -> Dict[str, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return {key: usage[key] for key in ("prompt_tokens", "completion_tokens", "total_tokens") if key in usage}
+    # Newer langchain versions only report usage on the generated message
+    for generations in response.generations:
+        for generation in generations:
+            usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage_metadata:
+                return {
+                    "prompt_tokens": usage_metadata.get("input_tokens", 0),
+                    "completion_tokens": usage_metadata.get("output_tokens", 0),
+                    "total_tokens": usage_metadata.get("total_tokens", 0),
+                }
+    return {}
+
+
+configure_tracing()
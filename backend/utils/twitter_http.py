@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import importlib.util
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Mapping, Optional, Tuple
+
+import httpx
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+
+X_API_URL = "https://api.x.com"
+TOO_MANY_REQUESTS = 429
+
+
+def max_rate_limit_wait() -> float:
+    return get_environment().get_float(EnvironmentKeys.TWITTER_MAX_RATE_LIMIT_WAIT.value)
+
+
+def max_retries() -> int:
+    return get_environment().get_int(EnvironmentKeys.TWITTER_MAX_RETRIES.value)
+
+
+def rate_limit_delay(headers: Mapping[str, str], attempt: int, backoff: float = 1.0,
+                     clock: Callable[[], float] = time.time) -> float:
+    """Seconds to wait before retrying a 429: until the window in ``x-rate-limit-reset``
+    (epoch seconds) reopens when X sends it, otherwise exponential backoff from ``backoff``.
+    """
+    reset = headers.get("x-rate-limit-reset", "")
+    if reset.isdigit():
+        return max(0.0, int(reset) - clock())
+    return backoff * 2 ** attempt
+
+
+def create_twitter_client() -> httpx.AsyncClient:
+    # HTTP/2 needs the h2 package (httpx[http2]); without it connections stay on HTTP/1.1
+    return httpx.AsyncClient(
+        base_url=X_API_URL,
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=httpx.Timeout(get_environment().get_float(EnvironmentKeys.TWITTER_HTTP_TIMEOUT.value), connect=5.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+    )
+
+
+_client: Optional[httpx.AsyncClient] = None
+_lock = threading.Lock()
+
+
+def get_twitter_client() -> httpx.AsyncClient:
+    """Process-wide client for the X API, so requests reuse its pooled connections."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = create_twitter_client()
+    return _client
+
+
+async def close_twitter_client():
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+async def twitter_request(method: str, url: str, client: Optional[httpx.AsyncClient] = None,
+                          **kwargs) -> httpx.Response:
+    """Send a request to the X API, retrying 429s once the rate limit window reopens.
+
+    Gives up, returning the 429, when the window reopens later than
+    ``TWITTER_MAX_RATE_LIMIT_WAIT`` seconds from now or after ``TWITTER_MAX_RETRIES``
+    retries; callers check the status as usual.
+    """
+    client = client or get_twitter_client()
+    for attempt in range(max_retries() + 1):
+        response = await client.request(method, url, **kwargs)
+        if response.status_code != TOO_MANY_REQUESTS or attempt == max_retries():
+            return response
+        delay = rate_limit_delay(response.headers, attempt)
+        if delay > max_rate_limit_wait():
+            return response
+        await response.aclose()
+        await asyncio.sleep(delay)
+    return response
+
+
+class RateLimitRetry(Retry):
+    """urllib3 retry policy for ``requests`` sessions (tweepy's) with the same 429 handling:
+    wait for ``x-rate-limit-reset``, and give up, returning the 429, when that is more than
+    ``TWITTER_MAX_RATE_LIMIT_WAIT`` seconds away.
+    """
+
+    def _rate_limit_delay(self, response, attempt: int) -> float:
+        return rate_limit_delay(response.headers, attempt, self.backoff_factor or 1.0)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None) -> Retry:
+        if response is not None and response.status == TOO_MANY_REQUESTS \
+                and self._rate_limit_delay(response, len(self.history)) > max_rate_limit_wait():
+            # With raise_on_status=False, urlopen returns the response instead of raising
+            reason = ResponseError(ResponseError.SPECIFIC_ERROR.format(status_code=response.status))
+            raise MaxRetryError(_pool, url, reason)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        # Called after increment, which has added this response to the history
+        return self._rate_limit_delay(response, max(len(self.history) - 1, 0))
+
+
+def rate_limit_retry() -> RateLimitRetry:
+    # 429 means the request wasn't processed, so retrying a POST can't duplicate a tweet
+    return RateLimitRetry(total=max_retries(), connect=0, read=0, status_forcelist=[TOO_MANY_REQUESTS],
+                          allowed_methods=None, backoff_factor=1.0, raise_on_status=False)
+
+
+class ProfileCache:
+    """``/2/users/me`` responses for a few seconds per access token.
+
+    Keyed by a digest of the token, so the cache doesn't hold the tokens themselves.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        if ttl is None:
+            ttl = get_environment().get_float(EnvironmentKeys.TWITTER_PROFILE_CACHE_TTL.value)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+
+    @staticmethod
+    def _key(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    def get(self, access_token: str) -> Optional[dict]:
+        key = self._key(access_token)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= self._clock():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, access_token: str, profile: dict):
+        if self.ttl <= 0:
+            return
+        self._entries[self._key(access_token)] = (profile, self._clock() + self.ttl)
+        self._entries.move_to_end(self._key(access_token))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+profile_cache = ProfileCache()
+
+
+async def get_me(access_token: str, client: Optional[httpx.AsyncClient] = None) -> dict:
+    """The ``/2/users/me`` response for a user access token; raises ``httpx.HTTPStatusError``."""
+    profile = profile_cache.get(access_token)
+    if profile is None:
+        response = await twitter_request("GET", "/2/users/me", client=client,
+                                         headers={"Authorization": f"Bearer {access_token}"})
+        response.raise_for_status()
+        profile = response.json()
+        profile_cache.put(access_token, profile)
+    return profile
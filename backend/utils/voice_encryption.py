@@ -0,0 +1,164 @@
+"""Encryption of voices shared for training.
+
+Keys come from the server's private key in two steps. PBKDF2-HMAC-SHA256 (100,000
+iterations) turns it into a master key once per process, then HKDF-SHA256 with the
+upload's random salt gives each upload its own AES-256 key, so the slow step isn't
+repeated per request and the salt stored with the voice is all that's needed to
+decrypt it again.
+
+The encrypted form is a header followed by AES-GCM segments, so a file of any size is
+encrypted and decrypted a segment at a time:
+
+* header: ``b"NXV1"``, the plaintext segment size as a big-endian u32, and a 7-byte
+  random nonce prefix;
+* segments: ``SEGMENT_SIZE`` bytes of plaintext each (the last may be shorter, even
+  empty), each followed by its 16-byte tag. Segment ``i`` uses the nonce
+  ``prefix || i as u32 || last``, where ``last`` is 1 for the final segment and 0
+  otherwise, and the header as associated data, so segments can't be reordered,
+  dropped or truncated without failing authentication.
+
+Derivation and encryption run in a process pool to keep them off the event loop.
+"""
+import asyncio
+import functools
+import os
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import AsyncIterator, List, Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from utils.constants.environment_keys import EnvironmentKeys
+from utils.environment_manager import get_environment
+
+MAGIC = b"NXV1"
+SEGMENT_SIZE = 64 * 1024
+TAG_SIZE = 16
+NONCE_PREFIX_SIZE = 7
+HEADER_SIZE = len(MAGIC) + 4 + NONCE_PREFIX_SIZE
+KDF_ITERATIONS = 100_000
+KDF_SALT = b"nexwallet/voice-encryption"
+# Plaintext sent to the pool per call; bounds the memory an upload holds at once
+BATCH_SEGMENTS = 16
+
+
+class DecryptionError(ValueError):
+    pass
+
+
+@functools.lru_cache(maxsize=4)
+def master_key(private_key: str) -> bytes:
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=KDF_SALT, iterations=KDF_ITERATIONS)
+    return kdf.derive(private_key.encode())
+
+
+def derive_key(private_key: str, salt: bytes) -> bytes:
+    """AES-256 key of one upload."""
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=MAGIC).derive(master_key(private_key))
+
+
+def _nonce(prefix: bytes, index: int, last: bool) -> bytes:
+    return prefix + struct.pack(">I", index) + (b"\x01" if last else b"\x00")
+
+
+def encrypt_segments(private_key: str, salt: bytes, header: bytes, first_index: int,
+                     segments: List[bytes], last: bool) -> bytes:
+    """Ciphertext of consecutive segments; ``last`` marks the final one of them as the end."""
+    aesgcm = AESGCM(derive_key(private_key, salt))
+    prefix = header[-NONCE_PREFIX_SIZE:]
+    return b"".join(
+        aesgcm.encrypt(_nonce(prefix, first_index + i, last and i == len(segments) - 1), segment, header)
+        for i, segment in enumerate(segments)
+    )
+
+
+def new_header() -> bytes:
+    return MAGIC + struct.pack(">I", SEGMENT_SIZE) + os.urandom(NONCE_PREFIX_SIZE)
+
+
+def decrypt_voice(private_key: str, salt: bytes, data: bytes) -> bytes:
+    """Plaintext of an encrypted voice held in memory."""
+    header = data[:HEADER_SIZE]
+    if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+        raise DecryptionError("Not an encrypted voice")
+    (segment_size,) = struct.unpack(">I", header[len(MAGIC):len(MAGIC) + 4])
+    aesgcm = AESGCM(derive_key(private_key, salt))
+    prefix = header[-NONCE_PREFIX_SIZE:]
+    stride = segment_size + TAG_SIZE
+    body = memoryview(data)[HEADER_SIZE:]
+    plaintext = []
+    index = 0
+    for offset in range(0, max(len(body), 1), stride):
+        segment = body[offset:offset + stride]
+        last = offset + stride >= len(body)
+        try:
+            plaintext.append(aesgcm.decrypt(_nonce(prefix, index, last), bytes(segment), header))
+        except InvalidTag:
+            raise DecryptionError(f"Segment {index} failed authentication")
+        index += 1
+    return b"".join(plaintext)
+
+
+def _create_pool() -> ProcessPoolExecutor:
+    workers = get_environment().get_int(EnvironmentKeys.VOICE_ENCRYPTION_WORKERS.value) or min(4, os.cpu_count() or 1)
+    # Spawned rather than forked, like the TTS workers: the API process runs threads
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_encryption_pool() -> ProcessPoolExecutor:
+    """Process-wide pool for key derivation and encryption, started on first use."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = _create_pool()
+    return _pool
+
+
+def shutdown_encryption_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+async def encrypt_stream(private_key: str, salt: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """The encrypted form of ``chunks``, produced as they arrive.
+
+    Plaintext is handed to the pool ``BATCH_SEGMENTS`` segments at a time. The segment
+    that might be the last is held back until more data or the end of input shows
+    whether it is.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_encryption_pool()
+    header = new_header()
+    yield header
+
+    buffer = bytearray()
+    index = 0
+
+    async def encrypt(count: int, last: bool) -> bytes:
+        nonlocal buffer, index
+        segments = [bytes(buffer[i * SEGMENT_SIZE:(i + 1) * SEGMENT_SIZE]) for i in range(count)]
+        del buffer[:count * SEGMENT_SIZE]
+        ciphertext = await loop.run_in_executor(pool, encrypt_segments, private_key, salt, header, index, segments, last)
+        index += count
+        return ciphertext
+
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) > BATCH_SEGMENTS * SEGMENT_SIZE:
+            yield await encrypt((len(buffer) - 1) // SEGMENT_SIZE, last=False)
+    # What's left is at most a batch; an empty input still gets its one, empty, last segment
+    yield await encrypt(max(1, -(-len(buffer) // SEGMENT_SIZE)), last=True)
@@ -1,11 +1,11 @@
 import { useState, useRef, useEffect } from 'react';
 
 type AudioPlayerProps = {
-  voiceData: string;
+  src: string;
   voiceName: string;
 };
 
-export const AudioPlayer = ({ voiceData, voiceName }: AudioPlayerProps) => {
+export const AudioPlayer = ({ src, voiceName }: AudioPlayerProps) => {
   const [isPlaying, setIsPlaying] = useState(false);
   const audioRef = useRef<HTMLAudioElement>(null);
 
@@ -52,7 +52,7 @@ export const AudioPlayer = ({ voiceData, voiceName }: AudioPlayerProps) => {
           <div className="h-full bg-blue-600 w-0"></div>
         </div>
       </div>
-      <audio ref={audioRef} src={`data:audio/wav;base64,${voiceData}`} className="hidden" />
+      <audio ref={audioRef} src={src} className="hidden" />
     </div>
   );
 }; 
\ No newline at end of file
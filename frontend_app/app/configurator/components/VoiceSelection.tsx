@@ -1,7 +1,7 @@
-import { useRef, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { AudioPlayer } from './AudioPlayer';
-import { SavedVoice } from '../../services/ApiService';
+import { apiService, SavedVoice } from '../../services/ApiService';
 
 type VoiceSelectionProps = {
   selectedVoice: string;
@@ -19,6 +19,25 @@ export const VoiceSelection = ({
   const router = useRouter();
   const [isPreviewPlaying, setIsPreviewPlaying] = useState(false);
   const previewAudioRef = useRef<HTMLAudioElement>(null);
+  const [audioUrl, setAudioUrl] = useState("");
+
+  useEffect(() => {
+    if (selectedVoice === '') return;
+    let url = "";
+    let cancelled = false;
+    apiService.getVoiceAudioUrl(selectedVoice)
+      .then((objectUrl) => {
+        url = objectUrl;
+        if (cancelled) URL.revokeObjectURL(objectUrl);
+        else setAudioUrl(objectUrl);
+      })
+      .catch((error) => console.error('Error loading voice audio:', error));
+    return () => {
+      cancelled = true;
+      setAudioUrl("");
+      if (url) URL.revokeObjectURL(url);
+    };
+  }, [selectedVoice]);
 
   const handlePreviewToggle = () => {
     if (previewAudioRef.current) {
@@ -78,7 +97,7 @@ export const VoiceSelection = ({
         {selectedVoice !== '' && (
           <div className="mt-4">
             <AudioPlayer
-              voiceData={savedVoices.find(voice => voice.voice_id === selectedVoice)?.voice_bytes ?? ""}
+              src={audioUrl}
               voiceName={savedVoices.find(voice => voice.voice_id === selectedVoice)?.voice_id ?? ""}
             />
           </div>
@@ -99,6 +99,12 @@ type SaveAgentResponse = {
   createdAt: string;
 };
 
+type SaveAgentPageResponse = {
+  agents: SaveAgentResponse[];
+  has_more: boolean;
+  next_cursor: string | null;
+};
+
 export type SaveAgentApiServiceResponse = {
   id: string;
   name: string;
@@ -126,7 +132,6 @@ export interface SavedVoice {
   ipfs_hash: string;
   share_for_training: boolean;
   created_at: string;
-  voice_bytes?: string;
 }
 
 // Add this type
@@ -465,9 +470,16 @@ class ApiService {
   }
 
   async getMyAgents(): Promise<SaveAgentApiServiceResponse[]> {
-    const response = await this.fetchWithToken<SaveAgentResponse[]>("/api/agent/my", {
-      method: "GET",
-    });
+    const response: SaveAgentResponse[] = [];
+    let cursor: string | null = null;
+    do {
+      const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+      const page: SaveAgentPageResponse = await this.fetchWithToken<SaveAgentPageResponse>(`/api/agent/my${query}`, {
+        method: "GET",
+      });
+      response.push(...page.agents);
+      cursor = page.has_more ? page.next_cursor : null;
+    } while (cursor);
 
     return response.map(agent => ({
       ...agent,
@@ -511,6 +523,15 @@ class ApiService {
     return response.json();
   }
 
+  // Object URL for a voice's audio; revoke it with URL.revokeObjectURL when done
+  async getVoiceAudioUrl(voiceId: string): Promise<string> {
+    const response = await fetch(`${this.baseUrl}/voice/${encodeURIComponent(voiceId)}/audio`, {
+      headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` },
+    });
+    if (!response.ok) throw new Error('Failed to fetch voice audio');
+    return URL.createObjectURL(await response.blob());
+  }
+
   async getMyIpfsVoices(): Promise<SavedVoice[]> {
     const response = await fetch(`${this.baseUrl}/voice/ipfs`, {
       headers: this.getHeaders(),
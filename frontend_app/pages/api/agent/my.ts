@@ -22,9 +22,14 @@ export default async function handler(
       return res.status(401).json({ message: 'Unauthorized' });
     }
 
-    console.log(`${process.env.BACKEND_API_URL}/agent/my`)
-
-    const response = await fetch(`${process.env.BACKEND_API_URL}/agent/my`, {
+    const query = new URLSearchParams();
+    if (typeof req.query.cursor === 'string') query.set('cursor', req.query.cursor);
+    if (typeof req.query.limit === 'string') query.set('limit', req.query.limit);
+    const search = query.toString();
+    const url = `${process.env.BACKEND_API_URL}/agent/my${search ? `?${search}` : ''}`;
+    console.log(url)
+
+    const response = await fetch(url, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
@@ -31,7 +31,6 @@ interface SavedVoice {
   ipfs_hash: string;
   share_for_training: boolean;
   created_at: string;
-  voice_bytes?: string;
 }
 
 export const config = {
@@ -0,0 +1,20 @@
+-- CreateIndex
+CREATE INDEX "Transactions_user_wallet_createdAt_idx" ON "Transactions"("user_wallet", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "SpecialUserCodes_code_is_used_idx" ON "SpecialUserCodes"("code", "is_used");
+
+-- CreateIndex
+CREATE INDEX "Agents_user_id_id_idx" ON "Agents"("user_id", "id");
+
+-- CreateIndex
+CREATE INDEX "Voices_user_id_ipfs_hash_idx" ON "Voices"("user_id", "ipfs_hash");
+
+-- CreateIndex
+CREATE INDEX "agent_chain_chain_id_idx" ON "agent_chain"("chain_id");
+
+-- CreateIndex
+CREATE INDEX "agent_llm_provider_llm_provider_id_idx" ON "agent_llm_provider"("llm_provider_id");
+
+-- CreateIndex
+CREATE INDEX "agent_knowledge_base_knowledge_base_id_idx" ON "agent_knowledge_base"("knowledge_base_id");
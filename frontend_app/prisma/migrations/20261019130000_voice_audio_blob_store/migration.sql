@@ -0,0 +1,3 @@
+-- AlterTable
+ALTER TABLE "Voices" ADD COLUMN     "audio_hash" TEXT,
+ALTER COLUMN "voice_bytes" DROP NOT NULL;
@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "Voices" ADD COLUMN     "latents_hash" TEXT;
@@ -0,0 +1,27 @@
+-- CreateTable
+CREATE TABLE "Jobs" (
+    "id" TEXT NOT NULL,
+    "kind" TEXT NOT NULL,
+    "user_id" TEXT NOT NULL,
+    "status" TEXT NOT NULL DEFAULT 'queued',
+    "payload" TEXT NOT NULL DEFAULT '{}',
+    "result" TEXT,
+    "result_hash" TEXT,
+    "error" TEXT,
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "max_attempts" INTEGER NOT NULL DEFAULT 3,
+    "webhook_url" TEXT,
+    "run_after" TIMESTAMP(3) NOT NULL,
+    "locked_until" TIMESTAMP(3),
+    "created_at" TIMESTAMP(3) NOT NULL,
+    "started_at" TIMESTAMP(3),
+    "finished_at" TIMESTAMP(3),
+
+    CONSTRAINT "Jobs_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "Jobs_status_run_after_idx" ON "Jobs"("status", "run_after");
+
+-- CreateIndex
+CREATE INDEX "Jobs_user_id_status_idx" ON "Jobs"("user_id", "status");
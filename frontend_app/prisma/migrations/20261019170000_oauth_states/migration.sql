@@ -0,0 +1,11 @@
+-- CreateTable
+CREATE TABLE "OAuthStates" (
+    "state" TEXT NOT NULL,
+    "code_verifier" TEXT NOT NULL,
+    "expires_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "OAuthStates_pkey" PRIMARY KEY ("state")
+);
+
+-- CreateIndex
+CREATE INDEX "OAuthStates_expires_at_idx" ON "OAuthStates"("expires_at");